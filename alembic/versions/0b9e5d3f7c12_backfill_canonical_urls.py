@@ -0,0 +1,55 @@
+"""backfill canonical urls
+
+Revision ID: 0b9e5d3f7c12
+Revises: f2d7c4e9a381
+Create Date: 2026-10-17 15:32:48.906127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.urls import canonicalize_url
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b9e5d3f7c12'
+down_revision: str = 'f2d7c4e9a381'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+articles = sa.table(
+    'articles',
+    sa.column('id', sa.String()),
+    sa.column('url', sa.String()),
+    sa.column('canonical_url', sa.String()),
+)
+
+# Rows updated per statement
+BATCH_ROWS = 1000
+
+def upgrade() -> None:
+    # Canonicalise URLs of articles stored before submissions recorded them,
+    # so the deduplication check also finds those
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(articles.c.id, articles.c.url).where(articles.c.canonical_url.is_(None))
+    ).all()
+    update = (
+        articles.update()
+        .where(articles.c.id == sa.bindparam('article_id'))
+        .values(canonical_url=sa.bindparam('canonical'))
+    )
+    for start in range(0, len(rows), BATCH_ROWS):
+        bind.execute(
+            update,
+            [
+                {'article_id': article_id, 'canonical': canonicalize_url(url)}
+                for article_id, url in rows[start:start + BATCH_ROWS]
+            ],
+        )
+
+def downgrade() -> None:
+    # Backfilled values can't be told apart from submitted ones, and are harmless; keep them
+    pass
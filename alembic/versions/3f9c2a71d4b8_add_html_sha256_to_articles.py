@@ -0,0 +1,26 @@
+"""add html_sha256 to articles
+
+Revision ID: 3f9c2a71d4b8
+Revises: 6e737fd63300
+Create Date: 2026-10-16 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a71d4b8'
+down_revision: str = '6e737fd63300'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Add html_sha256 column referencing the content-addressed HTML store
+    op.add_column('articles', sa.Column('html_sha256', sa.String(length=64), nullable=True))
+
+def downgrade() -> None:
+    # Remove html_sha256 column from articles table
+    op.drop_column('articles', 'html_sha256')
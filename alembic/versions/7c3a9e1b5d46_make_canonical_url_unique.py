@@ -0,0 +1,40 @@
+"""make canonical url unique
+
+Revision ID: 7c3a9e1b5d46
+Revises: 0b9e5d3f7c12
+Create Date: 2026-10-17 16:10:27.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3a9e1b5d46'
+down_revision: str = '0b9e5d3f7c12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Keep the canonical URL on the oldest article of each duplicate set only
+    # (the others are still found by their exact URL), then enforce uniqueness
+    # so concurrent bulk and single submissions conflict instead of duplicating
+    op.execute(
+        """
+        UPDATE articles SET canonical_url = NULL
+        WHERE canonical_url IS NOT NULL AND EXISTS (
+            SELECT 1 FROM articles AS older
+            WHERE older.canonical_url = articles.canonical_url
+              AND (older.created_at < articles.created_at
+                   OR (older.created_at = articles.created_at AND older.id < articles.id))
+        )
+        """
+    )
+    op.drop_index(op.f('ix_articles_canonical_url'), table_name='articles')
+    op.create_index(op.f('ix_articles_canonical_url'), 'articles', ['canonical_url'], unique=True)
+
+def downgrade() -> None:
+    # Back to a plain index on canonical_url
+    op.drop_index(op.f('ix_articles_canonical_url'), table_name='articles')
+    op.create_index(op.f('ix_articles_canonical_url'), 'articles', ['canonical_url'], unique=False)
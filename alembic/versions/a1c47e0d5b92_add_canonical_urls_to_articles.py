@@ -0,0 +1,32 @@
+"""add canonical and resolved urls to articles
+
+Revision ID: a1c47e0d5b92
+Revises: 3f9c2a71d4b8
+Create Date: 2026-10-16 11:40:03.527119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c47e0d5b92'
+down_revision: str = '3f9c2a71d4b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Add indexed canonical_url and resolved_url columns for deduplication
+    op.add_column('articles', sa.Column('canonical_url', sa.String(), nullable=True))
+    op.add_column('articles', sa.Column('resolved_url', sa.String(), nullable=True))
+    op.create_index(op.f('ix_articles_canonical_url'), 'articles', ['canonical_url'], unique=False)
+    op.create_index(op.f('ix_articles_resolved_url'), 'articles', ['resolved_url'], unique=False)
+
+def downgrade() -> None:
+    # Remove canonical_url and resolved_url columns from articles table
+    op.drop_index(op.f('ix_articles_resolved_url'), table_name='articles')
+    op.drop_index(op.f('ix_articles_canonical_url'), table_name='articles')
+    op.drop_column('articles', 'resolved_url')
+    op.drop_column('articles', 'canonical_url')
@@ -0,0 +1,37 @@
+"""add summary cache table
+
+Revision ID: c52e8f1a9d30
+Revises: a1c47e0d5b92
+Create Date: 2026-10-16 23:05:41.208733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52e8f1a9d30'
+down_revision: str = 'a1c47e0d5b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Persistent tier of the summary cache
+    op.create_table(
+        'summary_cache',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('model', sa.String(), nullable=False),
+        sa.Column('prompt_version', sa.String(), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_summary_cache_content_hash'), 'summary_cache', ['content_hash'], unique=False)
+
+def downgrade() -> None:
+    # Drop the summary cache table
+    op.drop_index(op.f('ix_summary_cache_content_hash'), table_name='summary_cache')
+    op.drop_table('summary_cache')
@@ -0,0 +1,27 @@
+"""add deferred article status
+
+Revision ID: d8a3b6e0f217
+Revises: c52e8f1a9d30
+Create Date: 2026-10-16 23:48:12.604519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a3b6e0f217'
+down_revision: str = 'c52e8f1a9d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Articles parked while the LLM is unavailable (PostgreSQL native enum only)
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE articlestatus ADD VALUE IF NOT EXISTS 'DEFERRED'")
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop enum values; move deferred articles back to FAILED
+    op.execute("UPDATE articles SET status = 'FAILED' WHERE status = 'DEFERRED'")
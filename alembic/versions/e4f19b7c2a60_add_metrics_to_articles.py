@@ -0,0 +1,26 @@
+"""add metrics to articles
+
+Revision ID: e4f19b7c2a60
+Revises: d8a3b6e0f217
+Create Date: 2026-10-17 10:21:37.442810
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4f19b7c2a60'
+down_revision: str = 'd8a3b6e0f217'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Add metrics column for per-article pipeline measurements (compression ratio etc.)
+    op.add_column('articles', sa.Column('metrics', sa.JSON(), nullable=True))
+
+def downgrade() -> None:
+    # Remove metrics column from articles table
+    op.drop_column('articles', 'metrics')
@@ -0,0 +1,26 @@
+"""add html_submitted to articles
+
+Revision ID: f2d7c4e9a381
+Revises: e4f19b7c2a60
+Create Date: 2026-10-17 14:05:12.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2d7c4e9a381'
+down_revision: str = 'e4f19b7c2a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Flag articles whose stored HTML came from the submitting client
+    op.add_column('articles', sa.Column('html_submitted', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+def downgrade() -> None:
+    # Remove html_submitted column from articles table
+    op.drop_column('articles', 'html_submitted')
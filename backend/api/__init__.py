@@ -3,5 +3,7 @@ API package initialization
 """
 
 from .articles import router as articles_router
+from .audio import router as audio_router
+from .stats import router as stats_router
 
-__all__ = ["articles_router"]
+__all__ = ["articles_router", "audio_router", "stats_router"]
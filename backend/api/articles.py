@@ -2,24 +2,107 @@
 API routes for article ingestion
 """
 
-from typing import Optional
-
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, HttpUrl
-from sqlalchemy import select
+import asyncio
+import base64
+import binascii
+import json
+import uuid
+import zlib
+from typing import AsyncIterator, Dict, List, Literal, Optional
+
+from celery import group
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
+from pydantic import BaseModel, Field, HttpUrl, TypeAdapter, ValidationError, field_validator
+from sqlalchemy import or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from backend.audio_demand import get_audio_demand
+from backend.celery_app import TASK_PRIORITY_HIGH
+from backend.config import get_settings
 from backend.database import Article, ArticleStatus, get_db
-from backend.tasks import process_article_task
+from backend.pipeline.html_store import get_html_store
+from backend.pipeline.llm_router import route_tiers
+from backend.pipeline.llm_scheduler import PRIORITY_BATCH
+from backend.pipeline.summary_stream import (
+    SummaryPublisher,
+    channel_name,
+    final_key,
+    partial_key,
+)
+from backend.redis_client import get_async_redis
+from backend.singleflight import SingleFlight
+from backend.tasks import process_article_task, queue_audio
+from backend.tts import get_tts_service
+from backend.urls import canonicalize_url
+
+settings = get_settings()
 
 router = APIRouter(prefix="/api/v1", tags=["articles"])
 
+_http_url = TypeAdapter(HttpUrl)
+_submissions = SingleFlight("submissions")
+
+# Rows per multi-row INSERT, keeping bind parameters under driver limits
+BATCH_INSERT_ROWS = 1000
+
+
+def _validate_tier(quality: Optional[str]) -> Optional[str]:
+    if quality is not None and quality not in route_tiers():
+        raise ValueError(f"quality must be one of: {', '.join(route_tiers())}")
+    return quality
+
 
 class ArticleSubmission(BaseModel):
     """Request model for article submission"""
 
     url: HttpUrl
     user_id: str = "anonymous"  # Placeholder until auth is implemented
+    # Page HTML captured by the client, gzip-compressed then base64-encoded.
+    # When present the pipeline skips the fetch stage. It is unverified, so
+    # the server fetches the page before anyone else is given the article.
+    html: Optional[str] = Field(None, max_length=settings.max_submitted_html_bytes)
+    # "fast" summarises locally (extractive) without calling the LLM
+    mode: Optional[Literal["llm", "fast"]] = None
+    # Model routing tier, one of the tiers in summary_routes
+    quality: Optional[str] = None
+
+    @field_validator("quality")
+    @classmethod
+    def _known_tier(cls, quality: Optional[str]) -> Optional[str]:
+        return _validate_tier(quality)
+
+
+class BatchSubmission(BaseModel):
+    """Request model for bulk article submission"""
+
+    urls: List[str] = Field(..., min_length=1, max_length=settings.batch_max_urls)
+    user_id: str = "anonymous"
+    mode: Optional[Literal["llm", "fast"]] = None
+    quality: Optional[str] = None
+
+    @field_validator("quality")
+    @classmethod
+    def _known_tier(cls, quality: Optional[str]) -> Optional[str]:
+        return _validate_tier(quality)
+
+
+class BatchItemResult(BaseModel):
+    """Outcome for one URL of a bulk submission"""
+
+    url: str
+    id: Optional[str] = None
+    status: str  # created, exists, duplicate or invalid
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    """Response model for bulk article submission"""
+
+    created: int
+    results: List[BatchItemResult]
 
 
 class ArticleResponse(BaseModel):
@@ -30,9 +113,88 @@ class ArticleResponse(BaseModel):
     status: str
     title: Optional[str] = None
     summary: Optional[str] = None
+    metrics: Optional[dict] = None  # e.g. {"compression": {"ratio": 0.62, ...}}
     created_at: str
 
 
+def _decode_submitted_html(payload: str) -> str:
+    """
+    Decode a base64 gzip HTML payload without inflating more than the size cap
+
+    Raises:
+        HTTPException: 413 if the page is too large, 422 if the payload is malformed
+    """
+    try:
+        compressed = base64.b64decode(payload, validate=True)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        raw = decompressor.decompress(compressed, settings.max_content_length + 1)
+    except (binascii.Error, zlib.error) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid html payload: {e}") from e
+
+    if len(raw) > settings.max_content_length or decompressor.unconsumed_tail:
+        raise HTTPException(
+            status_code=413, detail=f"HTML larger than {settings.max_content_length} bytes"
+        )
+    return raw.decode("utf-8", errors="replace")
+
+
+def _find_existing(db: Session, url: str, canonical: str) -> Optional[Article]:
+    """Find an article by exact URL, canonical URL or recorded redirect target"""
+    result = db.execute(
+        select(Article)
+        .where(
+            or_(
+                Article.url == url,
+                Article.canonical_url == canonical,
+                Article.resolved_url == canonical,
+            )
+        )
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+def _refetch_submitted(db: Session, article_ids: List[str], user_id: str) -> List[str]:
+    """
+    Reset articles built from another user's HTML so the server fetches them
+
+    Client-captured HTML is only trusted for its submitter. Before another
+    user is pointed at such an article, its content is dropped and the page
+    is processed again from a server fetch.
+
+    Returns:
+        IDs of the articles reset, which the caller must queue for processing
+    """
+    if not article_ids:
+        return []
+    result = db.execute(
+        update(Article)
+        .where(
+            Article.id.in_(article_ids),
+            Article.html_submitted.is_(True),
+            Article.user_id != user_id,
+        )
+        .values(
+            html_submitted=False,
+            html_sha256=None,
+            title=None,
+            parsed_text=None,
+            summary=None,
+            audio_path=None,
+            metrics=None,
+            error_message=None,
+            status=ArticleStatus.PENDING,
+        )
+        .returning(Article.id)
+    )
+    reset = list(result.scalars())
+    db.commit()
+    for article_id in reset:
+        # Stream clients must not catch up on the old summary
+        SummaryPublisher(article_id).start()
+    return reset
+
+
 @router.post("/articles", response_model=ArticleResponse, status_code=201)
 def submit_article(
     submission: ArticleSubmission,
@@ -42,29 +204,59 @@ def submit_article(
     Submit a new article for processing
     Processes asynchronously in background
     """
-    # Check if URL already exists
-
-    result = db.execute(select(Article).where(Article.url == str(submission.url)))
-    existing = result.scalar_one_or_none()
+    url = str(submission.url)
+    canonical = canonicalize_url(url)
+    html = _decode_submitted_html(submission.html) if submission.html else None
 
+    # Check if the URL, or another form of it, already exists
+    existing = _find_existing(db, url, canonical)
     if existing:
+        for article_id in _refetch_submitted(db, [existing.id], submission.user_id):
+            process_article_task.delay(article_id)
         raise HTTPException(
             status_code=409, detail=f"Article already exists with ID: {existing.id}"
         )
 
-    # Create new article
-    article = Article(
-        url=str(submission.url),
-        user_id=submission.user_id,
-        status=ArticleStatus.PENDING,
-    )
+    # Share one pipeline run between concurrent submissions of the same page:
+    # the first claims the canonical URL for the article it is about to create
+    article_id = str(uuid.uuid4())
+    leader_id = _submissions.claim(canonical, article_id)
+    if leader_id:
+        raise HTTPException(status_code=409, detail=f"Article already exists with ID: {leader_id}")
+
+    try:
+        # Create new article, pointing at the client's HTML if it sent one
+        article = Article(
+            id=article_id,
+            url=url,
+            canonical_url=canonical,
+            user_id=submission.user_id,
+            status=ArticleStatus.PENDING,
+            html_sha256=get_html_store().put(html) if html else None,
+            html_submitted=html is not None,
+        )
 
-    db.add(article)
-    db.commit()
-    db.refresh(article)
+        db.add(article)
+        db.commit()
+        db.refresh(article)
+    except IntegrityError:
+        # Stored since the check above, e.g. by a bulk submission
+        db.rollback()
+        _submissions.release(canonical)
+        existing = _find_existing(db, url, canonical)
+        if not existing:
+            raise
+        raise HTTPException(
+            status_code=409, detail=f"Article already exists with ID: {existing.id}"
+        ) from None
+    except Exception:
+        _submissions.release(canonical)
+        raise
 
     # Start async processing task
-    process_article_task.delay(article.id)
+    process_article_task.delay(
+        article.id, summary_mode=submission.mode, summary_quality=submission.quality
+    )
 
     return ArticleResponse(
         id=article.id,
@@ -72,10 +264,139 @@ def submit_article(
         status=article.status.value,
         title=article.title,
         summary=article.summary,
+        metrics=article.metrics,
         created_at=article.created_at.isoformat(),
     )
 
 
+def _insert_ignoring_conflicts(db: Session, rows: List[dict]) -> Dict[str, str]:
+    """
+    Insert article rows with multi-row INSERT ... ON CONFLICT DO NOTHING
+
+    Rows whose URL or canonical URL (both unique) is already stored are skipped.
+
+    Returns:
+        Mapping of URL to ID for the rows actually inserted
+    """
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    inserted = {}
+    for start in range(0, len(rows), BATCH_INSERT_ROWS):
+        stmt = (
+            dialect.insert(Article)
+            .values(rows[start : start + BATCH_INSERT_ROWS])
+            .on_conflict_do_nothing()
+            .returning(Article.id, Article.url)
+        )
+        inserted.update({url: article_id for article_id, url in db.execute(stmt)})
+    return inserted
+
+
+def _existing_by_canonical(db: Session, canonicals: Dict[str, str]) -> Dict[str, str]:
+    """
+    Look up stored articles by canonical URL, redirect target or exact URL
+
+    Args:
+        canonicals: Mapping of canonical URL to the submitted URL
+
+    Returns:
+        Mapping of canonical URL to the ID of the article already covering it
+    """
+    existing = {}
+    keys = list(canonicals)
+    for start in range(0, len(keys), BATCH_INSERT_ROWS):
+        chunk = keys[start : start + BATCH_INSERT_ROWS]
+        result = db.execute(
+            select(Article.id, Article.url, Article.canonical_url, Article.resolved_url).where(
+                or_(
+                    Article.canonical_url.in_(chunk),
+                    Article.resolved_url.in_(chunk),
+                    Article.url.in_([canonicals[key] for key in chunk]),
+                )
+            )
+        )
+        for article_id, url, canonical_url, resolved_url in result:
+            for key in (canonical_url, resolved_url, canonicalize_url(url)):
+                if key in canonicals:
+                    existing.setdefault(key, article_id)
+    return existing
+
+
+@router.post("/articles/batch", response_model=BatchResponse)
+def submit_articles_batch(
+    submission: BatchSubmission,
+    db: Session = Depends(get_db),
+):
+    """
+    Submit many articles for processing at once
+    New URLs are inserted in bulk and enqueued as one Celery group
+    """
+    # Validate and dedupe on canonical URL in memory, keeping submission order
+    results: List[BatchItemResult] = []
+    item_canonicals: List[Optional[str]] = []
+    unique: Dict[str, str] = {}
+    for raw_url in submission.urls:
+        try:
+            url = str(_http_url.validate_python(raw_url))
+        except ValidationError as e:
+            results.append(
+                BatchItemResult(url=raw_url, status="invalid", error=e.errors()[0]["msg"])
+            )
+            item_canonicals.append(None)
+            continue
+
+        canonical = canonicalize_url(url)
+        results.append(
+            BatchItemResult(url=url, status="duplicate" if canonical in unique else "created")
+        )
+        item_canonicals.append(canonical)
+        unique.setdefault(canonical, url)
+
+    existing = _existing_by_canonical(db, unique) if unique else {}
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "url": url,
+            "canonical_url": canonical,
+            "user_id": submission.user_id,
+            "status": ArticleStatus.PENDING,
+        }
+        for canonical, url in unique.items()
+        if canonical not in existing
+    ]
+    inserted = _insert_ignoring_conflicts(db, rows) if rows else {}
+
+    # Rows skipped by ON CONFLICT were inserted concurrently by someone else
+    raced = {row["canonical_url"]: row["url"] for row in rows if row["url"] not in inserted}
+    if raced:
+        existing.update(_existing_by_canonical(db, raced))
+    db.commit()
+    refetched = _refetch_submitted(db, list(set(existing.values())), submission.user_id)
+
+    # Publish all new tasks in one go
+    if inserted or refetched:
+        group(
+            process_article_task.s(
+                article_id,
+                priority=PRIORITY_BATCH,
+                summary_mode=submission.mode,
+                summary_quality=submission.quality,
+            )
+            for article_id in [*inserted.values(), *refetched]
+        ).apply_async()
+
+    for item, canonical in zip(results, item_canonicals, strict=True):
+        if canonical is None:
+            continue
+        if unique[canonical] in inserted:
+            item.id = inserted[unique[canonical]]
+        else:
+            item.id = existing.get(canonical)
+            if item.status == "created":
+                item.status = "exists"
+
+    return BatchResponse(created=len(inserted), results=results)
+
+
 @router.get("/articles", response_model=list[ArticleResponse])
 def list_articles(db: Session = Depends(get_db)):
     """
@@ -93,6 +414,7 @@ def list_articles(db: Session = Depends(get_db)):
             status=article.status.value,
             title=article.title,
             summary=article.summary,
+            metrics=article.metrics,
             created_at=article.created_at.isoformat(),
         )
         for article in articles
@@ -118,6 +440,7 @@ def get_article(article_id: str, db: Session = Depends(get_db)):
         status=article.status.value,
         title=article.title,
         summary=article.summary,
+        metrics=article.metrics,
         created_at=article.created_at.isoformat(),
     )
 
@@ -138,36 +461,150 @@ def delete_article(article_id: str, db: Session = Depends(get_db)):
 
     db.execute(sql_delete(Article).where(Article.id == article_id))
     db.commit()
+    if article.canonical_url:
+        # Let the page be submitted again straight away
+        _submissions.release(article.canonical_url)
 
     return None
 
 
 @router.get("/articles/{article_id}/audio")
-def get_article_audio(article_id: str, db: Session = Depends(get_db)):
+def get_article_audio(article_id: str, request: Request, db: Session = Depends(get_db)):
     """
-    Get audio file for an article
+    Get audio for an article, synthesising it on first request
+
+    Audio isn't generated by the pipeline. Once synthesised, requests are
+    redirected to the cached file (``GET /audio/{key}``), which
+    supports byte ranges and long-lived caching. While synthesis is running
+    the file is streamed as it is written; before it starts, a high-priority
+    task is queued and 202 is returned with a Retry-After header.
     """
-    from pathlib import Path
+    article = db.execute(select(Article).where(Article.id == article_id)).scalar_one_or_none()
+    if not article or not article.summary:
+        raise HTTPException(status_code=404, detail="Audio not found")
 
-    # Get article from database
-    result = db.execute(select(Article).where(Article.id == article_id))
-    article = result.scalar_one_or_none()
+    demand = get_audio_demand()
+    demand.played(article.user_id)
+
+    # Looked up by content, so identical summaries share a file
+    tts = get_tts_service()
+    key = tts.cache_key(article.summary)
+    audio_file = tts.cache.get(key)
+    if audio_file is None:
+        partial = tts.cache.follow(key)
+        if partial is not None:
+            return StreamingResponse(
+                partial, media_type="audio/mpeg", headers={"Cache-Control": "no-store"}
+            )
+        # Finished between the two lookups, or not started
+        audio_file = tts.cache.get(key)
+
+    if audio_file is None:
+        queue_audio(article_id, TASK_PRIORITY_HIGH)
+        return JSONResponse(
+            {"status": "generating", "article_id": article_id},
+            status_code=202,
+            headers={"Retry-After": str(settings.audio_retry_after)},
+        )
 
-    if not article or not article.audio_path:
-        from fastapi import HTTPException
+    if article.audio_path != str(audio_file):
+        article.audio_path = str(audio_file)
+        db.commit()
 
-        raise HTTPException(status_code=404, detail="Audio not found")
+    # The article's summary (and so its audio key) can change; the redirect isn't cached
+    return RedirectResponse(
+        request.url_for("get_audio", key=key),
+        status_code=307,
+        headers={"Cache-Control": "no-cache"},
+    )
 
-    # Check if file exists
-    audio_file = Path(article.audio_path)
-    if not audio_file.exists():
-        raise HTTPException(status_code=404, detail="Audio file not found")
 
-    # Return file
-    from fastapi.responses import FileResponse
+# Seconds between SSE keep-alive comments
+SSE_HEARTBEAT = 15.0
+
+# Events after which the summary stream closes
+TERMINAL_EVENTS = {"done", "deferred", "failed"}
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _summary_events(article_id: str) -> AsyncIterator[str]:
+    """Relay an article's live summary from Redis as server-sent events"""
+    client = get_async_redis()
+    pubsub = client.pubsub()
+    await pubsub.subscribe(channel_name(article_id))
+    try:
+        # Catch up after subscribing, so nothing falls between the two
+        final = await client.get(final_key(article_id))
+        if final:
+            message = json.loads(final)
+            yield _sse(message.pop("event"), message)
+            return
+
+        snapshot = await client.get(partial_key(article_id)) or ""
+        sent = len(snapshot.encode("utf-8"))
+        if snapshot:
+            yield _sse("delta", {"text": snapshot})
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.summary_stream_timeout
+        last_sent = loop.time()
+        while loop.time() < deadline:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=SSE_HEARTBEAT
+            )
+            if message is None:
+                # Also returned for skipped subscribe confirmations: only a quiet
+                # heartbeat interval needs a keep-alive
+                if loop.time() - last_sent >= SSE_HEARTBEAT:
+                    yield ": keep-alive\n\n"
+                    last_sent = loop.time()
+                continue
+
+            data = json.loads(message["data"])
+            event = data.pop("event")
+            if event == "delta":
+                # Already part of the snapshot
+                if data["end"] <= sent:
+                    continue
+                sent = data.pop("end")
+            elif event == "reset":
+                sent = 0
+            yield _sse(event, data)
+            last_sent = loop.time()
+            if event in TERMINAL_EVENTS:
+                return
+    finally:
+        await pubsub.unsubscribe(channel_name(article_id))
+        await pubsub.close()
+
+
+@router.get("/articles/{article_id}/summary/stream")
+def stream_article_summary(article_id: str, db: Session = Depends(get_db)):
+    """
+    Stream the summary as it is generated (server-sent events)
+
+    Events: ``delta`` ({"text"}), ``reset`` (discard text so far), then one of
+    ``done`` ({"summary"}), ``deferred`` ({"retry_after", "summary"}, the interim
+    extractive summary) or ``failed``.
+    """
+    result = db.execute(select(Article).where(Article.id == article_id))
+    article = result.scalar_one_or_none()
 
-    # Determine media type based on file extension
-    media_type = "audio/mpeg" if audio_file.suffix.lower() == ".mp3" else "audio/wav"
-    filename = f"article_{article_id}{audio_file.suffix}"
+    if not article:
+        raise HTTPException(status_code=404, detail="Article not found")
 
-    return FileResponse(path=audio_file, media_type=media_type, filename=filename)
+    if article.status == ArticleStatus.COMPLETED:
+        events = iter([_sse("done", {"summary": article.summary})])
+    elif article.status == ArticleStatus.FAILED:
+        events = iter([_sse("failed", {"message": article.error_message})])
+    else:
+        events = _summary_events(article_id)
+
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
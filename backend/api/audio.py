@@ -0,0 +1,181 @@
+"""
+API routes for serving cached audio
+
+Files in the audio cache are named by a hash of what they were synthesised
+from (text, voice, language, backend), not of their bytes: after eviction the
+same key can be synthesised again into slightly different audio. So the
+strong ETag is the SHA-256 of the file as served (recorded by the audio cache
+when the file is written), and byte ranges (which let players seek without
+downloading the file again) are only combined across requests when that
+digest matches.
+"""
+
+import os
+import re
+from typing import Mapping, Optional, Tuple
+
+import anyio
+from fastapi import APIRouter, HTTPException, Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from backend.audio_cache import AudioCache
+from backend.tts import get_tts_service
+
+router = APIRouter(prefix="/api/v1", tags=["audio"])
+
+# A key's audio only changes if it is evicted and synthesised again (the same
+# text, read differently), so clients may keep it long, revalidating by ETag
+CACHE_CONTROL = "public, max-age=31536000"
+
+# One entity tag in a list, weak or strong; group 1 is the quoted opaque tag
+ENTITY_TAG = re.compile(r'(?:W/)?("[^"]*")')
+
+
+class RangeNotSatisfiable(ValueError):
+    """A Range header that selects no bytes of the file"""
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a ``Range: bytes=...`` header for a file of ``size`` bytes
+
+    Only single ranges are supported; anything else is ignored and the whole
+    file is sent, as HTTP allows.
+
+    Returns:
+        (first byte, last byte) inclusive, or None to send the whole file
+
+    Raises:
+        RangeNotSatisfiable: if the range starts past the end of the file
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:
+            # Suffix range: the final ``last`` bytes
+            suffix = int(last)
+            if suffix <= 0 or size == 0:
+                raise RangeNotSatisfiable(header)
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end = int(last) if last else None
+    except ValueError:
+        return None
+    if end is not None and start > end:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """
+    Whether an ``If-None-Match`` header matches ``etag``
+
+    The header is ``*`` or a list of entity tags. Tags are compared weakly, as
+    RFC 9110 requires for this header: ``W/"x"`` matches ``"x"``.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in ENTITY_TAG.findall(header)
+
+
+class AudioFileResponse(Response):
+    """
+    A cached audio file, answering conditional and byte-range requests
+
+    The body is read in chunks off the event loop. (The deployed server,
+    uvicorn, has no zero-copy ``sendfile`` extension for ASGI apps.)
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(self, cache: AudioCache, key: str, request_headers: Mapping[str, str]):
+        # Opened now, so eviction can't remove the file before it is sent
+        self.file = open(cache.path(key), "rb")
+        self.background = None
+        self.media_type = None
+        size = os.fstat(self.file.fileno()).st_size
+        # Digest of exactly the bytes this response serves
+        etag = f'"{cache.digest(key, self.file)}"'
+        headers = {"etag": etag, "cache-control": CACHE_CONTROL, "accept-ranges": "bytes"}
+
+        # Bytes to send, first to last inclusive (None: no body)
+        self.byte_range: Optional[Tuple[int, int]] = None
+        if if_none_match(request_headers.get("if-none-match"), etag):
+            self.status_code = 304
+        else:
+            try:
+                byte_range = None
+                # A partial copy of anything else can't be completed: send it all
+                if request_headers.get("if-range", etag) == etag:
+                    byte_range = parse_byte_range(request_headers.get("range"), size)
+            except RangeNotSatisfiable:
+                self.status_code = 416
+                headers["content-range"] = f"bytes */{size}"
+                headers["content-length"] = "0"
+            else:
+                self.status_code = 206 if byte_range else 200
+                self.byte_range = byte_range or (0, size - 1)
+                first, last = self.byte_range
+                if byte_range:
+                    headers["content-range"] = f"bytes {first}-{last}/{size}"
+                headers["content-length"] = str(last - first + 1)
+                headers["content-type"] = "audio/mpeg"
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        with self.file:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": self.status_code,
+                    "headers": self.raw_headers,
+                }
+            )
+            first, last = self.byte_range or (0, -1)
+            if scope["method"].upper() == "HEAD" or last < first:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+                return
+
+            offset = first
+            while offset <= last:
+                chunk = await anyio.to_thread.run_sync(
+                    os.pread, self.file.fileno(), min(self.chunk_size, last - offset + 1), offset
+                )
+                offset += len(chunk)
+                # Files are replaced whole, never truncated, so this only stops early on error
+                more_body = bool(chunk) and offset <= last
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                if not more_body:
+                    break
+
+
+@router.api_route("/audio/{key}", methods=["GET", "HEAD"], name="get_audio")
+def get_audio(key: str, request: Request):
+    """
+    Get a cached audio file by its audio cache key
+
+    Article audio URLs redirect here once the audio exists.
+    """
+    if len(key) != 64 or any(c not in "0123456789abcdef" for c in key):
+        raise HTTPException(status_code=404, detail="Audio not found")
+
+    cache = get_tts_service().cache
+    if cache.get(key) is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+
+    try:
+        return AudioFileResponse(cache, key, request.headers)
+    except FileNotFoundError:
+        # Evicted since the lookup
+        raise HTTPException(status_code=404, detail="Audio not found") from None
@@ -0,0 +1,58 @@
+"""
+API routes for operational statistics
+"""
+
+from typing import Dict, Optional
+
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+from backend.config import get_settings
+from backend.pipeline.llm_router import get_model_stats
+from backend.pipeline.summary_cache import get_summary_cache
+
+settings = get_settings()
+
+router = APIRouter(prefix="/api/v1/stats", tags=["stats"])
+
+
+class SummaryCacheStats(BaseModel):
+    """Summary cache counters, shared by all workers"""
+
+    hits: int
+    misses: int
+    hit_rate: float
+
+
+@router.get("/summary-cache", response_model=SummaryCacheStats)
+def summary_cache_stats():
+    """
+    Summary cache hit and miss counts, for sizing Redis
+    """
+    return SummaryCacheStats(**get_summary_cache().stats())
+
+
+class ModelHealthStats(BaseModel):
+    """Rolling latency and error rate of one model, over its recent requests"""
+
+    samples: int
+    p50: Optional[float]
+    p95: Optional[float]
+    error_rate: float
+    degraded: bool
+
+
+@router.get("/models", response_model=Dict[str, ModelHealthStats])
+def model_stats():
+    """
+    Latency percentiles (seconds) and error rate of every routed model
+    """
+    models = [
+        *(model for route in settings.summary_routes for model in route.models),
+        settings.summary_model,
+        *settings.summary_fallback_models,
+    ]
+    return {
+        model: ModelHealthStats(**health.metrics(), degraded=health.degraded)
+        for model, health in get_model_stats().health(models).items()
+    }
@@ -0,0 +1,228 @@
+"""
+Content-addressed audio cache
+MP3 files keyed by SHA-256 of (text, voice, language, backend), evicted least recently used
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+from backend.config import get_settings
+
+settings = get_settings()
+
+# Eviction stops once the cache is back under this fraction of its budget
+EVICT_TO = 0.9
+
+# Seconds between checks for more data while following a file being written
+FOLLOW_POLL = 0.1
+
+
+def audio_cache_key(text: str, voice: str, language: str, backend: str) -> str:
+    """Digest identifying one rendering of a text"""
+    return hashlib.sha256(f"{backend}\0{voice}\0{language}\0{text}".encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """
+    Filesystem audio cache shared by all articles
+
+    Layout under ``root``: ``<aa>/<bb>/<sha256>.mp3``. A file's modification
+    time is refreshed on every hit, so eviction removes the least recently
+    used files first once the cache grows past ``max_bytes``. While a file
+    is written it is named ``<sha256>.mp3.part``, so readers can ``follow``
+    it before it is complete. Next to each file, ``<sha256>.mp3.sha256``
+    records the digest of its bytes (see ``digest``).
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        # Estimated size; rescanned when it passes the budget, since every
+        # worker writes to the same directory
+        self._size: Optional[int] = None
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / key[2:4] / f"{key}.mp3"
+
+    def partial_path(self, key: str) -> Path:
+        return self.path(key).with_suffix(".mp3.part")
+
+    def digest_path(self, key: str) -> Path:
+        return self.path(key).with_suffix(".mp3.sha256")
+
+    def get(self, key: str) -> Optional[Path]:
+        """Path of a cached file (marked as recently used), or None"""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def write(self, key: str, chunks: Iterable[bytes]) -> Path:
+        """Store a file from its chunks, written as they arrive, and return its path"""
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = self._create_partial(key)
+        size = 0
+        digest = hashlib.sha256()
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    # Visible to followers as soon as each segment is done
+                    f.flush()
+                    size += len(chunk)
+                    digest.update(chunk)
+                # The inode survives the rename into place
+                self._record_digest(key, os.fstat(f.fileno()).st_ino, digest.hexdigest())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        if self._size is not None:
+            self._size += size
+        if self._size is None or self._size > self.max_bytes:
+            self.evict()
+        return path
+
+    def digest(self, key: str, f: BinaryIO) -> str:
+        """
+        SHA-256 of a cached file's bytes, given the file opened for reading
+
+        Read from the record made when the file was written, so serving a file
+        doesn't read all of it. The record names the file's inode: if another
+        worker has replaced the file since, it is hashed again (and recorded).
+        """
+        inode = os.fstat(f.fileno()).st_ino
+        try:
+            recorded, _, digest = self.digest_path(key).read_text().partition(" ")
+            if int(recorded) == inode and len(digest) == 64:
+                return digest
+        except (OSError, ValueError):
+            pass
+        digest = hashlib.file_digest(f, "sha256").hexdigest()
+        self._record_digest(key, inode, digest)
+        return digest
+
+    def _record_digest(self, key: str, inode: int, digest: str):
+        """Replace a file's digest record (best effort: readers hash the file without it)"""
+        record = self.digest_path(key)
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=record.parent, prefix=".tmp-")
+            with os.fdopen(fd, "w") as f:
+                f.write(f"{inode} {digest}")
+            os.replace(tmp_path, record)
+        except OSError as e:
+            print(f"⚠️  Failed to record digest of audio {key}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _create_partial(self, key: str) -> Tuple[int, str]:
+        """Open the file's well-known ``.part`` name, or a private one if it is taken"""
+        partial = self.partial_path(key)
+        for _ in range(2):
+            try:
+                return os.open(partial, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644), str(partial)
+            except FileExistsError:
+                try:
+                    if time.time() - partial.stat().st_mtime < settings.audio_pending_ttl:
+                        break
+                    # Left behind by a writer that died
+                    partial.unlink()
+                except FileNotFoundError:
+                    pass
+        return tempfile.mkstemp(dir=partial.parent, prefix=".tmp-")
+
+    def follow(self, key: str, chunk_size: int = 64 * 1024) -> Optional[Iterator[bytes]]:
+        """
+        Read a file while it is still being written
+
+        Returns:
+            Iterator over the file's bytes that waits for more until the writer
+            finishes, or None if the file isn't being written
+        """
+        try:
+            f = open(self.partial_path(key), "rb", buffering=0)
+        except FileNotFoundError:
+            return None
+        return self._follow(f, key, chunk_size)
+
+    def _follow(self, f: BinaryIO, key: str, chunk_size: int) -> Iterator[bytes]:
+        with f:
+            inode = os.fstat(f.fileno()).st_ino
+            last_data = time.monotonic()
+            while True:
+                chunk = f.read(chunk_size)
+                if chunk:
+                    last_data = time.monotonic()
+                    yield chunk
+                    continue
+                try:
+                    # Renamed into place (or removed after a failure) once written
+                    writing = self.partial_path(key).stat().st_ino == inode
+                except FileNotFoundError:
+                    writing = False
+                if not writing:
+                    # Anything written between the last read and the rename
+                    rest = f.read()
+                    if rest:
+                        yield rest
+                    return
+                if time.monotonic() - last_data > 2 * settings.tts_timeout:
+                    print(f"⚠️  Gave up following stalled audio {key}")
+                    return
+                time.sleep(FOLLOW_POLL)
+
+    def _files(self) -> List[Tuple[float, int, Path]]:
+        files = []
+        for path in self.root.glob("*/*/*.mp3"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def evict(self) -> int:
+        """Delete least recently used files until under budget; returns bytes freed"""
+        files = self._files()
+        total = sum(size for _, size, _ in files)
+        freed = 0
+        if total > self.max_bytes:
+            for _, size, path in sorted(files):
+                if total - freed <= self.max_bytes * EVICT_TO:
+                    break
+                for stale in (path, path.with_suffix(".mp3.sha256")):
+                    try:
+                        stale.unlink()
+                    except FileNotFoundError:
+                        pass
+                freed += size
+            print(f"🧹 Evicted {freed} bytes from the audio cache")
+        self._size = total - freed
+        return freed
+
+
+# Global audio cache instance
+_audio_cache = None
+_audio_cache_lock = threading.Lock()
+
+
+def get_audio_cache() -> AudioCache:
+    """Get or create audio cache instance"""
+    global _audio_cache
+    if _audio_cache is None:
+        with _audio_cache_lock:
+            if _audio_cache is None:
+                _audio_cache = AudioCache(
+                    Path(settings.storage_dir) / "audio", settings.audio_cache_max_bytes
+                )
+    return _audio_cache
@@ -0,0 +1,97 @@
+"""
+Demand for on-demand audio: queued synthesis and recent listeners
+"""
+
+import threading
+import time
+from typing import Optional
+
+import redis
+
+from backend.config import get_settings
+from backend.redis_client import get_redis
+
+settings = get_settings()
+
+KEY_PREFIX = "digestible:audio"
+
+
+class AudioDemand:
+    """
+    Shared bookkeeping for lazy audio generation
+
+    An article's synthesis is only queued once while it is pending, however
+    many clients ask for the audio. Users who play audio are remembered for
+    ``audio_prewarm_window`` seconds so their new articles can be synthesised
+    ahead of time. Redis errors fail open: synthesis is queued again (the
+    audio cache still keeps one file per text) and nobody is prewarmed.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self._client = client
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    def claim(self, article_id: str) -> bool:
+        """Mark an article's synthesis as queued; False if it already is"""
+        try:
+            return bool(
+                self.client.set(
+                    f"{KEY_PREFIX}:pending:{article_id}",
+                    "1",
+                    nx=True,
+                    ex=settings.audio_pending_ttl,
+                )
+            )
+        except redis.RedisError as e:
+            print(f"⚠️  Audio demand unavailable: {e}")
+            return True
+
+    def release(self, article_id: str):
+        """Allow the article's synthesis to be queued again"""
+        try:
+            self.client.delete(f"{KEY_PREFIX}:pending:{article_id}")
+        except redis.RedisError as e:
+            print(f"⚠️  Failed to release audio claim for {article_id}: {e}")
+
+    def played(self, user_id: str):
+        """Remember that a user asked for audio just now"""
+        if settings.audio_prewarm_window <= 0:
+            return
+        now = time.time()
+        key = f"{KEY_PREFIX}:listeners"
+        try:
+            pipe = self.client.pipeline()
+            pipe.zadd(key, {user_id: now})
+            pipe.zremrangebyscore(key, "-inf", now - settings.audio_prewarm_window)
+            pipe.execute()
+        except redis.RedisError as e:
+            print(f"⚠️  Failed to record audio listener {user_id}: {e}")
+
+    def recent_listener(self, user_id: str) -> bool:
+        """Whether the user played audio within ``audio_prewarm_window``"""
+        if settings.audio_prewarm_window <= 0:
+            return False
+        try:
+            played_at = self.client.zscore(f"{KEY_PREFIX}:listeners", user_id)
+        except redis.RedisError as e:
+            print(f"⚠️  Audio listeners unavailable: {e}")
+            return False
+        return played_at is not None and time.time() - played_at <= settings.audio_prewarm_window
+
+
+# Global audio demand instance
+_audio_demand = None
+_audio_demand_lock = threading.Lock()
+
+
+def get_audio_demand() -> AudioDemand:
+    """Get or create audio demand instance"""
+    global _audio_demand
+    if _audio_demand is None:
+        with _audio_demand_lock:
+            if _audio_demand is None:
+                _audio_demand = AudioDemand()
+    return _audio_demand
@@ -8,6 +8,11 @@ from backend.config import get_settings
 
 settings = get_settings()
 
+# Task priorities on the Redis broker: lower numbers are delivered first
+TASK_PRIORITY_HIGH = 0
+TASK_PRIORITY_DEFAULT = 5
+TASK_PRIORITY_LOW = 9
+
 # Create Celery app
 celery_app = Celery(
     "digestible", broker=settings.redis_url, backend=settings.redis_url, include=["backend.tasks"]
@@ -21,10 +26,18 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
-    task_time_limit=300,  # 5 minutes max per task
     worker_prefetch_multiplier=1,
+    # Several tasks per process, so one article's fetch overlaps another's parse
+    # (parse and chunk run in the CPU pool, off this process's GIL). The threads
+    # pool can't stop a running task, so there is no task time limit: each stage
+    # has its own deadline instead (see the Pipeline section of Settings)
+    worker_pool="threads",
+    worker_concurrency=settings.worker_concurrency,
     task_acks_late=True,
     worker_disable_rate_limits=False,
+    # One Redis list per priority, so e.g. audio someone is waiting for jumps the queue
+    broker_transport_options={"priority_steps": list(range(10))},
+    task_default_priority=TASK_PRIORITY_DEFAULT,
 )
 
 if __name__ == "__main__":
@@ -2,6 +2,6 @@
 Config package initialization
 """
 
-from .settings import Settings, get_settings
+from .settings import ModelRoute, Settings, get_settings
 
-__all__ = ["get_settings", "Settings"]
+__all__ = ["get_settings", "ModelRoute", "Settings"]
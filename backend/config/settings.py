@@ -3,9 +3,23 @@ Configuration management for Digestible backend
 """
 
 from functools import lru_cache
+from pathlib import Path
+from typing import List
 
+from pydantic import BaseModel, field_validator
 from pydantic_settings import BaseSettings
 
+# Relative storage paths are taken from here rather than each process's working directory
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+class ModelRoute(BaseModel):
+    """Models for one quality tier, up to an article size (see ``Settings.summary_routes``)"""
+
+    tier: str
+    max_tokens: int = 0  # Largest article, in tokens, this route serves (0 = any size)
+    models: List[str]  # Tried in order, cheapest first
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables"""
@@ -20,19 +34,124 @@ class Settings(BaseSettings):
 
     # Redis
     redis_url: str = "redis://redis:6379/0"
+    singleflight_ttl: int = 600  # Seconds a submission keeps its canonical URL claimed
 
     # AI
     openrouter_api_key: str = ""
     openrouter_base_url: str = "https://openrouter.ai/api/v1"
+    summary_mode: str = "llm"  # llm, or fast for the local extractive summarizer
+    summary_model: str = "meta-llama/llama-3.2-3b-instruct:free"
+    summary_fallback_models: List[str] = ["google/gemma-2-9b-it:free"]  # JSON list, tried in order
+    summary_quality: str = "standard"  # Default quality tier
+    # JSON list; the first route for the tier that fits the article's tokens is used
+    summary_routes: List[ModelRoute] = [
+        ModelRoute(tier="economy", models=["meta-llama/llama-3.2-3b-instruct:free"]),
+        ModelRoute(
+            tier="standard", max_tokens=3000, models=["meta-llama/llama-3.2-3b-instruct:free"]
+        ),
+        ModelRoute(
+            tier="standard",
+            models=["meta-llama/llama-3.1-8b-instruct:free", "google/gemma-2-9b-it:free"],
+        ),
+        ModelRoute(
+            tier="premium",
+            models=["meta-llama/llama-3.1-70b-instruct:free", "google/gemma-2-9b-it:free"],
+        ),
+    ]
+    summary_route_window: int = 100  # Recent requests per model behind latency and error rate
+    summary_route_min_samples: int = 5  # Requests needed before a model can be avoided
+    summary_route_max_p95: float = 30.0  # Seconds; slower models are tried last
+    summary_route_max_error_rate: float = 0.5  # Models failing more often are tried last
+    summary_timeout: float = 60.0  # Seconds per completion request, streamed body included
+    summary_group_tokens: int = 2500  # Article tokens per prompt before map-reduce kicks in
+    summary_parallelism: int = 4  # Concurrent completion requests per article
+    summary_cache_enabled: bool = True
+    summary_cache_ttl: int = 30 * 24 * 3600  # Seconds a summary stays in Redis
+    summary_cache_persist: bool = False  # Also keep summaries in the summary_cache table
+    summary_max_deferrals: int = 24  # Re-summarize attempts while the LLM is unavailable
+    summary_stream_ttl: int = 600  # Seconds live summary text is kept for late subscribers
+    summary_stream_timeout: float = 300.0  # Seconds an SSE connection stays open
+    extractive_sentences: int = 7  # Bullets in an extractive summary
+    extractive_max_sentences: int = 500  # Sentences ranked per article, from the start
+    compress_enabled: bool = True  # Drop boilerplate and repetition before summarizing
+    compress_max_tokens: int = 8000  # Article tokens kept for the LLM (0 = no budget)
+    compress_duplicate_similarity: float = 0.6  # Word-pair Jaccard at which sentences repeat
+    compress_boilerplate_min_articles: int = 5  # Articles a sentence must recur in (0 = off)
+    compress_boilerplate_phrases: int = 50_000  # Learned phrase counts kept in Redis
+    llm_pool_size: int = 10  # Pooled connections to OpenRouter per worker process
+    llm_max_retries: int = 3  # Retries per model on 429, 5xx and connection errors
+    llm_backoff_base: float = 1.0  # Seconds, doubled per retry with full jitter
+    llm_backoff_max: float = 30.0
+    llm_breaker_threshold: int = 5  # Failures per model within the window that open its circuit
+    llm_breaker_window: float = 60.0  # Seconds
+    llm_breaker_cooldown: float = 300.0  # Seconds a model's circuit stays open
+    llm_rpm: int = 20  # OpenRouter requests per minute, all workers (0 = unlimited)
+    llm_tpm: int = 0  # OpenRouter tokens per minute, all workers (0 = unlimited)
+    llm_completion_tokens: int = 400  # Tokens reserved per completion until usage is known
+    llm_queue_timeout: float = 120.0  # Seconds a request may wait for quota before deferring
+    llm_queue_poll: float = 0.5  # Seconds between admission checks while queued
+    llm_default_retry_after: float = 10.0  # Seconds to pause all requests after a bare 429
+
+    # Text-to-speech
+    tts_backend: str = "gtts"  # gtts, or espeak for local espeak-ng + lame (backend.tts)
+    tts_language: str = "en"
+    tts_voice: str = "com"  # gTTS accent, as a Google domain (com, co.uk, com.au, ...)
+    tts_espeak_voice: str = ""  # espeak-ng voice, e.g. en-us (defaults to tts_language)
+    tts_espeak_speed: int = 175  # espeak-ng words per minute
+    tts_segment_chars: int = 100  # Sentences are packed into segments of up to this size
+    tts_parallelism: int = 4  # Segments synthesised concurrently per article
+    tts_timeout: float = 15.0  # Seconds per synthesis request
+    tts_deadline: float = 240.0  # Seconds to synthesise all of an article's segments
+    audio_retry_after: int = 5  # Seconds clients wait before asking again while audio is generated
+    audio_pending_ttl: int = 300  # Seconds a queued synthesis blocks duplicates (> tts_deadline)
+    # Audio is generated when first requested, or ahead of time for users who
+    # played any within this many seconds (0 = never ahead of time)
+    audio_prewarm_window: int = 7 * 24 * 3600
+
+    # Storage
+    storage_dir: str = "storage"  # Blob storage shared by API and workers (HTML and audio caches)
+    audio_cache_max_bytes: int = 2 * 1024**3  # Least recently used audio is evicted past this
+
+    # Fetch
+    fetch_timeout: float = 30.0  # Seconds per connection read
+    fetch_deadline: float = 60.0  # Seconds a whole fetch may take (also the domain lease TTL)
+    fetch_connect_timeout: float = 10.0
+    fetch_max_connections: int = 100  # Pooled connections per worker process
+    fetch_max_connections_per_host: int = 6
+    fetch_http2: bool = True  # Used when the h2 package is installed
+    fetch_domain_rate: float = 1.0  # Fetches per second per domain, all workers (0 = no limit)
+    fetch_domain_burst: int = 5
+    fetch_domain_concurrency: int = 4  # In-flight fetches per domain, all workers
+    fetch_domain_busy_wait: float = 5.0  # Seconds to requeue for when the domain is at its cap
+    fetch_default_retry_after: float = 30.0  # Seconds, when a 429 has no Retry-After
+    fetch_max_deferrals: int = 20  # Requeues per article before giving up
 
     # Pipeline
+    # Celery worker threads: tasks mostly wait on fetches, the LLM and the CPU pool.
+    # The threads pool can't enforce a task time limit, so every stage has its own
+    # (fetch_deadline, llm_queue_timeout, summary_timeout, cpu_pool_timeout, tts_deadline)
+    worker_concurrency: int = 8
+    cpu_pool_workers: int = 2  # Processes for parse/chunk per worker (0 = run inline)
+    cpu_pool_start_method: str = "forkserver"  # Safe with the fetch engine's loop thread
+    cpu_pool_timeout: float = 60.0  # Seconds before a parse/chunk job is abandoned
+    parser_backend: str = "readability"  # readability, lxml or bs4 (backend.pipeline.parse)
     max_content_length: int = 1_000_000  # 1MB max article size
-    chunk_size: int = 1000  # Characters per chunk
-    max_chunks: int = 50
+    chunk_max_tokens: int = 256  # Model tokens per chunk
+    chunk_overlap_tokens: int = 0  # Tokens of whole sentences repeated between chunks
+    max_chunks: int = 200  # ~50k tokens, summarised map-reduce style when long
 
     # API
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+    batch_max_urls: int = 10_000  # URLs per bulk submission
+    max_submitted_html_bytes: int = 2_000_000  # Encoded size of client-supplied HTML
+
+    @field_validator("storage_dir")
+    @classmethod
+    def _absolute_storage_dir(cls, storage_dir: str) -> str:
+        # The API and workers must agree on it whatever directory they start in
+        path = Path(storage_dir).expanduser()
+        return str(path if path.is_absolute() else PROJECT_ROOT / path)
 
     class Config:
         env_file = ".env"
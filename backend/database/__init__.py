@@ -3,7 +3,7 @@ Database package initialization
 """
 
 from .connection import Base, SessionLocal, engine, get_db, init_db
-from .models import Article, ArticleStatus
+from .models import Article, ArticleStatus, SummaryCacheEntry
 
 __all__ = [
     "get_db",
@@ -13,4 +13,5 @@ __all__ = [
     "SessionLocal",
     "Article",
     "ArticleStatus",
+    "SummaryCacheEntry",
 ]
@@ -6,6 +6,8 @@ import enum
 import uuid
 
 from sqlalchemy import (
+    JSON,
+    Boolean,
     Column,
     DateTime,
     Integer,
@@ -15,7 +17,7 @@ from sqlalchemy import (
 from sqlalchemy import (
     Enum as SQLEnum,
 )
-from sqlalchemy.sql import func
+from sqlalchemy.sql import false, func
 
 from backend.config import get_settings
 
@@ -34,6 +36,7 @@ class ArticleStatus(str, enum.Enum):
     SUMMARIZING = "SUMMARIZING"
     RENDERING = "RENDERING"
     COMPLETED = "COMPLETED"
+    DEFERRED = "DEFERRED"  # Parsed, waiting for the LLM to recover before summarizing
     FAILED = "FAILED"
 
 
@@ -50,10 +53,15 @@ class Article(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, nullable=False, index=True)
     url = Column(String, nullable=False, unique=True)
+    canonical_url = Column(String, nullable=True, unique=True, index=True)  # See backend.urls
+    resolved_url = Column(String, nullable=True, index=True)  # Canonical redirect target
 
     # Content
     title = Column(String, nullable=True)
     raw_html = Column(Text, nullable=True)
+    html_sha256 = Column(String(64), nullable=True)  # Key into the HTML store
+    # The stored HTML was captured by the submitting client, not fetched by the server
+    html_submitted = Column(Boolean, default=False, server_default=false(), nullable=False)
     parsed_text = Column(Text, nullable=True)
     summary = Column(Text, nullable=True)
     audio_path = Column(String, nullable=True)
@@ -65,6 +73,7 @@ class Article(Base):
     # Metadata
     word_count = Column(Integer, nullable=True)
     chunk_count = Column(Integer, nullable=True)
+    metrics = Column(JSON, nullable=True)  # Per-article pipeline measurements (e.g. compression)
 
     # Timestamps
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
@@ -73,3 +82,23 @@ class Article(Base):
 
     def __repr__(self):
         return f"<Article(id='{self.id}', url='{self.url[:50]}...', status='{self.status}')>"
+
+
+class SummaryCacheEntry(Base):
+    """
+    Persistent tier of the summary cache (see backend.pipeline.summary_cache)
+    Only written when summary_cache_persist is enabled
+    """
+
+    __tablename__ = "summary_cache"
+    __table_args__ = {"schema": "public"} if "postgresql" in settings.database_url else {}
+
+    key = Column(String(64), primary_key=True)  # summary_cache_key(content_hash, title, ...)
+    content_hash = Column(String(64), nullable=False, index=True)
+    model = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    summary = Column(Text, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<SummaryCacheEntry(key='{self.key}', model='{self.model}')>"
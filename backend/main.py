@@ -8,7 +8,7 @@ from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 
-from backend.api import articles_router
+from backend.api import articles_router, audio_router, stats_router
 from backend.config import get_settings
 from backend.database import get_db
 
@@ -53,6 +53,8 @@ app.add_middleware(
 
 # Include routers
 app.include_router(articles_router)
+app.include_router(audio_router)
+app.include_router(stats_router)
 
 
 @app.get("/")
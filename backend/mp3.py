@@ -0,0 +1,178 @@
+"""
+MP3 frame handling for joining audio segments without re-encoding
+
+MPEG audio is a sequence of frames, so segments encoded with the same
+settings play back as one stream once their frames are written one after
+another. The per-file extras have to go: ID3 tags, and the Xing/Info frame
+whose frame count would describe just the first segment.
+
+The joins are not gapless. Every segment starts with the encoder's delay and
+ends with its padding, silence that a gapless player would skip using the
+LAME tag. Inside one stream that can only be removed a whole frame at a
+time: trailing frames holding nothing but padding are dropped, but the
+leading ones are kept because the first real samples are decoded from them
+(MDCT overlap and bit reservoir). At 22.05 kHz that leaves roughly 50-75 ms
+of silence at each join; files without a LAME tag keep all of their padding.
+"""
+
+from typing import Dict, Iterator, Optional, Tuple
+
+# Layer III bitrates (kbps) by bitrate index, for MPEG-1 and for MPEG-2/2.5
+BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+# Sample rates (Hz) by version bits: 3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5
+SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+ID3V1_SIZE = 128
+
+# Samples every Layer III decoder outputs before the first encoded one; the
+# padding in a LAME tag includes them
+DECODER_DELAY = 529
+
+# Sizes of the optional Xing/Info fields by flag: frames, bytes, TOC, quality
+XING_FIELDS = ((0x1, 4), (0x2, 4), (0x4, 100), (0x8, 4))
+
+# Encoder strings that start a LAME extension (FFmpeg writes the same layout)
+LAME_ENCODERS = (b"LAME", b"Lavc", b"Lavf")
+
+
+def _id3v2_size(data: bytes) -> int:
+    """Length of a leading ID3v2 tag (0 if there is none)"""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    # Syncsafe integer: 7 bits per byte
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _syncsafe(value: int) -> bytes:
+    return bytes((value >> shift) & 0x7F for shift in (21, 14, 7, 0))
+
+
+def id3v2_tag(text_frames: Dict[str, str]) -> bytes:
+    """
+    An ID3v2.4 tag of UTF-8 text frames, e.g. ``{"TSSE": "encoder settings"}``
+
+    Written once at the start of a joined file; segments' own tags are dropped.
+    """
+    frames = b""
+    for frame_id, text in text_frames.items():
+        data = b"\x03" + text.encode("utf-8")  # 3: UTF-8
+        frames += frame_id.encode("ascii") + _syncsafe(len(data)) + b"\x00\x00" + data
+    return b"ID3\x04\x00\x00" + _syncsafe(len(frames)) + frames
+
+
+def parse_frame_header(header: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Parse a Layer III frame header
+
+    Returns:
+        (frame length in bytes, offset of the Xing/Info tag within the frame),
+        or None if ``header`` is not a valid Layer III frame header
+    """
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x3
+    layer = (header[1] >> 1) & 0x3
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x3
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = BITRATES[1 if mpeg1 else 2][bitrate_index] * 1000
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    padding = (header[2] >> 1) & 0x1
+    length = (144 if mpeg1 else 72) * bitrate // sample_rate + padding
+
+    mono = header[3] >> 6 == 3
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    return length, 4 + side_info
+
+
+def encoder_gaps(frame: bytes, tag_offset: int) -> Optional[Tuple[int, int]]:
+    """
+    Encoder delay and padding in samples, from a Xing/Info frame's LAME extension
+
+    Returns:
+        (delay, padding), or None if the frame has no LAME extension
+    """
+    flags = int.from_bytes(frame[tag_offset + 4 : tag_offset + 8], "big")
+    offset = tag_offset + 8 + sum(size for flag, size in XING_FIELDS if flags & flag)
+    if bytes(frame[offset : offset + 4]) not in LAME_ENCODERS:
+        return None
+    # Encoder string (9), revision, lowpass, replay gain (8), flags, bitrate,
+    # then two 12-bit values
+    gaps = bytes(frame[offset + 21 : offset + 24])
+    if len(gaps) < 3:
+        return None
+    return (gaps[0] << 4) | (gaps[1] >> 4), ((gaps[1] & 0x0F) << 8) | gaps[2]
+
+
+def _scan_frames(data: bytes) -> Iterator[Tuple[memoryview, Optional[int]]]:
+    """Yield each Layer III frame of an MP3 file, with the offset of its Xing/Info tag if any"""
+    view = memoryview(data)
+    end = len(data)
+    if end >= ID3V1_SIZE and data[end - ID3V1_SIZE : end - ID3V1_SIZE + 3] == b"TAG":
+        end -= ID3V1_SIZE
+
+    position = _id3v2_size(data)
+    while position + 4 <= end:
+        parsed = parse_frame_header(data[position : position + 4])
+        if parsed is None:
+            # Resynchronise on the next possible frame start
+            position = data.find(b"\xff", position + 1, end)
+            if position < 0:
+                return
+            continue
+
+        length, tag_offset = parsed
+        if position + length > end:
+            return
+        tag = data[position + tag_offset : position + tag_offset + 4]
+        yield view[position : position + length], tag_offset if tag in (b"Xing", b"Info") else None
+        position += length
+
+
+def iter_frames(data: bytes) -> Iterator[memoryview]:
+    """
+    Yield the audio frames of an MP3 file
+
+    ID3v2/ID3v1 tags, Xing/Info header frames and any bytes between frames
+    are skipped.
+    """
+    for frame, info_offset in _scan_frames(data):
+        if info_offset is None:
+            yield frame
+
+
+def audio_frames(data: bytes) -> bytes:
+    """
+    The frames of one MP3 segment, ready to append to another segment's
+
+    If the encoder recorded its padding (LAME tag), trailing frames that
+    decode to padding only are dropped too. Decoding never needs later
+    frames, so this removes exactly their samples.
+    """
+    frames = []
+    padding = 0
+    for frame, info_offset in _scan_frames(data):
+        if info_offset is None:
+            frames.append(frame)
+        else:
+            gaps = encoder_gaps(frame, info_offset)
+            padding = gaps[1] if gaps else 0
+
+    if frames and padding > DECODER_DELAY:
+        samples = 1152 if (frames[0][1] >> 3) & 0x3 == 3 else 576
+        silent = min((padding - DECODER_DELAY) // samples, len(frames) - 1)
+        del frames[len(frames) - silent :]
+    return b"".join(frames)
@@ -3,7 +3,8 @@ Pipeline package - Processing stages for article ingestion
 """
 
 from .chunk import chunk_article
-from .fetch import fetch_article
+from .document import Document, parse_document
+from .fetch import fetch_article, fetch_article_async, fetch_page
 from .orchestrator import process_article_pipeline
 from .parse import parse_article
 from .render import render_article
@@ -11,8 +12,12 @@ from .summarize import summarize_article
 
 __all__ = [
     "fetch_article",
+    "fetch_article_async",
+    "fetch_page",
     "parse_article",
     "chunk_article",
+    "Document",
+    "parse_document",
     "summarize_article",
     "render_article",
     "process_article_pipeline",
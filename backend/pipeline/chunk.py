@@ -1,47 +1,246 @@
 """
 Stage 3: CHUNK - Split article into processable segments
+Linear-time, sentence-aware chunking sized in model tokens
 """
 
-from typing import List
+import re
+from collections import deque
+from typing import Iterator, List, NamedTuple, Optional, Tuple
 
 from backend.config import get_settings
 
+from .tokens import estimate_tokens
+
 settings = get_settings()
 
+# Candidate sentence ends: terminal punctuation (plus closing quotes/brackets)
+# followed by whitespace, or a line break. Each alternative starts with a
+# literal character, so the scan only stops where a boundary is possible.
+SENTENCE_BOUNDARY = re.compile(r"(?P<punct>[.!?])(?P<close>[\"'”’)\]]*)\s+|\n\s*")
+WORD = re.compile(r"\S+")
 
-def chunk_article(text: str) -> List[str]:
+# Words that end with a period without ending the sentence
+ABBREVIATIONS = {
+    "mr",
+    "mrs",
+    "ms",
+    "dr",
+    "prof",
+    "sr",
+    "jr",
+    "st",
+    "mt",
+    "vs",
+    "etc",
+    "e.g",
+    "i.e",
+    "a.m",
+    "p.m",
+    "cf",
+    "al",
+    "inc",
+    "ltd",
+    "co",
+    "corp",
+    "no",
+    "fig",
+    "approx",
+    "dept",
+    "est",
+    "gen",
+    "gov",
+    "sen",
+    "rep",
+    "u.s",
+    "u.k",
+    "jan",
+    "feb",
+    "mar",
+    "apr",
+    "jun",
+    "jul",
+    "aug",
+    "sep",
+    "sept",
+    "oct",
+    "nov",
+    "dec",
+}
+
+
+class Chunk(NamedTuple):
+    """A chunk as offsets into the source text"""
+
+    start: int
+    end: int
+    tokens: int
+
+
+class ChunkPlan(NamedTuple):
+    """Chunks for a text and whether the ``max_chunks`` limit cut it short"""
+
+    chunks: List[Chunk]
+    truncated: bool
+    dropped_tokens: int  # Estimated tokens after the last kept chunk
+
+
+def _is_abbreviation(text: str, period: int) -> bool:
+    """Check whether the period at ``period`` ends an abbreviation or an initial"""
+    start = period
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    word = text[start:period].lower().lstrip("(\"'“‘")
+    if word in ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+        return True
+    # Dotted abbreviations such as "a.m", "U.S" or "Ph.D"
+    return "." in word and all(0 < len(part) <= 2 for part in word.split("."))
+
+
+def iter_sentence_spans(text: str) -> Iterator[Tuple[int, int]]:
     """
-    Split article text into chunks for processing
+    Yield (start, end) offsets of sentences, in one pass over the text
+
+    Sentences end at ``.``, ``?`` or ``!`` followed by whitespace, and at line
+    breaks. Periods after known abbreviations and single-letter initials are
+    not treated as sentence ends.
+    """
+    start = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        punct = match.group("punct")
+        if punct is None:
+            # Line break, after any trailing spaces
+            end = match.start()
+            while end > start and text[end - 1].isspace():
+                end -= 1
+        else:
+            if punct == "." and "\n" not in match.group() and _is_abbreviation(text, match.start()):
+                continue
+            # Closing quotes/brackets belong to the sentence they end
+            end = match.end("close")
+        if end > start:
+            yield start, end
+        start = match.end()
+
+    end = len(text.rstrip())
+    if end > start:
+        yield start, end
+
+
+def _split_oversized(text: str, start: int, end: int, max_tokens: int) -> Iterator[Chunk]:
+    """Split one sentence longer than ``max_tokens`` at word boundaries"""
+    piece_start = None
+    piece_end = start
+    piece_tokens = 0
+    for word in WORD.finditer(text, start, end):
+        tokens = estimate_tokens(word.group())
+        if piece_start is not None and piece_tokens + tokens > max_tokens:
+            yield Chunk(piece_start, piece_end, piece_tokens)
+            piece_start = None
+            piece_tokens = 0
+        if piece_start is None:
+            piece_start = word.start()
+        piece_end = word.end()
+        piece_tokens += tokens
+    if piece_start is not None:
+        yield Chunk(piece_start, piece_end, piece_tokens)
+
+
+def iter_chunks(text: str, max_tokens: int, overlap_tokens: int = 0) -> Iterator[Chunk]:
+    """
+    Lazily group sentences into chunks of at most ``max_tokens`` tokens
+
+    Each sentence is tokenised once and chunks are emitted as offsets, so the
+    work is linear in the length of the text. Consecutive chunks share up to
+    ``overlap_tokens`` tokens of whole trailing sentences.
+
+    Args:
+        text: Text to chunk
+        max_tokens: Token budget per chunk
+        overlap_tokens: Tokens of context repeated from the previous chunk
+    """
+    current: deque = deque()  # Sentence spans (start, end, tokens) in the open chunk
+    current_tokens = 0
+
+    def emit() -> Chunk:
+        return Chunk(current[0][0], current[-1][1], current_tokens)
+
+    for start, end in iter_sentence_spans(text):
+        tokens = estimate_tokens(text[start:end])
+        pieces = (
+            list(_split_oversized(text, start, end, max_tokens))
+            if tokens > max_tokens
+            else [Chunk(start, end, tokens)]
+        )
+
+        for piece in pieces:
+            if current and current_tokens + piece.tokens > max_tokens:
+                yield emit()
+
+                # Carry whole trailing sentences over as overlap
+                kept: deque = deque()
+                kept_tokens = 0
+                while current and kept_tokens + current[-1][2] <= overlap_tokens:
+                    sentence = current.pop()
+                    kept.appendleft(sentence)
+                    kept_tokens += sentence[2]
+                # Never let the overlap push the next sentence over budget
+                while kept and kept_tokens + piece.tokens > max_tokens:
+                    kept_tokens -= kept.popleft()[2]
+                current, current_tokens = kept, kept_tokens
+
+            current.append(piece)
+            current_tokens += piece.tokens
+
+    if current:
+        yield emit()
+
+
+def plan_chunks(
+    text: str,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: Optional[int] = None,
+    max_chunks: Optional[int] = None,
+) -> ChunkPlan:
+    """
+    Chunk a text up to the chunk limit, reporting anything left out
 
     Args:
         text: Parsed article text
+        max_tokens: Token budget per chunk (default ``settings.chunk_max_tokens``)
+        overlap_tokens: Overlap between chunks (default ``settings.chunk_overlap_tokens``)
+        max_chunks: Chunk limit (default ``settings.max_chunks``)
 
     Returns:
-        List of text chunks
+        ChunkPlan with chunk offsets and truncation details
     """
-    # Simple sentence-based chunking
-    # In production, use more sophisticated NLP chunking
+    max_tokens = max_tokens or settings.chunk_max_tokens
+    overlap_tokens = settings.chunk_overlap_tokens if overlap_tokens is None else overlap_tokens
+    max_chunks = max_chunks or settings.max_chunks
 
-    sentences = text.split(". ")
-    chunks = []
-    current_chunk = ""
+    chunks: List[Chunk] = []
+    for chunk in iter_chunks(text, max_tokens, overlap_tokens):
+        if len(chunks) >= max_chunks:
+            dropped = estimate_tokens(text[chunks[-1].end :])
+            return ChunkPlan(chunks, True, dropped)
+        chunks.append(chunk)
 
-    for sentence in sentences:
-        # Add sentence to current chunk if it fits
-        if len(current_chunk) + len(sentence) < settings.chunk_size:
-            current_chunk += sentence + ". "
-        else:
-            # Save current chunk and start new one
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            current_chunk = sentence + ". "
+    return ChunkPlan(chunks, False, 0)
 
-            # Safety limit
-            if len(chunks) >= settings.max_chunks:
-                break
 
-    # Add final chunk
-    if current_chunk:
-        chunks.append(current_chunk.strip())
+def chunk_article(text: str) -> List[str]:
+    """
+    Split article text into chunks for processing
 
-    return chunks
+    Args:
+        text: Parsed article text
+
+    Returns:
+        List of text chunks
+    """
+    plan = plan_chunks(text)
+    if plan.truncated:
+        print(
+            f"⚠️  Article truncated to {len(plan.chunks)} chunks, "
+            f"~{plan.dropped_tokens} tokens not included"
+        )
+    return [text[chunk.start : chunk.end] for chunk in plan.chunks]
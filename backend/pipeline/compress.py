@@ -0,0 +1,296 @@
+"""
+Stage 3b: COMPRESS - Shrink the article text before it is sent to the LLM
+
+Three passes over the sentences of the parsed text:
+
+1. Boilerplate: sentences matching known site furniture (cookie notices,
+   "share this", newsletter prompts) are dropped. Besides a seed list, short
+   sentences are counted across articles in Redis; a sentence seen in
+   ``compress_boilerplate_min_articles`` different articles is learned as
+   boilerplate.
+2. Near-duplicates: sentences whose word shingles overlap an earlier
+   sentence's by ``compress_duplicate_similarity`` (Jaccard) are dropped.
+3. Packing: if the text is still over ``compress_max_tokens``, the most
+   informative sentences (SumBasic: frequent article words) are kept up to
+   the budget, in their original order.
+"""
+
+import hashlib
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import redis
+
+from backend.config import get_settings
+from backend.redis_client import get_redis
+
+from .chunk import iter_sentence_spans
+from .document import Document
+from .tokens import estimate_tokens
+
+settings = get_settings()
+
+KEY_PREFIX = "digestible:boilerplate"
+
+WORD = re.compile(r"\w+")
+
+# Site furniture seen on most pages, before anything is learned
+SEED_BOILERPLATE = re.compile(
+    r"\b(?:"
+    r"(?:we|this (?:site|website)) uses? cookies|accept (?:all )?cookies|cookie (?:policy|settings)"
+    r"|share (?:this|on)|click to share|tweet this|follow us on"
+    r"|sign up for (?:our|the) newsletter|subscribe to (?:our|the) newsletter"
+    r"|(?:all rights reserved|terms of (?:use|service)|privacy policy)"
+    r"|advertisement|skip to (?:main )?content|read more:|related articles?"
+    r"|this article was (?:originally )?published"
+    r")\b",
+    re.IGNORECASE,
+)
+
+# Sentences longer than this are never boilerplate, seeded or learned
+BOILERPLATE_MAX_WORDS = 25
+
+# Words per shingle for near-duplicate detection
+SHINGLE_WORDS = 2
+
+# Shingles in more sentences than this are too common to find duplicates with
+SHINGLE_MAX_POSTINGS = 50
+
+# KEYS: phrase counts zset, article seen marker
+# ARGV: seen ttl (s), max phrases kept, phrase hashes...
+# Counts each phrase once per article, returns every phrase's count
+LEARN_SCRIPT = """
+local fresh = redis.call('SET', KEYS[2], '1', 'NX', 'EX', ARGV[1])
+local counts = {}
+for i = 3, #ARGV do
+    if fresh then
+        counts[i - 2] = redis.call('ZINCRBY', KEYS[1], 1, ARGV[i])
+    else
+        counts[i - 2] = redis.call('ZSCORE', KEYS[1], ARGV[i]) or 0
+    end
+end
+local limit = tonumber(ARGV[2])
+if fresh and redis.call('ZCARD', KEYS[1]) > limit * 1.1 then
+    -- Forget the rarest phrases
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -(limit + 1))
+end
+return counts
+"""
+
+
+def _normalize(sentence: str) -> str:
+    return " ".join(WORD.findall(sentence.lower()))
+
+
+def phrase_hash(sentence: str) -> str:
+    """Short digest of a sentence's words, ignoring case and punctuation"""
+    return hashlib.sha1(_normalize(sentence).encode("utf-8")).hexdigest()[:16]
+
+
+class BoilerplateLexicon:
+    """
+    Boilerplate phrases learned from how often sentences recur across articles
+
+    Redis errors fail open: only the seed patterns are used.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self._client = client
+        self._script = None
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    def learn(self, content_hash: str, sentences: Sequence[str]) -> List[bool]:
+        """
+        Count an article's short sentences and report which are boilerplate
+
+        An article is only counted once, however often it is compressed.
+        """
+        # Long sentences are content even when they mention cookies or privacy policies
+        short = [len(sentence.split()) <= BOILERPLATE_MAX_WORDS for sentence in sentences]
+        flags = [
+            is_short and bool(SEED_BOILERPLATE.search(sentence))
+            for sentence, is_short in zip(sentences, short, strict=True)
+        ]
+        candidates: Dict[str, List[int]] = defaultdict(list)
+        for i, sentence in enumerate(sentences):
+            if short[i] and not flags[i]:
+                candidates[phrase_hash(sentence)].append(i)
+        if not candidates or settings.compress_boilerplate_min_articles <= 0:
+            return flags
+
+        try:
+            if self._script is None:
+                self._script = self.client.register_script(LEARN_SCRIPT)
+            counts = self._script(
+                keys=[f"{KEY_PREFIX}:phrases", f"{KEY_PREFIX}:seen:{content_hash}"],
+                args=[30 * 24 * 3600, settings.compress_boilerplate_phrases, *candidates],
+            )
+        except redis.RedisError as e:
+            print(f"⚠️  Boilerplate lexicon unavailable: {e}")
+            return flags
+
+        for indices, count in zip(candidates.values(), counts, strict=True):
+            if float(count) >= settings.compress_boilerplate_min_articles:
+                for index in indices:
+                    flags[index] = True
+        return flags
+
+
+def _shingles(sentence: str) -> frozenset:
+    words = _normalize(sentence).split()
+    if len(words) <= SHINGLE_WORDS:
+        return frozenset([" ".join(words)])
+    return frozenset(
+        " ".join(words[i : i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)
+    )
+
+
+def near_duplicates(sentences: Sequence[str], threshold: float) -> List[bool]:
+    """
+    Flag sentences that repeat an earlier (kept) sentence
+
+    Candidates are found through an inverted index of shingles, so each
+    sentence is only compared with sentences it shares wording with.
+    """
+    postings: Dict[str, List[int]] = defaultdict(list)
+    shingle_sets: List[frozenset] = []
+    flags = []
+    for index, sentence in enumerate(sentences):
+        shingles = _shingles(sentence)
+        shingle_sets.append(shingles)
+        overlaps = Counter(
+            other
+            for shingle in shingles
+            if len(postings.get(shingle, ())) <= SHINGLE_MAX_POSTINGS
+            for other in postings.get(shingle, ())
+        )
+        duplicate = any(
+            shared / (len(shingles) + len(shingle_sets[other]) - shared) >= threshold
+            for other, shared in overlaps.items()
+        )
+        flags.append(duplicate)
+        if not duplicate:
+            for shingle in shingles:
+                postings[shingle].append(index)
+    return flags
+
+
+def informativeness(sentences: Sequence[str]) -> List[float]:
+    """SumBasic score: mean article frequency of each sentence's words"""
+    words = [[w for w in _normalize(sentence).split() if len(w) > 3] for sentence in sentences]
+    frequency = Counter(w for sentence_words in words for w in sentence_words)
+    total = sum(frequency.values()) or 1
+    return [
+        (
+            sum(frequency[w] for w in sentence_words) / total / len(sentence_words)
+            if sentence_words
+            else 0.0
+        )
+        for sentence_words in words
+    ]
+
+
+class Compression(NamedTuple):
+    """A compressed document and what was removed from it"""
+
+    document: Document
+    original_tokens: int
+    tokens: int
+    boilerplate: int  # Sentences dropped as boilerplate
+    duplicates: int  # Sentences dropped as near-duplicates
+    packed_out: int  # Sentences left out to fit the token budget
+
+    @property
+    def ratio(self) -> float:
+        """Compressed size as a fraction of the original (1.0 = unchanged)"""
+        return self.tokens / self.original_tokens if self.original_tokens else 1.0
+
+    def metrics(self) -> dict:
+        return {
+            "original_tokens": self.original_tokens,
+            "tokens": self.tokens,
+            "ratio": round(self.ratio, 3),
+            "boilerplate": self.boilerplate,
+            "duplicates": self.duplicates,
+            "packed_out": self.packed_out,
+        }
+
+
+def compress_document(
+    document: Document, lexicon: Optional[BoilerplateLexicon] = None
+) -> Compression:
+    """
+    Remove boilerplate and repetition, then pack the text into the token budget
+
+    Args:
+        document: Parsed article
+        lexicon: Boilerplate lexicon (defaults to the shared one)
+
+    Returns:
+        Compression whose document holds the text to summarise
+    """
+    text = document.text
+    spans = list(iter_sentence_spans(text))
+    sentences = [text[start:end] for start, end in spans]
+    # Whether a line break follows each sentence, to keep paragraphs apart
+    breaks = [
+        "\n" in text[end : spans[i + 1][0] if i + 1 < len(spans) else len(text)]
+        for i, (_, end) in enumerate(spans)
+    ]
+
+    boilerplate = (lexicon or get_boilerplate_lexicon()).learn(document.content_hash, sentences)
+    duplicates = near_duplicates(sentences, settings.compress_duplicate_similarity)
+    keep = [not (b or d) for b, d in zip(boilerplate, duplicates, strict=True)]
+
+    tokens = [estimate_tokens(sentence) for sentence in sentences]
+    budget = settings.compress_max_tokens
+    kept_tokens = sum(t for t, k in zip(tokens, keep, strict=True) if k)
+    packed_out = 0
+    if budget and kept_tokens > budget:
+        scores = informativeness(sentences)
+        ranked = sorted((i for i in range(len(sentences)) if keep[i]), key=lambda i: -scores[i])
+        kept_tokens = 0
+        for index in ranked:
+            if kept_tokens + tokens[index] <= budget:
+                kept_tokens += tokens[index]
+            else:
+                keep[index] = False
+                packed_out += 1
+
+    pieces = []
+    for index, sentence in enumerate(sentences):
+        if keep[index]:
+            pieces.append(sentence)
+            pieces.append("\n" if breaks[index] else " ")
+        elif breaks[index] and pieces:
+            pieces[-1] = "\n"
+    compressed = "".join(pieces).strip()
+
+    return Compression(
+        document=Document(document.title, compressed) if compressed else document,
+        original_tokens=document.token_count,
+        tokens=estimate_tokens(compressed) if compressed else document.token_count,
+        boilerplate=sum(1 for b in boilerplate if b),
+        duplicates=sum(1 for b, d in zip(boilerplate, duplicates, strict=True) if d and not b),
+        packed_out=packed_out,
+    )
+
+
+# Global lexicon instance
+_boilerplate_lexicon = None
+_boilerplate_lexicon_lock = threading.Lock()
+
+
+def get_boilerplate_lexicon() -> BoilerplateLexicon:
+    """Get or create the shared boilerplate lexicon"""
+    global _boilerplate_lexicon
+    if _boilerplate_lexicon is None:
+        with _boilerplate_lexicon_lock:
+            if _boilerplate_lexicon is None:
+                _boilerplate_lexicon = BoilerplateLexicon()
+    return _boilerplate_lexicon
@@ -0,0 +1,101 @@
+"""
+Process pool for CPU-bound pipeline stages (parse, chunk)
+Lets heavy documents use other cores while the worker keeps doing network I/O
+
+The Celery worker runs tasks on threads (see ``backend.celery_app``): while one
+task waits here for its parse, the others keep fetching and summarising.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, TypeVar
+
+from backend.config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+# Process in which the pool could not be started (e.g. a daemonic prefork child)
+_unusable_pid: Optional[int] = None
+
+
+def get_cpu_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Get or create this process's CPU pool
+
+    Returns:
+        The pool, or None when ``settings.cpu_pool_workers`` is 0 (run inline)
+    """
+    global _pool, _pool_pid
+    if settings.cpu_pool_workers <= 0 or _unusable_pid == os.getpid():
+        return None
+
+    with _pool_lock:
+        # A forked child must not reuse its parent's pool
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.cpu_pool_workers,
+                mp_context=multiprocessing.get_context(settings.cpu_pool_start_method),
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def shutdown_cpu_pool():
+    """Stop the pool's processes (a new pool is created on next use)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+def submit_cpu_bound(func: Callable[..., T], *args) -> "Future[T]":
+    """
+    Schedule a pure function on the CPU pool
+
+    Falls back to running inline (returning a completed future) when the pool is
+    disabled or cannot be used in this process.
+    """
+    global _unusable_pid
+    pool = get_cpu_pool()
+    if pool is not None:
+        try:
+            return pool.submit(func, *args)
+        except BrokenProcessPool as e:
+            print(f"⚠️  CPU pool broke, running {func.__name__} inline: {e}")
+            shutdown_cpu_pool()
+        except (RuntimeError, AssertionError) as e:
+            # e.g. daemonic processes, which may not have children: stay inline from now on
+            print(f"⚠️  CPU pool unavailable in this process, running parse/chunk inline: {e}")
+            shutdown_cpu_pool()
+            _unusable_pid = os.getpid()
+
+    future: "Future[T]" = Future()
+    try:
+        future.set_result(func(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def run_cpu_bound(func: Callable[..., T], *args) -> T:
+    """
+    Run a pure function on the CPU pool and wait for its result
+
+    Functions and arguments must be picklable; results are identical to calling
+    ``func(*args)`` inline.
+    """
+    try:
+        return submit_cpu_bound(func, *args).result(timeout=settings.cpu_pool_timeout)
+    except BrokenProcessPool as e:
+        print(f"⚠️  CPU pool broke, running {func.__name__} inline: {e}")
+        shutdown_cpu_pool()
+        return func(*args)
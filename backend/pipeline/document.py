@@ -0,0 +1,81 @@
+"""
+Per-article document statistics, computed once after parsing
+
+The text is split, counted and hashed a single time; later stages read the
+results from the ``Document`` instead of re-scanning the text.
+"""
+
+import hashlib
+from typing import Iterator, List, Optional
+
+from .chunk import Chunk, plan_chunks
+from .parse import parse_article
+from .tokens import estimate_tokens
+
+
+class Document:
+    """Parsed article text with its chunk plan, counts and content hash"""
+
+    __slots__ = (
+        "title",
+        "text",
+        "chunks",
+        "truncated",
+        "dropped_tokens",
+        "word_count",
+        "token_count",
+        "content_hash",
+    )
+
+    def __init__(self, title: str, text: str):
+        plan = plan_chunks(text)
+        self.title = title
+        self.text = text
+        self.chunks: List[Chunk] = plan.chunks
+        self.truncated = plan.truncated
+        self.dropped_tokens = plan.dropped_tokens
+        self.word_count = len(text.split())
+        self.token_count = estimate_tokens(text)
+        self.content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def __repr__(self) -> str:
+        return (
+            f"Document(title={self.title!r}, words={self.word_count}, "
+            f"tokens={self.token_count}, chunks={len(self.chunks)})"
+        )
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self.chunks)
+
+    @property
+    def chunked_tokens(self) -> int:
+        """Estimated tokens across the kept chunks (overlap counted per chunk)"""
+        return sum(chunk.tokens for chunk in self.chunks)
+
+    def iter_chunk_texts(self) -> Iterator[str]:
+        """Yield chunk texts, sliced from the document text on demand"""
+        for chunk in self.chunks:
+            yield self.text[chunk.start : chunk.end]
+
+    def chunk_texts(self) -> List[str]:
+        return list(self.iter_chunk_texts())
+
+
+def parse_document(html: str, backend: Optional[str] = None) -> Optional[Document]:
+    """
+    Parse HTML and build its ``Document`` in one step
+
+    Runs as a single CPU-pool job, so the text crosses the process boundary once.
+
+    Args:
+        html: Raw HTML content
+        backend: Optional parser backend name
+
+    Returns:
+        Document, or None if parsing failed
+    """
+    parsed = parse_article(html, backend)
+    if not parsed:
+        return None
+    return Document(parsed["title"], parsed["text"])
@@ -1,15 +1,366 @@
 """
 Stage 1: FETCH - Download HTML content from URL
+Pooled async HTTP engine shared across the worker process
 """
 
-from typing import Optional
+import asyncio
+import atexit
+import codecs
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
 
-import requests
+import httpx
 
 from backend.config import get_settings
 
+from .html_store import HTMLStore, get_html_store
+from .politeness import (
+    DomainLimiter,
+    FetchDeferred,
+    domain_of,
+    get_domain_limiter,
+    parse_retry_after,
+)
+
 settings = get_settings()
 
+# HTTP/2 needs the optional ``h2`` package (``httpx[http2]``)
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/91.0.4472.124 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+
+def check_response_headers(response: httpx.Response):
+    """
+    Reject a response from its headers, before any of the body is read
+
+    Raises:
+        ValueError: If the content is not HTML or declares a length over budget
+    """
+    content_type = response.headers.get("content-type", "")
+    if "text/html" not in content_type:
+        raise ValueError(f"Invalid content type: {content_type}")
+
+    content_length = response.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > settings.max_content_length:
+            raise ValueError(f"Content too large: {content_length} bytes")
+
+
+async def read_html_body(response: httpx.Response) -> str:
+    """
+    Stream and incrementally decode a response body
+
+    Stops reading as soon as ``max_content_length`` decoded bytes are exceeded,
+    so at most one network chunk over the budget is ever held in memory.
+
+    Raises:
+        ValueError: If the body exceeds the byte budget
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")("replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+
+    parts = []
+    received = 0
+    async for chunk in response.aiter_bytes():
+        received += len(chunk)
+        if received > settings.max_content_length:
+            raise ValueError(f"Content too large: over {settings.max_content_length} bytes")
+        parts.append(decoder.decode(chunk))
+
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def conditional_headers(validators: Dict[str, str]) -> Dict[str, str]:
+    """Build If-None-Match / If-Modified-Since headers from stored validators"""
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def _load_cached(store: HTMLStore, url: str) -> Optional[Tuple[Dict[str, str], str]]:
+    """Get a URL's validators and cached body, if both are still present"""
+    validators = store.get_validators(url)
+    if not validators:
+        return None
+    html = store.get(validators["sha256"])
+    if html is None:
+        return None
+    return validators, html
+
+
+def _store_fetched(store: HTMLStore, url: str, page: "FetchedPage", response: httpx.Response):
+    """Save a fetched body and the validators needed to revalidate it"""
+    digest = store.put(page.html)
+    store.record(
+        url,
+        digest,
+        etag=response.headers.get("etag"),
+        last_modified=response.headers.get("last-modified"),
+        final_url=page.url,
+    )
+
+
+class FetchedPage(NamedTuple):
+    """HTML of a fetched page and the URL it was finally served from"""
+
+    html: str
+    url: str  # After redirects
+
+
+class FetchEngine:
+    """
+    Process-wide pooled HTTP client
+
+    Runs one ``httpx.AsyncClient`` on a background event loop so sync callers
+    (Celery tasks) and async callers share the same keep-alive connection pool.
+    Connections per host are capped with a semaphore per hostname. Fetched
+    bodies go to the HTML store, and re-fetches are sent as conditional requests.
+    Every request is also admitted by the cross-worker per-domain limiter.
+    """
+
+    def __init__(
+        self,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        store: Optional[HTMLStore] = None,
+        limiter: Optional[DomainLimiter] = None,
+    ):
+        self._transport = transport
+        self._store = store
+        self._limiter = limiter
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        """Drop loop state (also used after a fork, where the loop thread is gone)"""
+        self._pid = os.getpid()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop on first use in this process"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="digestible-fetch", daemon=True
+                )
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+
+            return self._loop
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create the pooled client lazily, inside the engine loop"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=DEFAULT_HEADERS,
+                http2=settings.fetch_http2 and HTTP2_AVAILABLE,
+                follow_redirects=True,
+                timeout=httpx.Timeout(
+                    settings.fetch_timeout, connect=settings.fetch_connect_timeout
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.fetch_max_connections,
+                    max_keepalive_connections=settings.fetch_max_connections,
+                    keepalive_expiry=30.0,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        """Get the per-host concurrency limiter for a URL"""
+        host = (urlsplit(url).hostname or "").lower()
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = asyncio.Semaphore(settings.fetch_max_connections_per_host)
+            self._host_slots[host] = slot
+        return slot
+
+    async def _fetch(self, url: str) -> Optional[FetchedPage]:
+        """
+        Fetch a URL on the engine loop, revalidating against the HTML store
+
+        Admission, download and storage together are cut off after
+        ``settings.fetch_deadline``; a slow server can't hold a worker thread.
+        """
+        try:
+            async with asyncio.timeout(settings.fetch_deadline):
+                store = self._store or get_html_store()
+                limiter = self._limiter or get_domain_limiter()
+                cached = await asyncio.to_thread(_load_cached, store, url)
+                headers = conditional_headers(cached[0]) if cached else {}
+
+                lease = await asyncio.to_thread(limiter.acquire, url)
+                try:
+                    async with self._host_slot(url):
+                        async with self._get_client().stream(
+                            "GET", url, headers=headers
+                        ) as response:
+                            if response.status_code == 304 and cached:
+                                validators, html = cached
+                                return FetchedPage(html, validators.get("final_url") or url)
+
+                            retry_after = parse_retry_after(response.headers.get("retry-after"))
+                            if response.status_code == 429 or (
+                                response.status_code == 503 and retry_after is not None
+                            ):
+                                if retry_after is None:
+                                    retry_after = settings.fetch_default_retry_after
+                                await asyncio.to_thread(limiter.defer, url, retry_after)
+                                raise FetchDeferred(domain_of(url), retry_after)
+
+                            response.raise_for_status()
+                            check_response_headers(response)
+                            page = FetchedPage(await read_html_body(response), str(response.url))
+                finally:
+                    await asyncio.to_thread(limiter.release, url, lease)
+
+                await asyncio.to_thread(_store_fetched, store, url, page, response)
+                return page
+
+        except FetchDeferred:
+            raise
+        except httpx.HTTPError as e:
+            print(f"HTTP error fetching {url}: {e}")
+            return None
+        except TimeoutError:
+            print(f"Fetching {url} took longer than {settings.fetch_deadline}s, giving up")
+            return None
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+
+    async def fetch(self, url: str) -> Optional[str]:
+        """Fetch a URL from any event loop"""
+        future = asyncio.run_coroutine_threadsafe(self._fetch(url), self._ensure_loop())
+        page = await asyncio.wrap_future(future)
+        return page.html if page else None
+
+    def fetch_page_sync(self, url: str) -> Optional[FetchedPage]:
+        """Fetch a URL with its final URL, blocking the calling thread until it completes"""
+        return asyncio.run_coroutine_threadsafe(self._fetch(url), self._ensure_loop()).result()
+
+    def fetch_sync(self, url: str) -> Optional[str]:
+        """Fetch a URL, blocking the calling thread until it completes"""
+        page = self.fetch_page_sync(url)
+        return page.html if page else None
+
+    def fetch_many_sync(self, urls: List[str]) -> List[Optional[str]]:
+        """Fetch several URLs concurrently, blocking until all complete"""
+
+        async def _gather():
+            results = await asyncio.gather(
+                *(self._fetch(url) for url in urls), return_exceptions=True
+            )
+            # Deferred domains are reported as failed fetches here
+            return [r.html if isinstance(r, FetchedPage) else None for r in results]
+
+        return asyncio.run_coroutine_threadsafe(_gather(), self._ensure_loop()).result()
+
+    def close(self):
+        """Close pooled connections and stop the engine loop"""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                return
+            if self._client is not None:
+                asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+            self._reset()
+
+
+# Global fetch engine instance
+_fetch_engine = None
+_fetch_engine_lock = threading.Lock()
+
+
+def get_fetch_engine() -> FetchEngine:
+    """Get or create fetch engine instance"""
+    global _fetch_engine
+    if _fetch_engine is None:
+        with _fetch_engine_lock:
+            if _fetch_engine is None:
+                _fetch_engine = FetchEngine()
+                atexit.register(_fetch_engine.close)
+    return _fetch_engine
+
+
+async def fetch_article_async(url: str) -> Optional[str]:
+    """
+    Fetch HTML content from a URL without blocking the caller's event loop
+
+    Args:
+        url: The URL to fetch
+
+    Returns:
+        HTML content as string, or None if failed
+
+    Raises:
+        FetchDeferred: If the domain is rate limited and the fetch should be retried later
+    """
+    return await get_fetch_engine().fetch(url)
+
+
+def fetch_articles(urls: List[str]) -> List[Optional[str]]:
+    """
+    Fetch several URLs concurrently over the shared connection pool
+
+    Args:
+        urls: The URLs to fetch
+
+    Returns:
+        HTML content (or None, including for rate-limited domains) for each URL, in order
+    """
+    return get_fetch_engine().fetch_many_sync(urls)
+
+
+def fetch_page(url: str) -> Optional[FetchedPage]:
+    """
+    Fetch a page along with the URL it was served from after redirects
+
+    Args:
+        url: The URL to fetch
+
+    Returns:
+        Fetched page, or None if failed
+
+    Raises:
+        FetchDeferred: If the domain is rate limited and the fetch should be retried later
+    """
+    return get_fetch_engine().fetch_page_sync(url)
+
 
 def fetch_article(url: str) -> Optional[str]:
     """
@@ -20,39 +371,8 @@ def fetch_article(url: str) -> Optional[str]:
 
     Returns:
         HTML content as string, or None if failed
+
+    Raises:
+        FetchDeferred: If the domain is rate limited and the fetch should be retried later
     """
-    try:
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/91.0.4472.124 Safari/537.36"
-            ),
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-        }
-
-        response = requests.get(url, headers=headers, timeout=30.0, allow_redirects=True)
-        response.raise_for_status()
-
-        # Check content type
-        content_type = response.headers.get("content-type", "")
-        if "text/html" not in content_type:
-            raise ValueError(f"Invalid content type: {content_type}")
-
-        # Check content length
-        html = response.text
-        if len(html) > settings.max_content_length:
-            raise ValueError(f"Content too large: {len(html)} bytes")
-
-        return html
-
-    except requests.RequestException as e:
-        print(f"HTTP error fetching {url}: {e}")
-        return None
-    except Exception as e:
-        print(f"Error fetching {url}: {e}")
-        return None
+    return get_fetch_engine().fetch_sync(url)
@@ -0,0 +1,110 @@
+"""
+Content-addressed raw HTML store
+Gzip-compressed blobs keyed by SHA-256, plus per-URL HTTP validators
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from backend.config import get_settings
+
+settings = get_settings()
+
+
+def content_sha256(html: str) -> str:
+    """SHA-256 hex digest of the UTF-8 encoded HTML"""
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Write a file via rename so readers never see a partial blob"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class HTMLStore:
+    """
+    Filesystem HTML cache
+
+    Layout under ``root``:
+        html/<aa>/<sha256>.html.gz  - compressed page bodies, shared by identical pages
+        urls/<aa>/<sha256(url)>.json - last ETag/Last-Modified, digest and final URL per URL
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "html" / digest[:2] / f"{digest}.html.gz"
+
+    def _url_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / "urls" / key[:2] / f"{key}.json"
+
+    def put(self, html: str) -> str:
+        """Store HTML and return its digest (no-op if already stored)"""
+        digest = content_sha256(html)
+        path = self._blob_path(digest)
+        if not path.exists():
+            _atomic_write(path, gzip.compress(html.encode("utf-8"), compresslevel=6))
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        """Load HTML by digest, or None if not stored"""
+        try:
+            return gzip.decompress(self._blob_path(digest).read_bytes()).decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+    def get_validators(self, url: str) -> Optional[Dict[str, str]]:
+        """Get the digest and HTTP validators recorded for a URL"""
+        try:
+            return json.loads(self._url_path(url).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def record(
+        self,
+        url: str,
+        digest: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        final_url: Optional[str] = None,
+    ):
+        """Record which body a URL served, with its HTTP validators and redirect target"""
+        record = {
+            "url": url,
+            "sha256": digest,
+            "etag": etag,
+            "last_modified": last_modified,
+            "final_url": final_url or url,
+        }
+        _atomic_write(self._url_path(url), json.dumps(record).encode("utf-8"))
+
+
+# Global HTML store instance
+_html_store = None
+_html_store_lock = threading.Lock()
+
+
+def get_html_store() -> HTMLStore:
+    """Get or create HTML store instance"""
+    global _html_store
+    if _html_store is None:
+        with _html_store_lock:
+            if _html_store is None:
+                _html_store = HTMLStore(Path(settings.storage_dir))
+    return _html_store
@@ -0,0 +1,382 @@
+"""
+Shared OpenRouter client
+Pooled connections, jittered backoff, per-model circuit breakers and fallback models
+"""
+
+import json
+import random
+import threading
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+import redis
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend.config import get_settings
+from backend.redis_client import get_redis
+
+from .llm_router import ModelStats, get_model_stats
+from .llm_scheduler import PRIORITY_INTERACTIVE, QuotaExhausted, get_llm_scheduler
+from .politeness import parse_retry_after
+from .tokens import estimate_tokens
+
+settings = get_settings()
+
+KEY_PREFIX = "digestible:llm:breaker"
+
+# KEYS: failure counter, open flag
+# ARGV: failure threshold, window (ms), cooldown (ms)
+# Returns 1 when this failure opened the circuit
+FAILURE_SCRIPT = """
+local failures = redis.call('INCR', KEYS[1])
+if failures == 1 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+if failures >= tonumber(ARGV[1]) then
+    redis.call('SET', KEYS[2], '1', 'PX', ARGV[3])
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+return 0
+"""
+
+
+class LLMUnavailable(Exception):
+    """Raised when no model can currently serve a completion; retry after a delay"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"LLM unavailable ({reason}), retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class Completion(NamedTuple):
+    """Completion text, the model that produced it and how long its request took"""
+
+    text: str
+    model: str
+    seconds: float = 0.0
+
+
+class CompletionListener:
+    """Receives a streamed completion while it is generated"""
+
+    def on_delta(self, text: str):
+        """A new piece of completion text"""
+
+    def on_restart(self):
+        """Text received so far is void; the request is being retried or sent to a fallback"""
+
+
+class _TransientError(Exception):
+    """429, 5xx, timeout or malformed response: worth retrying or falling back"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one model, shared by all workers
+
+    ``llm_breaker_threshold`` transient failures within ``llm_breaker_window``
+    seconds open the circuit for ``llm_breaker_cooldown`` seconds. Once it
+    closes, the next request is the probe: a success resets the count.
+    Redis errors leave the circuit closed (requests are allowed).
+    """
+
+    def __init__(self, model: str, client: Optional[redis.Redis] = None):
+        self.model = model
+        self._client = client
+        self._failure_script = None
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    def _keys(self):
+        return f"{KEY_PREFIX}:{self.model}:failures", f"{KEY_PREFIX}:{self.model}:open"
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit closes (0 when requests are allowed)"""
+        try:
+            remaining = self.client.pttl(self._keys()[1])
+        except redis.RedisError as e:
+            print(f"⚠️  Circuit breaker unavailable for {self.model}: {e}")
+            return 0.0
+        return remaining / 1000 if remaining > 0 else 0.0
+
+    def record_success(self):
+        try:
+            self.client.delete(self._keys()[0])
+        except redis.RedisError as e:
+            print(f"⚠️  Circuit breaker unavailable for {self.model}: {e}")
+
+    def record_failure(self):
+        try:
+            if self._failure_script is None:
+                self._failure_script = self.client.register_script(FAILURE_SCRIPT)
+            opened = self._failure_script(
+                keys=list(self._keys()),
+                args=[
+                    settings.llm_breaker_threshold,
+                    int(settings.llm_breaker_window * 1000),
+                    int(settings.llm_breaker_cooldown * 1000),
+                ],
+            )
+        except redis.RedisError as e:
+            print(f"⚠️  Circuit breaker unavailable for {self.model}: {e}")
+            return
+        if opened:
+            print(f"🔌 Circuit opened for {self.model} ({settings.llm_breaker_cooldown:.0f}s)")
+
+
+class LLMClient:
+    """
+    Chat completion client with one pooled session per process
+
+    Each model is retried on 429, 5xx, timeouts and connection errors with
+    full-jitter exponential backoff (honouring Retry-After), then the next
+    fallback model is tried. Models whose circuit is open are skipped; when
+    every model is skipped or failing, ``LLMUnavailable`` is raised.
+    Other 4xx responses are not retried. Every request is first admitted by
+    the shared ``LLMScheduler`` so all workers stay within the account quota,
+    and its latency and outcome are recorded for the model router.
+    """
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        breaker_factory=None,
+        scheduler=None,
+        stats: Optional[ModelStats] = None,
+    ):
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=settings.llm_pool_size, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(
+                {
+                    "Content-Type": "application/json",
+                    "HTTP-Referer": "https://digestible.app",
+                    "X-Title": "Digestible",
+                }
+            )
+        self.session = session
+        self.scheduler = scheduler or get_llm_scheduler()
+        self.stats = stats or get_model_stats()
+        self._breaker_factory = breaker_factory or CircuitBreaker
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+
+    @property
+    def models(self) -> List[str]:
+        """Primary model followed by the fallbacks, without duplicates"""
+        return list(dict.fromkeys([settings.summary_model, *settings.summary_fallback_models]))
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        if model not in self._breakers:
+            with self._breakers_lock:
+                if model not in self._breakers:
+                    self._breakers[model] = self._breaker_factory(model)
+        return self._breakers[model]
+
+    def complete(
+        self,
+        prompt: str,
+        listener: Optional[CompletionListener] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        models: Optional[List[str]] = None,
+    ) -> Completion:
+        """
+        Run one chat completion, falling back through the models in order
+
+        With a ``listener`` the completion is streamed and each piece of text is
+        passed on as it arrives; the full text is still returned. ``models``
+        defaults to the primary model and its fallbacks (see ``llm_router``
+        for routed model lists).
+
+        Raises:
+            LLMUnavailable: every model's circuit is open, its retries ran out,
+                or the request queued too long for quota
+            requests.HTTPError: non-retryable error response (e.g. 401)
+        """
+        waits = []
+        last_error = None
+        for model in models or self.models:
+            breaker = self.breaker(model)
+            wait = breaker.retry_after()
+            if wait:
+                waits.append(wait)
+                continue
+            try:
+                return self._complete_with_retries(model, prompt, breaker, listener, priority)
+            except QuotaExhausted as e:
+                raise LLMUnavailable("quota queue full", e.retry_after) from e
+            except _TransientError as e:
+                last_error = e
+                print(f"⚠️  {model} unavailable, trying next model: {e}")
+                waits.append(breaker.retry_after() or settings.llm_backoff_max)
+
+        reason = str(last_error) if last_error else "all circuits open"
+        raise LLMUnavailable(reason, min(waits, default=settings.llm_breaker_cooldown))
+
+    def _complete_with_retries(
+        self,
+        model: str,
+        prompt: str,
+        breaker: CircuitBreaker,
+        listener: Optional[CompletionListener],
+        priority: int,
+    ) -> Completion:
+        attempt = 0
+        while True:
+            try:
+                return self._post(model, prompt, breaker, listener, priority)
+            except _TransientError as e:
+                breaker.record_failure()
+                if attempt >= settings.llm_max_retries or breaker.retry_after():
+                    raise
+                retry_after = e.retry_after
+
+            # Full jitter: uniform in [0, base * 2^attempt], at least any Retry-After
+            delay = random.uniform(0, settings.llm_backoff_base * 2**attempt)
+            time.sleep(min(max(delay, retry_after or 0), settings.llm_backoff_max))
+            attempt += 1
+
+    def _post(
+        self,
+        model: str,
+        prompt: str,
+        breaker: CircuitBreaker,
+        listener: Optional[CompletionListener],
+        priority: int,
+    ) -> Completion:
+        payload = {"model": model, "messages": [{"role": "user", "content": prompt}]}
+        if listener:
+            payload["stream"] = True
+
+        # Reserve quota for the prompt and a typical completion
+        prompt_tokens = estimate_tokens(prompt)
+        reserved = prompt_tokens + settings.llm_completion_tokens
+        self.scheduler.acquire(reserved, priority)
+        # Timed from admission, so quota queueing doesn't count as model latency
+        start = time.monotonic()
+        try:
+            text, usage = self._request(model, payload, listener)
+        except Exception as e:
+            # Failed requests report no usage: give the reserved tokens back
+            self.scheduler.settle(reserved, 0)
+            if isinstance(e, _TransientError):
+                self.stats.record(model, time.monotonic() - start, ok=False)
+            raise
+        seconds = time.monotonic() - start
+        self.stats.record(model, seconds, ok=True)
+
+        used = (usage or {}).get("total_tokens") or prompt_tokens + estimate_tokens(text)
+        self.scheduler.settle(reserved, used)
+        breaker.record_success()
+        return Completion(text, model, seconds)
+
+    def _request(
+        self, model: str, payload: dict, listener: Optional[CompletionListener]
+    ) -> Tuple[str, Optional[dict]]:
+        """Send one request; returns (text, usage)"""
+        deadline = time.monotonic() + settings.summary_timeout
+        try:
+            response = self.session.post(
+                f"{settings.openrouter_base_url.rstrip('/')}/chat/completions",
+                headers={"Authorization": f"Bearer {settings.openrouter_api_key}"},
+                json=payload,
+                timeout=settings.summary_timeout,
+                stream=bool(listener),
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise _TransientError(f"{type(e).__name__}: {e}") from e
+
+        with response:
+            if response.status_code == 429 or response.status_code >= 500:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if response.status_code == 429:
+                    # The account quota is the shared limit: hold back every worker
+                    self.scheduler.pause(retry_after or settings.llm_default_retry_after)
+                raise _TransientError(f"HTTP {response.status_code}", retry_after)
+            response.raise_for_status()
+
+            if listener:
+                text, usage = self._read_stream(response, listener, deadline)
+            else:
+                try:
+                    result = response.json()
+                    text = result["choices"][0]["message"]["content"].strip()
+                except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                    raise _TransientError(f"Malformed completion response: {e}") from e
+                usage = result.get("usage")
+        return text, usage
+
+    def _read_stream(
+        self, response: requests.Response, listener: CompletionListener, deadline: float
+    ) -> Tuple[str, Optional[dict]]:
+        """
+        Relay a server-sent-events completion to the listener; returns (text, usage)
+
+        The request timeout only bounds each read, so a stream that keeps
+        trickling is cut off at ``deadline`` (``time.monotonic()``) as well.
+        """
+        parts = []
+        usage = None
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if time.monotonic() > deadline:
+                    raise _TransientError(f"Stream took longer than {settings.summary_timeout}s")
+                # Skip blank separators and ": keep-alive" comments
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if "error" in chunk:
+                    raise _TransientError(f"Stream error: {chunk['error']}")
+                # The last chunk carries the token usage (and may have no choices)
+                usage = chunk.get("usage") or usage
+                if not chunk.get("choices"):
+                    continue
+                delta = (chunk["choices"][0].get("delta") or {}).get("content")
+                if delta:
+                    # Leading whitespace is trimmed like the non-streamed response
+                    if not parts:
+                        delta = delta.lstrip()
+                        if not delta:
+                            continue
+                    parts.append(delta)
+                    listener.on_delta(delta)
+            else:
+                raise _TransientError("Stream ended without [DONE]")
+        except _TransientError:
+            if parts:
+                listener.on_restart()
+            raise
+        except (requests.RequestException, ValueError, KeyError, IndexError, TypeError) as e:
+            if parts:
+                listener.on_restart()
+            raise _TransientError(f"Stream interrupted: {e}") from e
+
+        return "".join(parts).strip(), usage
+
+
+# Global client instance
+_llm_client = None
+_llm_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """Get or create this process's LLM client"""
+    global _llm_client
+    if _llm_client is None:
+        with _llm_client_lock:
+            if _llm_client is None:
+                _llm_client = LLMClient()
+    return _llm_client
@@ -0,0 +1,192 @@
+"""
+Summary model routing by article size, quality tier and live model health
+
+Every completion request's latency and outcome are kept per model in Redis
+(the last ``summary_route_window`` requests), shared by all workers. The
+router picks the configured route for an article's tier and token count,
+then moves models that are currently slow or failing behind the healthy ones.
+"""
+
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import redis
+
+from backend.config import get_settings
+from backend.redis_client import get_redis
+
+settings = get_settings()
+
+KEY_PREFIX = "digestible:llm:latency"
+
+
+class ModelHealth(NamedTuple):
+    """Rolling latency percentiles (seconds) and error rate of one model"""
+
+    samples: int
+    p50: Optional[float]
+    p95: Optional[float]
+    error_rate: float
+
+    @property
+    def degraded(self) -> bool:
+        """Slow or failing over enough recent requests to try other models first"""
+        if self.samples < settings.summary_route_min_samples:
+            return False
+        return self.error_rate > settings.summary_route_max_error_rate or (
+            self.p95 is not None and self.p95 > settings.summary_route_max_p95
+        )
+
+    def metrics(self) -> dict:
+        return {
+            "samples": self.samples,
+            "p50": None if self.p50 is None else round(self.p50, 3),
+            "p95": None if self.p95 is None else round(self.p95, 3),
+            "error_rate": round(self.error_rate, 3),
+        }
+
+
+def _percentile(ordered: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ModelStats:
+    """
+    Recent request outcomes per model, shared by all workers
+
+    Redis errors fail open: nothing is recorded and every model looks healthy.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self._client = client
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    def record(self, model: str, seconds: float, ok: bool):
+        """Record one request's latency and whether it succeeded"""
+        key = f"{KEY_PREFIX}:{model}"
+        try:
+            pipe = self.client.pipeline()
+            pipe.lpush(key, f"{int(ok)}:{seconds:.3f}")
+            pipe.ltrim(key, 0, settings.summary_route_window - 1)
+            pipe.expire(key, 24 * 3600)
+            pipe.execute()
+        except redis.RedisError as e:
+            print(f"⚠️  Failed to record latency for {model}: {e}")
+
+    def windows(self, models: List[str]) -> List[List[str]]:
+        """Recent "ok:seconds" entries of each model, newest first"""
+        try:
+            pipe = self.client.pipeline()
+            for model in models:
+                pipe.lrange(f"{KEY_PREFIX}:{model}", 0, settings.summary_route_window - 1)
+            return pipe.execute()
+        except redis.RedisError as e:
+            print(f"⚠️  Model latency stats unavailable: {e}")
+            return [[] for _ in models]
+
+    def health(self, models: Iterable[str]) -> Dict[str, ModelHealth]:
+        """Rolling health of each model"""
+        models = list(dict.fromkeys(models))
+        windows = self.windows(models)
+        health = {}
+        for model, entries in zip(models, windows, strict=True):
+            outcomes = [entry.split(":", 1) for entry in entries]
+            latencies = sorted(float(seconds) for ok, seconds in outcomes if ok == "1")
+            errors = sum(1 for ok, _ in outcomes if ok != "1")
+            health[model] = ModelHealth(
+                samples=len(outcomes),
+                p50=_percentile(latencies, 0.5),
+                p95=_percentile(latencies, 0.95),
+                error_rate=errors / len(outcomes) if outcomes else 0.0,
+            )
+        return health
+
+
+class Route(NamedTuple):
+    """The models chosen for one article, in the order to try them"""
+
+    tier: str
+    tokens: int
+    models: List[str]
+    avoided: List[str]  # Configured models moved to the back as slow or failing
+    health: Dict[str, ModelHealth]
+
+    def metrics(self) -> dict:
+        return {
+            "tier": self.tier,
+            "tokens": self.tokens,
+            "models": self.models,
+            "avoided": self.avoided,
+            "health": {model: health.metrics() for model, health in self.health.items()},
+        }
+
+
+def route_tiers() -> List[str]:
+    """Quality tiers with at least one configured route"""
+    return list(dict.fromkeys(route.tier for route in settings.summary_routes))
+
+
+class ModelRouter:
+    """Chooses summary models from ``summary_routes`` and the models' live health"""
+
+    def __init__(self, stats: Optional[ModelStats] = None):
+        self.stats = stats or get_model_stats()
+
+    def configured(self, tokens: int, tier: Optional[str] = None) -> List[str]:
+        """Models of the first route for the tier that fits ``tokens``, then the fallbacks"""
+        tier = tier or settings.summary_quality
+        models = [settings.summary_model]
+        for route in settings.summary_routes:
+            if route.tier == tier and (not route.max_tokens or tokens <= route.max_tokens):
+                models = route.models
+                break
+        return list(dict.fromkeys([*models, *settings.summary_fallback_models]))
+
+    def route(self, tokens: int, tier: Optional[str] = None) -> Route:
+        """
+        Models to summarise an article of ``tokens`` tokens with
+
+        Healthy models keep their configured order; degraded ones follow, so
+        they are still tried when nothing else works.
+        """
+        tier = tier or settings.summary_quality
+        models = self.configured(tokens, tier)
+        health = self.stats.health(models)
+        avoided = [model for model in models if health[model].degraded]
+        ordered = [model for model in models if model not in avoided] + avoided
+        if avoided:
+            print(f"🧭 Avoiding slow or failing models for now: {', '.join(avoided)}")
+        return Route(tier, tokens, ordered, avoided, health)
+
+
+# Global instances
+_model_stats = None
+_model_stats_lock = threading.Lock()
+_model_router = None
+_model_router_lock = threading.Lock()
+
+
+def get_model_stats() -> ModelStats:
+    """Get or create the shared model latency stats"""
+    global _model_stats
+    if _model_stats is None:
+        with _model_stats_lock:
+            if _model_stats is None:
+                _model_stats = ModelStats()
+    return _model_stats
+
+
+def get_model_router() -> ModelRouter:
+    """Get or create the model router"""
+    global _model_router
+    if _model_router is None:
+        with _model_router_lock:
+            if _model_router is None:
+                _model_router = ModelRouter()
+    return _model_router
@@ -0,0 +1,214 @@
+"""
+OpenRouter quota scheduler shared by all workers
+Redis-backed requests-per-minute and tokens-per-minute buckets with a priority queue
+"""
+
+import threading
+import time
+import uuid
+from typing import Optional
+
+import redis
+
+from backend.config import get_settings
+from backend.redis_client import get_redis
+
+settings = get_settings()
+
+KEY_PREFIX = "digestible:llm:quota"
+
+# Priorities for LLM requests; lower numbers are admitted first
+PRIORITY_INTERACTIVE = 0  # Single article submitted from the extension
+PRIORITY_BATCH = 5  # Bulk submissions
+PRIORITY_BACKGROUND = 8  # Re-summarizing deferred articles
+
+# KEYS: bucket hash, waiting queue zset, waiter liveness zset, cooldown key
+# ARGV: now (s), rpm, tpm, cost (tokens), ticket, queue score, liveness ttl (s), poll (ms)
+# Returns {1, 0} when admitted, or {0, wait_ms}
+ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local rpm = tonumber(ARGV[2])
+local tpm = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local ticket = ARGV[5]
+
+-- Forget waiters that stopped polling (crashed or gave up)
+local dead = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now)
+for _, stale in ipairs(dead) do
+    redis.call('ZREM', KEYS[2], stale)
+    redis.call('ZREM', KEYS[3], stale)
+end
+
+redis.call('ZADD', KEYS[2], 'NX', ARGV[6], ticket)
+redis.call('ZADD', KEYS[3], now + tonumber(ARGV[7]), ticket)
+redis.call('EXPIRE', KEYS[2], 3600)
+redis.call('EXPIRE', KEYS[3], 3600)
+
+-- Only the highest priority, longest waiting request may take budget
+local head = redis.call('ZRANGE', KEYS[2], 0, 0)[1]
+if head ~= ticket then
+    return {0, tonumber(ARGV[8])}
+end
+
+local cooldown = redis.call('PTTL', KEYS[4])
+if cooldown > 0 then
+    return {0, cooldown}
+end
+
+local state = redis.call('HMGET', KEYS[1], 'requests', 'tokens', 'ts')
+local requests = tonumber(state[1]) or rpm
+local tokens = tonumber(state[2]) or tpm
+local elapsed = math.max(0, now - (tonumber(state[3]) or now))
+requests = math.min(rpm, requests + elapsed * rpm / 60)
+tokens = math.min(tpm, tokens + elapsed * tpm / 60)
+-- A prompt larger than the whole budget waits for a full bucket
+cost = math.min(cost, tpm)
+
+local wait = 0
+if rpm > 0 and requests < 1 then
+    wait = math.max(wait, (1 - requests) * 60 / rpm)
+end
+if tpm > 0 and tokens < cost then
+    wait = math.max(wait, (cost - tokens) * 60 / tpm)
+end
+
+if wait > 0 then
+    redis.call('HSET', KEYS[1], 'requests', requests, 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], 120)
+    return {0, math.ceil(wait * 1000)}
+end
+
+redis.call('HSET', KEYS[1], 'requests', requests - 1, 'tokens', tokens - cost, 'ts', now)
+redis.call('EXPIRE', KEYS[1], 120)
+redis.call('ZREM', KEYS[2], ticket)
+redis.call('ZREM', KEYS[3], ticket)
+return {1, 0}
+"""
+
+
+class QuotaExhausted(Exception):
+    """Raised when a request could not be admitted within ``llm_queue_timeout``"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM quota queue wait exceeded, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class LLMScheduler:
+    """
+    Distributed admission control for the OpenRouter account's rate limits
+
+    Every request reserves one request and its estimated tokens from shared
+    buckets refilled at ``llm_rpm`` and ``llm_tpm`` per minute. Requests that
+    don't fit wait in a Redis queue ordered by priority then arrival, and only
+    the head of the queue can take budget, so higher priority work goes first
+    and nothing starves within a priority. Reservations are corrected with the
+    real token usage afterwards, and returned when a request fails. Redis
+    errors fail open.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None, sleep=time.sleep):
+        self._client = client
+        self._script = None
+        self._sleep = sleep
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.llm_rpm > 0 or settings.llm_tpm > 0
+
+    def _keys(self):
+        return (
+            f"{KEY_PREFIX}:bucket",
+            f"{KEY_PREFIX}:queue",
+            f"{KEY_PREFIX}:waiters",
+            f"{KEY_PREFIX}:cooldown",
+        )
+
+    def acquire(self, tokens: int, priority: int = PRIORITY_INTERACTIVE):
+        """
+        Block until a request of ``tokens`` estimated tokens fits the quota
+
+        Raises:
+            QuotaExhausted: the request waited longer than ``llm_queue_timeout``
+        """
+        if not self.enabled:
+            return
+
+        ticket = uuid.uuid4().hex
+        # Priority first, then arrival time (ms) within a priority
+        score = priority * 10**13 + int(time.time() * 1000)
+        poll = settings.llm_queue_poll
+        deadline = time.monotonic() + settings.llm_queue_timeout
+        try:
+            if self._script is None:
+                self._script = self.client.register_script(ACQUIRE_SCRIPT)
+            while True:
+                admitted, wait_ms = self._script(
+                    keys=self._keys(),
+                    args=[
+                        time.time(),
+                        settings.llm_rpm,
+                        settings.llm_tpm,
+                        tokens,
+                        ticket,
+                        score,
+                        poll * 4,
+                        int(poll * 1000),
+                    ],
+                )
+                if admitted:
+                    return
+                wait = int(wait_ms) / 1000
+                if time.monotonic() + min(wait, poll) > deadline:
+                    self._leave(ticket)
+                    raise QuotaExhausted(wait)
+                # Re-poll at least every ``poll`` seconds to keep the ticket alive
+                self._sleep(min(wait, poll))
+        except redis.RedisError as e:
+            print(f"⚠️  LLM scheduler unavailable, sending without it: {e}")
+
+    def settle(self, reserved: int, used: int):
+        """Return (or take) the difference between reserved and actual tokens"""
+        if not self.enabled or settings.llm_tpm <= 0 or reserved == used:
+            return
+        try:
+            self.client.hincrbyfloat(self._keys()[0], "tokens", reserved - used)
+        except redis.RedisError as e:
+            print(f"⚠️  Failed to settle LLM token usage: {e}")
+
+    def pause(self, seconds: float):
+        """Stop admitting requests for a while, e.g. after OpenRouter returns 429"""
+        if not self.enabled:
+            return
+        try:
+            self.client.set(self._keys()[3], "1", px=max(1, int(seconds * 1000)))
+        except redis.RedisError as e:
+            print(f"⚠️  Failed to pause LLM scheduler: {e}")
+
+    def _leave(self, ticket: str):
+        try:
+            pipe = self.client.pipeline()
+            pipe.zrem(self._keys()[1], ticket)
+            pipe.zrem(self._keys()[2], ticket)
+            pipe.execute()
+        except redis.RedisError:
+            pass
+
+
+# Global scheduler instance
+_llm_scheduler = None
+_llm_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Get or create the LLM scheduler instance"""
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        with _llm_scheduler_lock:
+            if _llm_scheduler is None:
+                _llm_scheduler = LLMScheduler()
+    return _llm_scheduler
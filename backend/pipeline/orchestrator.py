@@ -2,64 +2,136 @@
 Pipeline Orchestrator - Coordinates all pipeline stages
 """
 
-from backend.tts import generate_article_audio
+from backend.urls import canonicalize_url
 
-from .chunk import chunk_article
-from .fetch import fetch_article
-from .parse import parse_article
+from .cpu_pool import run_cpu_bound
+from .document import Document, parse_document
+from .fetch import fetch_page
+from .html_store import content_sha256
+from .llm import LLMUnavailable
+from .llm_scheduler import PRIORITY_INTERACTIVE
+from .politeness import FetchDeferred
 from .render import render_article
-from .summarize import summarize_article
+from .summarize import fast_summary, summarize_article
+from .summary_stream import SummaryPublisher
 
 
-def process_article_pipeline(url: str, article_id: str = None) -> dict:
+def summarize_and_render(
+    document: Document,
+    article_id: str = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    mode: str = None,
+    quality: str = None,
+) -> dict:
+    """
+    Run the post-parse stages: summarize and render
+
+    Audio is not generated here; it is synthesised on first request (see
+    ``generate_audio_task``), or ahead of time for recent listeners.
+
+    Also used on its own to re-summarise deferred articles from their stored text.
+    ``priority`` orders the article's LLM calls in the shared quota queue and
+    ``mode`` picks the LLM or the local extractive summarizer, and ``quality``
+    the tier the LLM model is routed by.
+
+    Returns:
+        Dictionary with 'summary' and 'metrics' (per-article measurements
+        from the summary stages). When the LLM is unavailable the summary is
+        an interim extractive one and 'deferred_for' holds the seconds to
+        wait before re-summarising.
+    """
+    # Stage 4: SUMMARIZE (streamed to /articles/{id}/summary/stream subscribers)
+    publisher = SummaryPublisher(article_id) if article_id else None
+    if publisher:
+        publisher.start()
+    metrics = {}
+    try:
+        summary = summarize_article(document, publisher, priority, mode, metrics, quality)
+    except LLMUnavailable as e:
+        # Readers get the extractive summary straight away
+        summary = fast_summary(document)
+        if publisher:
+            publisher.deferred(e.retry_after, summary)
+        return {
+            "summary": summary,
+            "metrics": metrics,
+            "deferred_for": e.retry_after,
+            "deferred_reason": str(e),
+        }
+    if publisher:
+        publisher.done(summary)
+
+    # Stage 5: RENDER
+    render_article(summary, format="text")
+
+    return {"summary": summary, "metrics": metrics}
+
+
+def process_article_pipeline(
+    url: str,
+    article_id: str = None,
+    html: str = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    summary_mode: str = None,
+    summary_quality: str = None,
+) -> dict:
     """
     Process an article through the complete pipeline (without database operations)
 
     Args:
         url: Article URL to process
-        article_id: Optional article ID for audio file naming
+        article_id: Optional article ID, for streaming the summary to subscribers
+        html: Optional page HTML already captured by the client; skips the fetch stage
+        priority: LLM quota priority (see ``backend.pipeline.llm_scheduler``)
+        summary_mode: ``"llm"`` or ``"fast"`` (defaults to ``summary_mode`` setting)
+        summary_quality: Model routing tier (defaults to ``summary_quality`` setting)
 
     Returns:
-        Dictionary with processed article data
+        Dictionary with processed article data. When the LLM is unavailable the
+        summary is an interim extractive one and 'deferred_for' holds the
+        seconds to wait before re-summarising.
     """
     try:
-        # Stage 1: FETCH
-        html = fetch_article(url)
-        if not html:
-            raise ValueError("Failed to fetch article")
-
-        # Stage 2: PARSE
-        parsed = parse_article(html)
-        if not parsed:
-            raise ValueError("Failed to parse article")
+        # Stage 1: FETCH (unless the client already sent the page)
+        resolved_url = None
+        if html is None:
+            page = fetch_page(url)
+            if not page:
+                raise ValueError("Failed to fetch article")
+            html = page.html
+            resolved_url = canonicalize_url(page.url)
 
-        # Stage 3: CHUNK
-        chunks = chunk_article(parsed["text"])
-
-        # Stage 4: SUMMARIZE
-        summary = summarize_article(chunks, parsed["title"])
-
-        # Stage 5: GENERATE AUDIO
-        audio_path = None
-        if article_id:
-            try:
-                audio_path = generate_article_audio(article_id, summary)
-            except Exception as e:
-                print(f"⚠️  Audio generation failed, continuing without audio: {e}")
+        # Stages 2-3: PARSE and CHUNK into a Document (CPU-bound, one CPU pool job)
+        document = run_cpu_bound(parse_document, html)
+        if not document:
+            raise ValueError("Failed to parse article")
+        if document.truncated:
+            print(
+                f"⚠️  Article truncated to {document.chunk_count} chunks, "
+                f"~{document.dropped_tokens} tokens not included"
+            )
 
-        # Stage 6: RENDER
-        render_article(summary, format="text")
+        # Stages 4-5, parked (with the parse results kept) while the LLM is down
+        rendered = summarize_and_render(
+            document, article_id, priority, summary_mode, summary_quality
+        )
+        if "deferred_for" in rendered:
+            print(f"⏸️  Summary deferred for {url}: {rendered['deferred_reason']}")
 
         return {
-            "title": parsed["title"],
-            "content": parsed["text"],
-            "summary": summary,
-            "audio_path": audio_path,
-            "chunks_count": len(chunks),
-            "word_count": parsed["word_count"],
+            **rendered,
+            "title": document.title,
+            "content": document.text,
+            "chunks_count": document.chunk_count,
+            "word_count": document.word_count,
             "raw_html": html,
+            "html_sha256": content_sha256(html),
+            "resolved_url": resolved_url,
         }
 
+    except FetchDeferred:
+        # Domain is rate limited; the task requeues itself
+        raise
     except Exception as e:
         print(f"❌ Error processing article {url}: {e}")
         raise
@@ -1,28 +1,66 @@
 """
 Stage 2: PARSE - Extract clean article text from HTML
+Pluggable parser backends: readability and lxml fast paths, BeautifulSoup fallback
 """
 
 import re
-from typing import Dict, Optional
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, Optional, Tuple
 
+import lxml.html
 from bs4 import BeautifulSoup
+from lxml import etree
 
+from backend.config import get_settings
 
-def parse_article(html: str) -> Optional[Dict[str, str]]:
-    """
-    Parse HTML and extract article content
+from .readability import extract_main_content
 
-    Args:
-        html: Raw HTML content
+settings = get_settings()
 
-    Returns:
-        Dict with 'title' and 'text', or None if failed
+# Elements whose content is never part of the article
+SKIPPED_TAGS = ["script", "style", "nav", "header", "footer"]
+
+# Common article containers, tried in order before falling back to <body>
+CONTENT_SELECTORS = [
+    "article",
+    "main",
+    "[role='main']",
+    ".post-content",
+    ".article-content",
+]
+
+
+class ParserBackend(ABC):
     """
-    try:
+    Base class for HTML extraction engines
+
+    Backends return the raw title and newline-joined text of the main content;
+    whitespace normalisation and word counting are shared in ``parse_article``.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def extract(self, html: str) -> Optional[Tuple[Optional[str], str]]:
+        """
+        Extract title and main content text
+
+        Returns:
+            (title, text) tuple, or None if no content element was found
+        """
+
+
+class SoupParser(ParserBackend):
+    """Pure-Python BeautifulSoup backend (original implementation)"""
+
+    name = "bs4"
+
+    def extract(self, html: str) -> Optional[Tuple[Optional[str], str]]:
         soup = BeautifulSoup(html, "html.parser")
 
         # Remove script and style elements
-        for script in soup(["script", "style", "nav", "header", "footer"]):
+        for script in soup(SKIPPED_TAGS):
             script.decompose()
 
         # Extract title
@@ -35,13 +73,7 @@ def parse_article(html: str) -> Optional[Dict[str, str]]:
         # Extract main content
         # Try common article containers first
         article = None
-        for selector in [
-            "article",
-            "main",
-            "[role='main']",
-            ".post-content",
-            ".article-content",
-        ]:
+        for selector in CONTENT_SELECTORS:
             article = soup.select_one(selector)
             if article:
                 break
@@ -53,20 +85,163 @@ def parse_article(html: str) -> Optional[Dict[str, str]]:
         if not article:
             return None
 
-        # Get text and clean it
-        text = article.get_text(separator="\n", strip=True)
+        return title, article.get_text(separator="\n", strip=True)
+
+
+# XPath equivalents of CONTENT_SELECTORS, ignoring anything inside skipped elements
+_NOT_SKIPPED = "[not(" + " or ".join(f"ancestor::{tag}" for tag in SKIPPED_TAGS) + ")]"
+_CONTENT_XPATHS = [
+    etree.XPath(f"(//{path}{_NOT_SKIPPED})[1]")
+    for path in [
+        "article",
+        "main",
+        "*[@role='main']",
+        "*[contains(concat(' ', normalize-space(@class), ' '), ' post-content ')]",
+        "*[contains(concat(' ', normalize-space(@class), ' '), ' article-content ')]",
+    ]
+]
+_H1_XPATH = etree.XPath(f"(//h1{_NOT_SKIPPED})[1]")
+_TITLE_XPATH = etree.XPath(f"(//title{_NOT_SKIPPED})[1]")
+_BODY_XPATH = etree.XPath("(//body)[1]")
+
+
+def iter_element_strings(element) -> Iterator[str]:
+    """
+    Yield an element's text nodes in document order, like BeautifulSoup's strings
+
+    Skipped elements and comments contribute nothing, but their tails are kept
+    as separate strings (``drop_tree`` would merge them into the previous one).
+    """
+    stack = [(element, False)]
+    while stack:
+        node, tail_only = stack.pop()
+        if tail_only:
+            if node.tail:
+                yield node.tail
+            continue
+
+        if node.text:
+            yield node.text
+        # Push children in reverse so they pop in document order, each followed by its tail
+        for child in reversed(node):
+            stack.append((child, True))
+            if isinstance(child.tag, str) and child.tag not in SKIPPED_TAGS:
+                stack.append((child, False))
+
+
+class LxmlParser(ParserBackend):
+    """libxml2-backed backend, extracting the same title and text as ``SoupParser``"""
+
+    name = "lxml"
+
+    _parser = lxml.html.HTMLParser(encoding="utf-8", remove_comments=True)
+
+    def extract(self, html: str) -> Optional[Tuple[Optional[str], str]]:
+        root = lxml.html.document_fromstring(html.encode("utf-8"), parser=self._parser)
+
+        # Extract title (same rules as BeautifulSoup's .string)
+        title = None
+        title_elements = _TITLE_XPATH(root)
+        if title_elements:
+            element = title_elements[0]
+            title = element.text if len(element) == 0 else None
+        else:
+            h1 = _H1_XPATH(root)
+            if h1:
+                title = "".join(iter_element_strings(h1[0]))
+
+        # Extract main content
+        article = None
+        for xpath in _CONTENT_XPATHS:
+            found = xpath(root)
+            if found:
+                article = found[0]
+                break
+
+        if article is None:
+            found = _BODY_XPATH(root)
+            article = found[0] if found else None
+
+        if article is None:
+            return None
+
+        strings = (s.strip() for s in iter_element_strings(article))
+        return title, "\n".join(s for s in strings if s)
+
+
+class ReadabilityParser(ParserBackend):
+    """
+    Single-pass scoring extractor (see ``backend.pipeline.readability``)
+
+    Unlike the selector-based backends it picks the main content by text and
+    link density, so pages without an <article> don't fall back to the whole body.
+    """
+
+    name = "readability"
+
+    _parser = lxml.html.HTMLParser(encoding="utf-8", remove_comments=True)
+
+    def extract(self, html: str) -> Optional[Tuple[Optional[str], str]]:
+        root = lxml.html.document_fromstring(html.encode("utf-8"), parser=self._parser)
+        return extract_main_content(root)
+
+
+PARSER_BACKENDS = {
+    ReadabilityParser.name: ReadabilityParser,
+    LxmlParser.name: LxmlParser,
+    SoupParser.name: SoupParser,
+}
+
+# Backend instances, created on first use
+_parser_backends: Dict[str, ParserBackend] = {}
+_parser_backends_lock = threading.Lock()
+
+
+def get_parser_backend(name: Optional[str] = None) -> ParserBackend:
+    """Get a parser backend by name (defaults to ``settings.parser_backend``)"""
+    name = name or settings.parser_backend
+    if name not in _parser_backends:
+        if name not in PARSER_BACKENDS:
+            raise ValueError(f"Unknown parser backend: {name}")
+        with _parser_backends_lock:
+            if name not in _parser_backends:
+                _parser_backends[name] = PARSER_BACKENDS[name]()
+    return _parser_backends[name]
+
+
+def parse_article(html: str, backend: Optional[str] = None) -> Optional[Dict[str, str]]:
+    """
+    Parse HTML and extract article content
+
+    Args:
+        html: Raw HTML content
+        backend: Optional parser backend name, defaults to ``settings.parser_backend``
+
+    Returns:
+        Dict with 'title' and 'text', or None if failed. Counts and chunking are
+        computed once from this by ``backend.pipeline.document.Document``.
+    """
+    try:
+        parser = get_parser_backend(backend)
+        try:
+            extracted = parser.extract(html)
+        except Exception as e:
+            if parser.name == SoupParser.name:
+                raise
+            print(f"⚠️  {parser.name} parser failed, falling back to BeautifulSoup: {e}")
+            extracted = get_parser_backend(SoupParser.name).extract(html)
+
+        if not extracted:
+            return None
+        title, text = extracted
 
         # Remove excessive whitespace
         text = re.sub(r"\n\s*\n", "\n\n", text)
         text = re.sub(r" +", " ", text)
 
-        # Count words
-        word_count = len(text.split())
-
         return {
             "title": title or "Untitled",
             "text": text,
-            "word_count": word_count,
         }
 
     except Exception as e:
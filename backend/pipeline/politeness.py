@@ -0,0 +1,184 @@
+"""
+Per-domain fetch politeness shared by all workers
+Redis-backed token bucket, concurrency cap and Retry-After cooldowns
+"""
+
+import threading
+import time
+import uuid
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+
+import redis
+
+from backend.config import get_settings
+from backend.redis_client import get_redis
+
+settings = get_settings()
+
+KEY_PREFIX = "digestible:fetch:domain"
+
+# KEYS: bucket hash, in-flight lease zset, cooldown key
+# ARGV: now (s), rate (tokens/s, 0 = no bucket), burst, max concurrent, lease ttl (s),
+#       lease id, busy wait (ms)
+# Returns {1, 0} when admitted, or {0, wait_ms}
+ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local max_concurrent = tonumber(ARGV[4])
+local lease_ttl = tonumber(ARGV[5])
+
+local cooldown = redis.call('PTTL', KEYS[3])
+if cooldown > 0 then
+    return {0, cooldown}
+end
+
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+if redis.call('ZCARD', KEYS[2]) >= max_concurrent then
+    return {0, tonumber(ARGV[7])}
+end
+
+if rate > 0 then
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    if tokens < 1 then
+        redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+        return {0, math.ceil((1 - tokens) / rate * 1000)}
+    end
+
+    redis.call('HSET', KEYS[1], 'tokens', tokens - 1, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+end
+
+redis.call('ZADD', KEYS[2], now + lease_ttl, ARGV[6])
+redis.call('EXPIRE', KEYS[2], math.ceil(lease_ttl) + 60)
+return {1, 0}
+"""
+
+
+class FetchDeferred(Exception):
+    """Raised when a domain has no fetch budget left; the task should be requeued"""
+
+    def __init__(self, domain: str, retry_after: float):
+        super().__init__(f"Fetch from {domain} deferred for {retry_after:.1f}s")
+        self.domain = domain
+        self.retry_after = retry_after
+
+
+def domain_of(url: str) -> str:
+    """Politeness key for a URL (hostname without a leading www.)"""
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date)
+
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class DomainLimiter:
+    """
+    Distributed per-domain admission control
+
+    Each fetch takes one token from the domain's bucket and one in-flight lease.
+    Leases expire on their own so a crashed worker cannot leak concurrency.
+    Redis errors fail open: fetching continues with only per-process limits.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self._client = client
+        self._script = None
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    def _keys(self, domain: str):
+        return (
+            f"{KEY_PREFIX}:{domain}:bucket",
+            f"{KEY_PREFIX}:{domain}:inflight",
+            f"{KEY_PREFIX}:{domain}:cooldown",
+        )
+
+    def acquire(self, url: str) -> Optional[str]:
+        """
+        Admit a fetch for a URL's domain
+
+        Returns:
+            Lease id to pass to ``release``, or None if limiting is unavailable
+
+        Raises:
+            FetchDeferred: If the domain is cooling down or over budget
+        """
+        domain = domain_of(url)
+        lease = uuid.uuid4().hex
+        try:
+            if self._script is None:
+                self._script = self.client.register_script(ACQUIRE_SCRIPT)
+            admitted, wait_ms = self._script(
+                keys=self._keys(domain),
+                args=[
+                    time.time(),
+                    settings.fetch_domain_rate,
+                    settings.fetch_domain_burst,
+                    settings.fetch_domain_concurrency,
+                    settings.fetch_deadline,
+                    lease,
+                    int(settings.fetch_domain_busy_wait * 1000),
+                ],
+            )
+        except redis.RedisError as e:
+            print(f"⚠️  Domain limiter unavailable, fetching without it: {e}")
+            return None
+
+        if not admitted:
+            raise FetchDeferred(domain, int(wait_ms) / 1000)
+        return lease
+
+    def release(self, url: str, lease: Optional[str]):
+        """Return an in-flight lease taken by ``acquire``"""
+        if lease is None:
+            return
+        try:
+            self.client.zrem(self._keys(domain_of(url))[1], lease)
+        except redis.RedisError as e:
+            print(f"⚠️  Failed to release fetch lease for {url}: {e}")
+
+    def defer(self, url: str, retry_after: float):
+        """Pause all fetches to a URL's domain, e.g. after a 429"""
+        try:
+            self.client.set(self._keys(domain_of(url))[2], "1", px=max(1, int(retry_after * 1000)))
+        except redis.RedisError as e:
+            print(f"⚠️  Failed to record cooldown for {url}: {e}")
+
+
+# Global domain limiter instance
+_domain_limiter = None
+_domain_limiter_lock = threading.Lock()
+
+
+def get_domain_limiter() -> DomainLimiter:
+    """Get or create domain limiter instance"""
+    global _domain_limiter
+    if _domain_limiter is None:
+        with _domain_limiter_lock:
+            if _domain_limiter is None:
+                _domain_limiter = DomainLimiter()
+    return _domain_limiter
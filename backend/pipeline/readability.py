@@ -0,0 +1,280 @@
+"""
+Single-pass readability-style content extraction
+
+One ``iterwalk`` over the lxml tree collects everything at once: title
+candidates, normalised text lines, and text/link/comma counts for every
+block element. Paragraph scores are pushed up to parents and grandparents
+when each paragraph closes. The highest scoring block (plus qualifying
+siblings) is the main content, and its text is a slice of the lines
+already emitted, so no second traversal is needed.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from lxml import etree
+
+# Never contain article text
+SKIPPED_TAGS = {
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "nav",
+    "header",
+    "footer",
+    "aside",
+    "form",
+    "button",
+    "select",
+    "iframe",
+    "svg",
+}
+
+# Elements that start a new line of output text
+BLOCK_TAGS = {
+    "address",
+    "article",
+    "blockquote",
+    "body",
+    "br",
+    "dd",
+    "details",
+    "div",
+    "dl",
+    "dt",
+    "figcaption",
+    "figure",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "hr",
+    "li",
+    "main",
+    "ol",
+    "p",
+    "pre",
+    "section",
+    "summary",
+    "table",
+    "td",
+    "th",
+    "tr",
+    "ul",
+}
+
+# Elements that can be picked as the main content
+CANDIDATE_TAGS = {"article", "body", "div", "main", "section", "td", "blockquote"}
+
+# Elements whose text is scored and credited to their ancestors
+PARAGRAPH_TAGS = {"p", "pre", "td", "blockquote", "li"}
+
+POSITIVE_HINTS = re.compile(
+    r"article|body|content|entry|hentry|main|page|post|text|blog|story", re.I
+)
+NEGATIVE_HINTS = re.compile(
+    r"ad-|banner|combx|comment|cookie|disqus|extra|foot|masthead|media|meta|modal|"
+    r"newsletter|outbrain|pagination|popup|promo|related|remark|rss|share|shoutbox|"
+    r"sidebar|skyscraper|social|sponsor|subscribe|tag|taboola|tool|widget",
+    re.I,
+)
+
+MIN_PARAGRAPH_CHARS = 25
+WHITESPACE = re.compile(r"\s+")
+
+
+class _Block:
+    """Running statistics for one open element"""
+
+    __slots__ = ("start_line", "start_chars", "start_links", "start_commas", "score")
+
+    def __init__(self, start_line: int, start_chars: int, start_links: int, commas: int):
+        self.start_line = start_line
+        self.start_chars = start_chars
+        self.start_links = start_links
+        self.start_commas = commas
+        self.score = 0.0
+
+
+class _Candidate:
+    """Final statistics for a closed candidate element"""
+
+    __slots__ = ("start_line", "end_line", "chars", "links", "score")
+
+    def __init__(self, start_line: int, end_line: int, chars: int, links: int, score: float):
+        self.start_line = start_line
+        self.end_line = end_line
+        self.chars = chars
+        self.links = links
+        self.score = score
+
+    @property
+    def link_density(self) -> float:
+        return self.links / self.chars if self.chars else 1.0
+
+    @property
+    def final_score(self) -> float:
+        return self.score * (1 - self.link_density)
+
+
+def _class_weight(element) -> float:
+    """Readability's class/id hint: +25 for content-like names, -25 for boilerplate"""
+    hints = f"{element.get('class', '')} {element.get('id', '')}"
+    weight = 0.0
+    if POSITIVE_HINTS.search(hints):
+        weight += 25
+    if NEGATIVE_HINTS.search(hints):
+        weight -= 25
+    return weight
+
+
+def extract_main_content(root) -> Tuple[Optional[str], str]:
+    """
+    Extract the title and main content text from a parsed document
+
+    Args:
+        root: lxml HTML document root
+
+    Returns:
+        (title, text) where text is newline-separated, whitespace-normalised lines
+    """
+    lines: List[str] = []
+    line_parts: List[str] = []
+    counters = {"chars": 0, "links": 0, "commas": 0}
+    link_depth = 0
+    head_depth = 0
+    pre_depth = 0
+
+    title_tag: Optional[str] = None
+    og_title: Optional[str] = None
+    h1_title: Optional[str] = None
+
+    stack: List[_Block] = []
+    candidates: Dict[object, _Candidate] = {}
+
+    def add_text(text: Optional[str]):
+        if not text or head_depth:
+            return
+        if pre_depth and "\n" in text:
+            # Keep preformatted line breaks
+            first, *rest = text.split("\n")
+            add_text(first)
+            for line in rest:
+                flush_line()
+                add_text(line)
+            return
+        text = WHITESPACE.sub(" ", text)
+        if text == " ":
+            if line_parts:
+                line_parts.append(text)
+            return
+        line_parts.append(text)
+        size = len(text.strip())
+        counters["chars"] += size
+        counters["commas"] += text.count(",")
+        if link_depth:
+            counters["links"] += size
+
+    def flush_line():
+        if line_parts:
+            line = "".join(line_parts).strip()
+            line_parts.clear()
+            if line:
+                lines.append(line)
+
+    walker = etree.iterwalk(root, events=("start", "end"))
+    for event, element in walker:
+        tag = element.tag if isinstance(element.tag, str) else None
+
+        if event == "start":
+            if tag is None:
+                continue
+            if tag in SKIPPED_TAGS:
+                walker.skip_subtree()
+                continue
+
+            if tag == "head":
+                head_depth += 1
+            elif tag == "title" and title_tag is None:
+                title_tag = WHITESPACE.sub(" ", element.text or "").strip() or None
+            elif tag == "meta" and og_title is None:
+                if element.get("property") == "og:title" or element.get("name") == "og:title":
+                    og_title = WHITESPACE.sub(" ", element.get("content", "")).strip() or None
+            elif tag == "a":
+                link_depth += 1
+            elif tag == "pre":
+                pre_depth += 1
+
+            if tag in BLOCK_TAGS:
+                flush_line()
+            stack.append(
+                _Block(
+                    len(lines),
+                    counters["chars"],
+                    counters["links"],
+                    counters["commas"],
+                )
+            )
+            add_text(element.text)
+            continue
+
+        # event == "end"
+        if tag is not None and tag not in SKIPPED_TAGS:
+            if tag in BLOCK_TAGS:
+                flush_line()
+            block = stack.pop()
+            chars = counters["chars"] - block.start_chars
+
+            if tag == "head":
+                head_depth -= 1
+            elif tag == "a":
+                link_depth -= 1
+            elif tag == "pre":
+                pre_depth -= 1
+            elif tag == "h1" and h1_title is None:
+                h1_title = " ".join(lines[block.start_line :]) or None
+
+            # Credit paragraph-like text to the parent (fully) and grandparent (half)
+            if tag in PARAGRAPH_TAGS and chars >= MIN_PARAGRAPH_CHARS:
+                commas = counters["commas"] - block.start_commas
+                score = 1 + commas + min(chars // 100, 3)
+                if len(stack) >= 1:
+                    stack[-1].score += score
+                if len(stack) >= 2:
+                    stack[-2].score += score / 2
+
+            if tag in CANDIDATE_TAGS and block.score > 0:
+                candidates[element] = _Candidate(
+                    block.start_line,
+                    len(lines),
+                    chars,
+                    counters["links"] - block.start_links,
+                    block.score + _class_weight(element),
+                )
+
+        add_text(element.tail)
+
+    flush_line()
+    title = og_title or title_tag or h1_title
+
+    if not candidates:
+        return title, "\n".join(lines)
+
+    top_element, top = max(candidates.items(), key=lambda item: item[1].final_score)
+
+    # Pull in siblings that look like continuations of the article
+    parent = top_element.getparent()
+    selected = [top]
+    if parent is not None:
+        threshold = max(10.0, top.final_score * 0.2)
+        selected = [
+            candidates[child]
+            for child in parent
+            if child in candidates
+            and (child is top_element or candidates[child].final_score >= threshold)
+        ]
+
+    return title, "\n".join(line for c in selected for line in lines[c.start_line : c.end_line])
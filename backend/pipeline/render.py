@@ -3,16 +3,19 @@ Stage 5: RENDER - Convert summary to output formats
 Phase 0: Placeholder implementation
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 
-def render_article(summary: str, format: str = "text") -> Dict[str, Any]:
+def render_article(
+    summary: str, format: str = "text", word_count: Optional[int] = None
+) -> Dict[str, Any]:
     """
     Render summary in requested format
 
     Args:
         summary: Generated summary text
         format: Output format (text, bullets, audio)
+        word_count: Summary word count, if already known (saves re-splitting it)
 
     Returns:
         Dict with rendered content
@@ -38,10 +41,12 @@ def render_article(summary: str, format: str = "text") -> Dict[str, Any]:
 
     elif format == "audio":
         # Phase 1+: Integrate TTS service
+        if word_count is None:
+            word_count = len(summary.split())
         return {
             "format": "audio",
             "content": "[PLACEHOLDER: Audio URL will be generated here]",
-            "duration_seconds": len(summary.split()) / 150,  # Estimated
+            "duration_seconds": word_count / 150,  # Estimated
         }
 
     else:
@@ -1,88 +1,300 @@
 """
 Stage 4: SUMMARIZE - Generate summary from chunks
 Phase 1: OpenRouter AI integration
-"""
 
-from typing import List
+Articles that fit one prompt are summarised in a single call. Longer articles
+are summarised map-reduce style: chunk groups are summarised concurrently,
+then the partial summaries are merged (in further concurrent rounds if they
+are still too long) into the final bullet list. Latency grows with the depth
+of that tree rather than with the article length.
+
+The local extractive summarizer serves "fast" mode requests and stands in
+whenever the LLM cannot be used (no API key or a rejected request).
+"""
 
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
 
 from backend.config import get_settings
 
+from .compress import compress_document
+from .document import Document
+from .extractive import extractive_summary
+from .llm import Completion, CompletionListener, LLMUnavailable, get_llm_client
+from .llm_router import get_model_router
+from .llm_scheduler import PRIORITY_INTERACTIVE
+from .summary_cache import get_summary_cache, summary_cache_key
+from .tokens import estimate_tokens
+
 settings = get_settings()
 
+SUMMARY_MODE_LLM = "llm"
+SUMMARY_MODE_FAST = "fast"  # Local extractive summary, no network calls
+SUMMARY_MODES = (SUMMARY_MODE_LLM, SUMMARY_MODE_FAST)
+
+# Bump whenever a prompt template changes, so cached summaries are not reused
+PROMPT_VERSION = "3"
+
+
+def _summary_prompt(title: str, text: str) -> str:
+    return (
+        "Please provide a concise summary of the following article as a bullet-point list.\n"
+        "Focus on the 5-7 most important points and key takeaways.\n"
+        "Use clear, actionable bullets.\n\n"
+        f"Title: {title}\n\n"
+        f"Article content:\n{text}\n\n"
+        "Summary (as bullet points):"
+    )
+
+
+def _map_prompt(title: str, text: str) -> str:
+    return (
+        "The following is one section of a longer article.\n"
+        "Summarise the key facts, arguments and conclusions of this section "
+        "as short bullet points. Do not add an introduction.\n\n"
+        f"Article title: {title}\n\n"
+        f"Section:\n{text}\n\n"
+        "Section summary (as bullet points):"
+    )
+
+
+def _merge_prompt(title: str, text: str) -> str:
+    return (
+        "The following are summaries of consecutive sections of one article.\n"
+        "Merge them into a single list of short bullet points, removing repetition "
+        "and keeping the order of the article.\n\n"
+        f"Article title: {title}\n\n"
+        f"Section summaries:\n{text}\n\n"
+        "Merged summary (as bullet points):"
+    )
+
 
-def summarize_article(chunks: List[str], title: str) -> str:
+def _reduce_prompt(title: str, text: str) -> str:
+    return (
+        "The following are summaries of consecutive sections of one article.\n"
+        "Combine them into a concise summary of the whole article as a bullet-point list.\n"
+        "Focus on the 5-7 most important points and key takeaways.\n"
+        "Use clear, actionable bullets.\n\n"
+        f"Title: {title}\n\n"
+        f"Section summaries:\n{text}\n\n"
+        "Summary (as bullet points):"
+    )
+
+
+def pack_texts(items: Iterable[Tuple[str, int]], max_tokens: int, min_items: int = 1) -> List[str]:
     """
-    Generate summary from article chunks using OpenRouter AI
+    Pack consecutive (text, tokens) items into groups of at most ``max_tokens``
+
+    A group only closes once it holds ``min_items`` items; with ``min_items=2``
+    every round of packing partial summaries halves their number or better, so
+    the merge tree always converges.
+    """
+    groups: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for text, tokens in items:
+        if len(current) >= min_items and current_tokens + tokens > max_tokens:
+            groups.append("\n\n".join(current))
+            current = []
+            current_tokens = 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        groups.append("\n\n".join(current))
+    return groups
+
+
+def _complete_all(
+    prompts: List[str], priority: int, models: Optional[List[str]] = None
+) -> List[Completion]:
+    """Run completions concurrently, at most ``summary_parallelism`` at a time"""
+    client = get_llm_client()
+    if len(prompts) == 1:
+        return [client.complete(prompts[0], priority=priority, models=models)]
+    workers = max(1, min(settings.summary_parallelism, len(prompts)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summarize") as pool:
+        return list(
+            pool.map(
+                lambda prompt: client.complete(prompt, priority=priority, models=models), prompts
+            )
+        )
+
+
+def _texts(completions: List[Completion]) -> List[str]:
+    return [completion.text for completion in completions]
+
+
+def map_reduce_summary(
+    document: Document,
+    listener: Optional[CompletionListener] = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    models: Optional[List[str]] = None,
+    calls: Optional[List[Completion]] = None,
+) -> Completion:
+    """
+    Summarise a document, map-reducing over chunk groups when it is too long
 
     Args:
-        chunks: List of text chunks
-        title: Article title
+        document: Parsed article with its chunk plan
+        listener: Receives the final completion as it streams (map and merge
+            calls are not streamed)
+        priority: Quota scheduler priority for every call
+        models: Models to try in order (defaults to the primary and fallbacks)
+        calls: Optional list that receives every completion made
 
     Returns:
-        AI-generated summary text
+        Summary (bullet points) and the model that produced it; if fallback
+        models took part, the model is the first fallback that was used
     """
-    try:
-        # Check if API key is configured
-        if not settings.openrouter_api_key:
-            raise ValueError("OpenRouter API key not configured")
-
-        # Combine chunks into full text (limit to reasonable size)
-        full_text = " ".join(chunks)
-        if len(full_text) > 10000:  # Limit to 10k chars to avoid token limits
-            full_text = full_text[:10000] + "..."
-
-        # Create prompt for summarization
-        prompt = (
-            "Please provide a concise summary of the following article as a bullet-point list.\n"
-            "Focus on the 5-7 most important points and key takeaways.\n"
-            "Use clear, actionable bullets.\n\n"
-            f"Title: {title}\n\n"
-            f"Article content:\n{full_text}\n\n"
-            "Summary (as bullet points):"
+    models = models or get_llm_client().models
+    calls = [] if calls is None else calls
+    budget = settings.summary_group_tokens
+    groups = pack_texts(
+        ((document.text[chunk.start : chunk.end], chunk.tokens) for chunk in document.chunks),
+        budget,
+    )
+    if not groups:
+        groups = [document.text]
+
+    if len(groups) == 1:
+        final = get_llm_client().complete(
+            _summary_prompt(document.title, groups[0]), listener, priority, models
         )
+        calls.append(final)
+        return final
+
+    # Map: summarise each group of chunks
+    completions = _complete_all(
+        [_map_prompt(document.title, group) for group in groups], priority, models
+    )
+    calls.extend(completions)
 
-        # Call OpenRouter API directly with requests
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {settings.openrouter_api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://digestible.app",
-                "X-Title": "Digestible",
-            },
-            json={
-                "model": "meta-llama/llama-3.2-3b-instruct:free",
-                "messages": [{"role": "user", "content": prompt}],
-            },
-            timeout=60,
+    # Merge partial summaries level by level until they fit one prompt
+    while True:
+        partials = _texts(completions)
+        groups = pack_texts(((p, estimate_tokens(p)) for p in partials), budget, min_items=2)
+        if len(groups) == 1:
+            break
+        completions = _complete_all(
+            [_merge_prompt(document.title, group) for group in groups], priority, models
         )
+        calls.extend(completions)
 
-        response.raise_for_status()
-        result = response.json()
+    # Reduce: final bullet list
+    final = get_llm_client().complete(
+        _reduce_prompt(document.title, groups[0]), listener, priority, models
+    )
+    calls.append(final)
+    fallbacks = [call.model for call in calls if call.model != models[0]]
+    return Completion(final.text, fallbacks[0] if fallbacks else final.model, final.seconds)
 
-        summary = result["choices"][0]["message"]["content"].strip()
 
-        # Add some metadata
-        total_words = sum(len(chunk.split()) for chunk in chunks)
-        metadata = f"\n\n📊 **Article Stats:** {len(chunks)} chunks, {total_words} words"
+def _with_stats(summary: str, document: Document, note: str = "") -> str:
+    return (
+        f"{summary}\n\n📊 **Article Stats:** {document.chunk_count} chunks, "
+        f"{document.word_count} words{note}"
+    )
 
-        return summary + metadata
 
-    except Exception as e:
-        # Fallback to placeholder if AI fails
-        print(f"❌ OpenRouter API error: {e}")
-        total_words = sum(len(chunk.split()) for chunk in chunks)
+def fast_summary(document: Document) -> str:
+    """Extractive summary with article metadata, computed locally"""
+    return _with_stats(extractive_summary(document), document, " (extractive summary)")
+
+
+def summarize_article(
+    document: Document,
+    listener: Optional[CompletionListener] = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    mode: Optional[str] = None,
+    metrics: Optional[dict] = None,
+    quality: Optional[str] = None,
+) -> str:
+    """
+    Generate summary from article chunks using OpenRouter AI
+
+    Args:
+        document: Parsed article with its chunk plan
+        listener: Optional receiver for the summary text as it is generated
+        priority: Quota scheduler priority (see ``backend.pipeline.llm_scheduler``)
+        mode: ``"llm"`` or ``"fast"`` (defaults to ``summary_mode``)
+        metrics: Optional dict that receives per-article measurements
+            (``compression``, ``routing`` and ``llm_calls``)
+        quality: Quality tier for model routing (defaults to ``summary_quality``)
+
+    Returns:
+        AI-generated summary text, or the extractive summary in fast mode and
+        when the LLM cannot be used
 
-        return f"""
-        [AI SUMMARY UNAVAILABLE]
+    Raises:
+        LLMUnavailable: no model can serve requests right now; the article
+            should be parked and re-summarised later
+    """
+    if (mode or settings.summary_mode) == SUMMARY_MODE_FAST:
+        return fast_summary(document)
 
-        Title: {title}
-        Chunks processed: {len(chunks)}
-        Total words: {total_words}
+    try:
+        # Models for the article's size and tier, slow or failing ones last
+        router = get_model_router()
+        configured = router.configured(document.token_count, quality)
 
-        Unable to generate AI summary due to API error: {str(e)}
+        # Identical text, title, model and prompts always produce a reusable
+        # summary. A summary from any model of the route will do (in route order),
+        # since fallback models store under their own name.
+        cache = get_summary_cache()
+        summary = cache.get_first(
+            [
+                summary_cache_key(document.content_hash, document.title, model, PROMPT_VERSION)
+                for model in configured
+            ]
+        )
 
-        Please check your OpenRouter API key and try again.
-        """.strip()
+        if summary is None:
+            # Check if API key is configured
+            if not settings.openrouter_api_key:
+                raise ValueError("OpenRouter API key not configured")
+
+            # Only the compressed text is sent; cache keys stay on the original
+            if settings.compress_enabled:
+                compression = compress_document(document)
+                print(
+                    f"🗜️  Prompt text compressed to {compression.ratio:.0%} "
+                    f"({compression.original_tokens} → {compression.tokens} tokens)"
+                )
+                if metrics is not None:
+                    metrics["compression"] = compression.metrics()
+                prompt_document = compression.document
+            else:
+                prompt_document = document
+
+            route = router.route(document.token_count, quality)
+            calls: List[Completion] = []
+            try:
+                completion = map_reduce_summary(
+                    prompt_document, listener, priority, route.models, calls
+                )
+            finally:
+                if metrics is not None:
+                    metrics["routing"] = route.metrics()
+                    metrics["llm_calls"] = [
+                        {"model": call.model, "seconds": round(call.seconds, 3)} for call in calls
+                    ]
+            summary = completion.text
+            # Summaries from fallback models are stored under their own model
+            cache.set(
+                summary_cache_key(
+                    document.content_hash, document.title, completion.model, PROMPT_VERSION
+                ),
+                summary,
+                document.content_hash,
+                completion.model,
+                PROMPT_VERSION,
+            )
+
+        return _with_stats(summary, document)
+
+    except LLMUnavailable:
+        raise
+    except Exception as e:
+        # Fall back to the local summarizer if AI fails
+        print(f"❌ OpenRouter API error, using extractive summary: {e}")
+        return fast_summary(document)
@@ -0,0 +1,155 @@
+"""
+Summary cache keyed by content hash, title, model and prompt version
+
+Summaries live in Redis with a TTL, so the shared instance can evict them
+LRU-style under memory pressure (``volatile-lru`` in docker-compose). With
+``summary_cache_persist`` enabled they are also written to the
+``summary_cache`` table, which refills Redis after an eviction or restart.
+Hit and miss counters are kept in Redis so every worker shares them.
+"""
+
+import hashlib
+import threading
+from typing import Dict, Optional, Sequence
+
+import redis
+from sqlalchemy.exc import SQLAlchemyError
+
+from backend.config import get_settings
+from backend.database import SessionLocal, SummaryCacheEntry
+from backend.redis_client import get_redis
+
+settings = get_settings()
+
+KEY_PREFIX = "digestible:summary"
+STATS_KEY = "digestible:summary_cache:stats"
+
+
+def summary_cache_key(content_hash: str, title: str, model: str, prompt_version: str) -> str:
+    """Digest identifying one summary of one text and title by one model and prompt"""
+    return hashlib.sha256(
+        f"{content_hash}\0{title}\0{model}\0{prompt_version}".encode()
+    ).hexdigest()
+
+
+class SummaryCache:
+    """
+    Redis summary cache with an optional database tier
+
+    Redis and database errors fail open: lookups miss and writes are skipped.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self._client = client
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    def _record(self, field: str):
+        try:
+            self.client.hincrby(STATS_KEY, field, 1)
+        except redis.RedisError:
+            pass
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached summary for a key, or None"""
+        return self.get_first([key])
+
+    def get_first(self, keys: Sequence[str]) -> Optional[str]:
+        """
+        Cached summary for the first of several keys that has one, or None
+
+        Counted as one lookup, however many keys are tried.
+        """
+        if not settings.summary_cache_enabled or not keys:
+            return None
+
+        summary = None
+        try:
+            for key in keys:
+                summary = self.client.get(f"{KEY_PREFIX}:{key}")
+                if summary is not None:
+                    break
+        except redis.RedisError as e:
+            print(f"⚠️  Summary cache unavailable: {e}")
+
+        if summary is None and settings.summary_cache_persist:
+            for key in keys:
+                summary = self._load(key)
+                if summary is not None:
+                    self._put_redis(key, summary)
+                    break
+
+        self._record("hits" if summary is not None else "misses")
+        return summary
+
+    def set(self, key: str, summary: str, content_hash: str, model: str, prompt_version: str):
+        """Store a summary (never store placeholder or failed summaries)"""
+        if not settings.summary_cache_enabled:
+            return
+        self._put_redis(key, summary)
+        if settings.summary_cache_persist:
+            self._save(key, summary, content_hash, model, prompt_version)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit and miss counts across all workers"""
+        try:
+            counts = self.client.hgetall(STATS_KEY)
+        except redis.RedisError as e:
+            print(f"⚠️  Summary cache unavailable: {e}")
+            counts = {}
+        hits = int(counts.get("hits", 0))
+        misses = int(counts.get("misses", 0))
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def _put_redis(self, key: str, summary: str):
+        try:
+            self.client.set(f"{KEY_PREFIX}:{key}", summary, ex=settings.summary_cache_ttl)
+        except redis.RedisError as e:
+            print(f"⚠️  Failed to cache summary: {e}")
+
+    def _load(self, key: str) -> Optional[str]:
+        try:
+            with SessionLocal() as db:
+                entry = db.get(SummaryCacheEntry, key)
+                return entry.summary if entry else None
+        except SQLAlchemyError as e:
+            print(f"⚠️  Summary cache table unavailable: {e}")
+            return None
+
+    def _save(self, key: str, summary: str, content_hash: str, model: str, prompt_version: str):
+        try:
+            with SessionLocal() as db:
+                db.merge(
+                    SummaryCacheEntry(
+                        key=key,
+                        content_hash=content_hash,
+                        model=model,
+                        prompt_version=prompt_version,
+                        summary=summary,
+                    )
+                )
+                db.commit()
+        except SQLAlchemyError as e:
+            print(f"⚠️  Failed to persist summary: {e}")
+
+
+# Global cache instance
+_summary_cache = None
+_summary_cache_lock = threading.Lock()
+
+
+def get_summary_cache() -> SummaryCache:
+    """Get or create the shared summary cache"""
+    global _summary_cache
+    if _summary_cache is None:
+        with _summary_cache_lock:
+            if _summary_cache is None:
+                _summary_cache = SummaryCache()
+    return _summary_cache
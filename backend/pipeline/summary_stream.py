@@ -0,0 +1,102 @@
+"""
+Live summary text for server-sent events
+
+While the final summary is generated, each piece of text is appended to a
+per-article Redis key and published on the article's channel in one atomic
+step. Messages carry the byte length of the text so far, so a client that
+reads the key after subscribing can drop messages already included in it.
+"""
+
+import json
+from typing import Optional
+
+import redis
+
+from backend.config import get_settings
+from backend.redis_client import get_redis
+
+from .llm import CompletionListener
+
+settings = get_settings()
+
+KEY_PREFIX = "digestible:summary:stream"
+
+# KEYS: partial text key; ARGV: channel, text, key ttl (s)
+APPEND_SCRIPT = """
+local length = redis.call('APPEND', KEYS[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('PUBLISH', ARGV[1], cjson.encode({event='delta', text=ARGV[2], ['end']=length}))
+return length
+"""
+
+
+def channel_name(article_id: str) -> str:
+    return f"{KEY_PREFIX}:{article_id}"
+
+
+def partial_key(article_id: str) -> str:
+    """Text generated so far"""
+    return f"{KEY_PREFIX}:{article_id}:partial"
+
+
+def final_key(article_id: str) -> str:
+    """Last terminal event, for clients that subscribe just after it was published"""
+    return f"{KEY_PREFIX}:{article_id}:final"
+
+
+class SummaryPublisher(CompletionListener):
+    """
+    Publishes one article's summary as it is generated
+
+    Redis errors are logged and ignored; clients fall back to polling.
+    """
+
+    def __init__(self, article_id: str, client: Optional[redis.Redis] = None):
+        self.article_id = article_id
+        self._client = client
+        self._append_script = None
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    def start(self):
+        """Forget the previous attempt's text and terminal event (e.g. after a deferral)"""
+        try:
+            self.client.delete(partial_key(self.article_id), final_key(self.article_id))
+        except redis.RedisError as e:
+            print(f"⚠️  Failed to reset summary stream for {self.article_id}: {e}")
+
+    def on_delta(self, text: str):
+        try:
+            if self._append_script is None:
+                self._append_script = self.client.register_script(APPEND_SCRIPT)
+            self._append_script(
+                keys=[partial_key(self.article_id)],
+                args=[channel_name(self.article_id), text, settings.summary_stream_ttl],
+            )
+        except redis.RedisError as e:
+            print(f"⚠️  Failed to publish summary text for {self.article_id}: {e}")
+
+    def on_restart(self):
+        self._publish("reset", final=False)
+
+    def done(self, summary: str):
+        """The final summary (including metadata) is ready"""
+        self._publish("done", summary=summary)
+
+    def deferred(self, retry_after: float, summary: Optional[str] = None):
+        """No LLM summary for now (``summary`` is the interim one); the article is DEFERRED"""
+        self._publish("deferred", retry_after=retry_after, summary=summary)
+
+    def _publish(self, event: str, final: bool = True, **data):
+        message = json.dumps({"event": event, **data})
+        try:
+            pipe = self.client.pipeline()
+            pipe.delete(partial_key(self.article_id))
+            if final:
+                pipe.set(final_key(self.article_id), message, ex=settings.summary_stream_ttl)
+            pipe.publish(channel_name(self.article_id), message)
+            pipe.execute()
+        except redis.RedisError as e:
+            print(f"⚠️  Failed to publish summary {event} for {self.article_id}: {e}")
@@ -0,0 +1,29 @@
+"""
+Token estimation shared by chunking and LLM budgeting
+"""
+
+import re
+
+# Average characters per BPE token for English words
+CHARS_PER_TOKEN = 4
+
+# One match per token: word pieces of up to CHARS_PER_TOKEN characters, or a
+# single punctuation mark
+TOKEN_PATTERN = re.compile(r"\w{1,%d}|[^\w\s]" % CHARS_PER_TOKEN)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate how many model tokens a text uses
+
+    Counts each punctuation mark as one token and each word as one token per
+    ~4 characters, which tracks common BPE tokenizers closely for English prose
+    without needing a model-specific tokenizer.
+
+    Args:
+        text: Any text
+
+    Returns:
+        Estimated token count
+    """
+    return len(TOKEN_PATTERN.findall(text))
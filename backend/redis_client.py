@@ -0,0 +1,57 @@
+"""
+Shared Redis client for cross-worker coordination
+"""
+
+import threading
+
+import redis
+import redis.asyncio
+
+from backend.config import get_settings
+
+settings = get_settings()
+
+# Global Redis client instances
+_redis_client = None
+_redis_client_lock = threading.Lock()
+_async_redis_client = None
+_async_redis_client_lock = threading.Lock()
+
+
+def get_redis() -> redis.Redis:
+    """
+    Get or create the Redis client
+
+    The underlying connection pool is fork-safe, so the client can be created
+    in the Celery parent process and used from its children.
+    """
+    global _redis_client
+    if _redis_client is None:
+        with _redis_client_lock:
+            if _redis_client is None:
+                _redis_client = redis.Redis.from_url(
+                    settings.redis_url,
+                    decode_responses=True,
+                    socket_timeout=5,
+                    socket_connect_timeout=2,
+                )
+    return _redis_client
+
+
+def get_async_redis() -> redis.asyncio.Redis:
+    """
+    Get or create the asyncio Redis client for API routes
+
+    Used for long-lived subscriptions (summary streams) so they don't hold a
+    threadpool worker each.
+    """
+    global _async_redis_client
+    if _async_redis_client is None:
+        with _async_redis_client_lock:
+            if _async_redis_client is None:
+                _async_redis_client = redis.asyncio.Redis.from_url(
+                    settings.redis_url,
+                    decode_responses=True,
+                    socket_connect_timeout=2,
+                )
+    return _async_redis_client
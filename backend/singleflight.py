@@ -0,0 +1,73 @@
+"""
+Redis single-flight locks so concurrent duplicate work runs only once
+"""
+
+import hashlib
+from typing import Optional
+
+import redis
+
+from backend.config import get_settings
+from backend.redis_client import get_redis
+
+settings = get_settings()
+
+KEY_PREFIX = "digestible:singleflight"
+
+# Attempts to claim a key that keeps being released between SET and GET
+CLAIM_ATTEMPTS = 3
+
+
+class SingleFlight:
+    """
+    Claim-or-join coordination keyed by an arbitrary string
+
+    The first caller to ``claim`` a key becomes the leader. The claim records
+    the id the leader's result will have, so callers that lose it get that id
+    straight away and reuse the leader's work, even while it is in progress,
+    instead of repeating it. Redis errors fail open: every caller is treated
+    as a leader.
+    """
+
+    def __init__(self, namespace: str, client: Optional[redis.Redis] = None):
+        self.namespace = namespace
+        self._client = client
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    def _key(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}:{self.namespace}:{digest}"
+
+    def claim(self, key: str, value: str) -> Optional[str]:
+        """
+        Try to become the leader for a key
+
+        Args:
+            key: What the work is about (e.g. a canonical URL)
+            value: Id the caller's result will have if it leads
+
+        Returns:
+            None if the caller is the leader (or leadership is unknown), otherwise
+            the id claimed by the current leader
+        """
+        try:
+            for _ in range(CLAIM_ATTEMPTS):
+                if self.client.set(self._key(key), value, nx=True, ex=settings.singleflight_ttl):
+                    return None
+                leader = self.client.get(self._key(key))
+                if leader is not None:
+                    return leader
+                # Released in between; try to claim it again
+        except redis.RedisError as e:
+            print(f"⚠️  Single-flight unavailable for {self.namespace}: {e}")
+        return None
+
+    def release(self, key: str):
+        """Give up leadership (e.g. after an error), letting the next caller lead"""
+        try:
+            self.client.delete(self._key(key))
+        except redis.RedisError as e:
+            print(f"⚠️  Failed to release single-flight key for {self.namespace}: {e}")
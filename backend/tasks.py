@@ -2,19 +2,70 @@
 Async tasks for article processing
 """
 
-from backend.celery_app import celery_app
+import random
+import time
+
+from backend.audio_demand import get_audio_demand
+from backend.celery_app import TASK_PRIORITY_LOW, celery_app
+from backend.config import get_settings
 from backend.database.connection import SessionLocal
 from backend.database.models import Article, ArticleStatus
-from backend.pipeline.orchestrator import process_article_pipeline
+from backend.pipeline.document import Document
+from backend.pipeline.html_store import get_html_store
+from backend.pipeline.llm_scheduler import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+from backend.pipeline.orchestrator import process_article_pipeline, summarize_and_render
+from backend.pipeline.politeness import FetchDeferred
+from backend.tts import generate_article_audio, get_tts_service
+
+settings = get_settings()
+
+
+def _schedule_resummarize(article_id: str, retry_after: float, deferrals: int = 0):
+    """Queue a re-summarize once the LLM circuit is expected to close"""
+    countdown = retry_after + random.uniform(0, 1 + retry_after * 0.1)
+    resummarize_article_task.apply_async(
+        (article_id,), {"deferrals": deferrals}, countdown=countdown
+    )
+    return countdown
+
+
+def queue_audio(article_id: str, priority: int) -> bool:
+    """
+    Queue synthesis of an article's audio unless it is already queued
+
+    Returns:
+        Whether a task was queued
+    """
+    if not get_audio_demand().claim(article_id):
+        return False
+    generate_audio_task.apply_async((article_id,), priority=priority)
+    return True
+
+
+def _prewarm_audio(article_id: str, user_id: str):
+    """Synthesise audio ahead of time for users who play audio"""
+    if get_audio_demand().recent_listener(user_id):
+        queue_audio(article_id, TASK_PRIORITY_LOW)
 
 
 @celery_app.task(bind=True, name="process_article")
-def process_article_task(self, article_id: int):
+def process_article_task(
+    self,
+    article_id: int,
+    deferrals: int = 0,
+    priority: int = PRIORITY_INTERACTIVE,
+    summary_mode: str = None,
+    summary_quality: str = None,
+):
     """
     Async task to process an article through the full pipeline
 
     Args:
         article_id: Database ID of the article to process
+        deferrals: Times this article has been requeued for domain rate limits
+        priority: LLM quota priority (see ``backend.pipeline.llm_scheduler``)
+        summary_mode: ``"llm"`` or ``"fast"`` (defaults to the ``summary_mode`` setting)
+        summary_quality: Model routing tier (defaults to the ``summary_quality`` setting)
     """
     try:
         # Update status to processing
@@ -25,26 +76,90 @@ def process_article_task(self, article_id: int):
 
             article.status = ArticleStatus.FETCHING
             article_url = article.url  # Store URL before session closes
+            user_id = article.user_id
+            html_sha256 = article.html_sha256
+            html_submitted = article.html_submitted
             db.commit()
 
+        # Use HTML the client supplied at submission time instead of fetching, if
+        # still stored. HTML the server fetched before is not reused here: the
+        # fetch stage revalidates it (If-None-Match / If-Modified-Since).
+        html = get_html_store().get(html_sha256) if html_submitted and html_sha256 else None
+
         # Process the article
-        result = process_article_pipeline(article_url, article_id)
+        result = process_article_pipeline(
+            article_url,
+            article_id,
+            html=html,
+            priority=priority,
+            summary_mode=summary_mode,
+            summary_quality=summary_quality,
+        )
 
         # Update article with results
         with SessionLocal() as db:
             article = db.query(Article).filter(Article.id == article_id).first()
+            if article and article.html_submitted != html_submitted:
+                # Reset to be fetched by the server while this run used the
+                # client's HTML; the run queued for that writes the results
+                return {"status": "superseded", "article_id": article_id}
             if article:
                 article.title = result.get("title", "")
                 article.parsed_text = result.get("content", "")
+                article.html_sha256 = result.get("html_sha256")
+                # Later submissions of the redirect target resolve to this article
+                if result.get("resolved_url"):
+                    article.resolved_url = result["resolved_url"]
                 article.summary = result.get("summary", "")
-                article.audio_path = result.get("audio_path")
-                article.status = ArticleStatus.COMPLETED
+                article.audio_path = None  # Synthesised on first request
+                article.status = (
+                    ArticleStatus.DEFERRED
+                    if result.get("deferred_for") is not None
+                    else ArticleStatus.COMPLETED
+                )
                 article.chunk_count = result.get("chunks_count", 0)
                 article.word_count = result.get("word_count", 0)
+                article.metrics = result.get("metrics") or None
                 db.commit()
 
+        if result.get("deferred_for") is not None:
+            # Parse results are stored; only the summary stages run again
+            countdown = _schedule_resummarize(article_id, result["deferred_for"])
+            return {"status": "deferred", "article_id": article_id, "countdown": countdown}
+
+        _prewarm_audio(article_id, user_id)
         return {"status": "success", "article_id": article_id}
 
+    except FetchDeferred as e:
+        if deferrals < settings.fetch_max_deferrals:
+            # Requeue as a fresh task so rate limiting doesn't use up failure retries
+            with SessionLocal() as db:
+                article = db.query(Article).filter(Article.id == article_id).first()
+                if article:
+                    article.status = ArticleStatus.PENDING
+                    db.commit()
+
+            countdown = e.retry_after + random.uniform(0, 1 + e.retry_after * 0.1)
+            process_article_task.apply_async(
+                (article_id,),
+                {
+                    "deferrals": deferrals + 1,
+                    "priority": priority,
+                    "summary_mode": summary_mode,
+                    "summary_quality": summary_quality,
+                },
+                countdown=countdown,
+            )
+            return {"status": "deferred", "article_id": article_id, "countdown": countdown}
+
+        with SessionLocal() as db:
+            article = db.query(Article).filter(Article.id == article_id).first()
+            if article:
+                article.status = ArticleStatus.FAILED
+                article.error_message = str(e)
+                db.commit()
+        raise
+
     except Exception as e:
         # Update status to failed
         with SessionLocal() as db:
@@ -55,3 +170,105 @@ def process_article_task(self, article_id: int):
                 db.commit()
 
         raise self.retry(countdown=60, max_retries=3, exc=e) from e
+
+
+@celery_app.task(bind=True, name="resummarize_article")
+def resummarize_article_task(self, article_id: str, deferrals: int = 0):
+    """
+    Summarize a DEFERRED article from its stored text, without fetching or parsing
+
+    Args:
+        article_id: Database ID of the article
+        deferrals: Times the LLM has already been found unavailable for it
+    """
+    with SessionLocal() as db:
+        article = db.query(Article).filter(Article.id == article_id).first()
+        if not article or article.status != ArticleStatus.DEFERRED:
+            return {"status": "skipped", "article_id": article_id}
+
+        article.status = ArticleStatus.SUMMARIZING
+        document = Document(article.title or "Untitled", article.parsed_text or "")
+        user_id = article.user_id
+        # Keep the quality tier the article was first routed with
+        quality = (article.metrics or {}).get("routing", {}).get("tier")
+        db.commit()
+
+    try:
+        rendered = summarize_and_render(document, article_id, PRIORITY_BACKGROUND, quality=quality)
+    except Exception as e:
+        with SessionLocal() as db:
+            article = db.query(Article).filter(Article.id == article_id).first()
+            if article:
+                article.status = ArticleStatus.DEFERRED
+                article.error_message = str(e)
+                db.commit()
+        raise
+
+    if "deferred_for" in rendered:
+        with SessionLocal() as db:
+            article = db.query(Article).filter(Article.id == article_id).first()
+            if article:
+                article.summary = rendered["summary"]
+                article.metrics = {**(article.metrics or {}), **rendered["metrics"]}
+                article.status = ArticleStatus.DEFERRED
+                article.error_message = rendered["deferred_reason"]
+                db.commit()
+
+        if deferrals + 1 < settings.summary_max_deferrals:
+            countdown = _schedule_resummarize(article_id, rendered["deferred_for"], deferrals + 1)
+            return {"status": "deferred", "article_id": article_id, "countdown": countdown}
+        # Left DEFERRED; resummarize_article_task can be queued again later
+        return {"status": "deferred", "article_id": article_id, "countdown": None}
+
+    with SessionLocal() as db:
+        article = db.query(Article).filter(Article.id == article_id).first()
+        if article:
+            article.summary = rendered["summary"]
+            article.audio_path = None  # Any audio was of the interim summary
+            article.metrics = {**(article.metrics or {}), **rendered["metrics"]}
+            article.status = ArticleStatus.COMPLETED
+            article.error_message = None
+            db.commit()
+
+    _prewarm_audio(article_id, user_id)
+    return {"status": "success", "article_id": article_id}
+
+
+@celery_app.task(name="generate_audio")
+def generate_audio_task(article_id: str):
+    """
+    Synthesise an article's summary into the audio cache
+
+    Queued by the first request for the audio (see ``queue_audio``), so the
+    pipeline itself never waits on text-to-speech.
+
+    Args:
+        article_id: Database ID of the article
+    """
+    try:
+        with SessionLocal() as db:
+            article = db.query(Article).filter(Article.id == article_id).first()
+            if not article or not article.summary:
+                return {"status": "skipped", "article_id": article_id}
+            summary = article.summary
+
+        started = time.perf_counter()
+        audio_path = generate_article_audio(article_id, summary)
+        backend = get_tts_service().backend
+        audio = {
+            "backend": backend.name,
+            "voice": backend.voice,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+        with SessionLocal() as db:
+            article = db.query(Article).filter(Article.id == article_id).first()
+            # Only if the summary wasn't replaced while synthesising
+            if article and article.summary == summary:
+                article.audio_path = audio_path
+                article.metrics = {**(article.metrics or {}), "audio": audio}
+                db.commit()
+
+        return {"status": "success", "article_id": article_id}
+    finally:
+        get_audio_demand().release(article_id)
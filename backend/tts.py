@@ -1,58 +1,251 @@
 """
-Text-to-Speech functionality using Google TTS
+Text-to-Speech functionality
+Pluggable synthesis backends: Google TTS (network), espeak-ng (local)
+
+Text is split at sentence boundaries into short segments that are
+synthesised concurrently, then the segments' MP3 frames are written one
+after another into a single file, without decoding or re-encoding. Files
+are kept in the content-addressed audio cache, so the same text is only
+ever synthesised once per voice, language and backend.
 """
 
-import tempfile
-from pathlib import Path
+import io
+import os
+import re
+import shutil
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
 
 from gtts import gTTS
 
+from backend.audio_cache import AudioCache, audio_cache_key, get_audio_cache
+from backend.config import get_settings
+from backend.mp3 import audio_frames, id3v2_tag
+
+settings = get_settings()
+
+# Sentence ends and line breaks (summary bullets are one per line)
+SEGMENT_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\s*\n\s*")
+
+
+def split_segments(text: str, max_chars: int) -> List[str]:
+    """
+    Pack consecutive sentences into segments of at most ``max_chars``
+
+    A sentence longer than ``max_chars`` becomes a segment of its own.
+    """
+    segments = []
+    current = ""
+    for sentence in SEGMENT_BOUNDARY.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            segments.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        segments.append(current)
+    return segments
+
+
+class TTSBackend(ABC):
+    """
+    Base class for speech synthesis engines
+
+    Backends turn one text segment into a complete MP3 file. Segments are
+    joined frame by frame, so a backend must encode every segment with the
+    same sample rate and channel mode.
+    """
+
+    name = ""
+
+    @property
+    @abstractmethod
+    def voice(self) -> str:
+        """Voice the audio is rendered with (part of audio cache keys)"""
+
+    def available(self) -> bool:
+        """Whether the engine can run here"""
+        return True
+
+    @abstractmethod
+    def synthesize(self, text: str) -> bytes:
+        """Synthesise one segment; returns MP3 bytes"""
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate's TTS service: one network round trip per segment, rate limited"""
+
+    name = "gtts"
+
+    @property
+    def voice(self) -> str:
+        return settings.tts_voice
+
+    def synthesize(self, text: str) -> bytes:
+        buffer = io.BytesIO()
+        gTTS(
+            text=text,
+            tld=settings.tts_voice,
+            lang=settings.tts_language,
+            slow=False,
+            timeout=settings.tts_timeout,
+        ).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class EspeakBackend(TTSBackend):
+    """
+    Local espeak-ng engine, encoded to MP3 with LAME
+
+    Needs the ``espeak-ng`` and ``lame`` executables but no network, so it
+    works air-gapped and a short segment takes tens of milliseconds.
+    """
+
+    name = "espeak"
+
+    # espeak-ng writes 22.05kHz mono; fixed encoder settings keep segments joinable
+    LAME_ARGS = ["--quiet", "-m", "m", "-b", "32", "--resample", "22.05"]
+
+    @property
+    def voice(self) -> str:
+        return settings.tts_espeak_voice or settings.tts_language
+
+    def available(self) -> bool:
+        return bool(shutil.which("espeak-ng") and shutil.which("lame"))
+
+    def synthesize(self, text: str) -> bytes:
+        wav = subprocess.run(
+            ["espeak-ng", "--stdout", "-v", self.voice, "-s", str(settings.tts_espeak_speed)],
+            input=text.encode("utf-8"),
+            capture_output=True,
+            check=True,
+            timeout=settings.tts_timeout,
+        ).stdout
+        return subprocess.run(
+            ["lame", *self.LAME_ARGS, "-", "-"],
+            input=wav,
+            capture_output=True,
+            check=True,
+            timeout=settings.tts_timeout,
+        ).stdout
+
+
+TTS_BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    EspeakBackend.name: EspeakBackend,
+}
+
+# Backend instances, created on first use
+_tts_backends: Dict[str, TTSBackend] = {}
+_tts_backends_lock = threading.Lock()
+
+
+def get_tts_backend(name: Optional[str] = None) -> TTSBackend:
+    """Get a TTS backend by name (defaults to ``settings.tts_backend``)"""
+    name = name or settings.tts_backend
+    if name not in _tts_backends:
+        if name not in TTS_BACKENDS:
+            raise ValueError(f"Unknown TTS backend: {name}")
+        with _tts_backends_lock:
+            if name not in _tts_backends:
+                _tts_backends[name] = TTS_BACKENDS[name]()
+    return _tts_backends[name]
+
 
 class TTSService:
-    """Text-to-Speech service using Google TTS"""
+    """
+    Text-to-Speech service
+
+    ``backend`` synthesises the segments; it defaults to ``settings.tts_backend``
+    and can be replaced, e.g. by a local stand-in in tests. Its name and voice
+    are part of every audio cache key, and each file is tagged with them.
+    """
+
+    def __init__(self, backend: Optional[TTSBackend] = None, cache: Optional[AudioCache] = None):
+        self.backend = backend or get_tts_backend()
+        self._cache = cache
 
-    def __init__(self):
-        # Google TTS doesn't need initialization
-        pass
+    @property
+    def cache(self) -> AudioCache:
+        return self._cache or get_audio_cache()
+
+    def cache_key(self, text: str) -> str:
+        return audio_cache_key(text, self.backend.voice, settings.tts_language, self.backend.name)
+
+    def iter_audio(self, text: str) -> Iterator[bytes]:
+        """
+        Yield an ID3 tag naming the backend, then the MP3 frames of each segment
+
+        Up to ``tts_parallelism`` segments are synthesised at a time; each is
+        yielded as soon as it and every segment before it are done.
+        """
+        segments = split_segments(text, settings.tts_segment_chars)
+        if not segments:
+            raise ValueError("No text to synthesise")
+        yield id3v2_tag({"TSSE": f"{self.backend.name} ({self.backend.voice})"})
+        workers = max(1, min(settings.tts_parallelism, len(segments)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts") as pool:
+            # Each request has tts_timeout; the whole article has tts_deadline
+            for data in pool.map(self.backend.synthesize, segments, timeout=settings.tts_deadline):
+                yield audio_frames(data)
 
     def generate_audio(self, text: str, output_path: str = None) -> str:
         """
-        Generate audio from text using Google TTS
+        Generate audio from text
 
         Args:
             text: Text to convert to speech
-            output_path: Optional output path, defaults to temp file
+            output_path: Optional output path, defaults to the audio cache
 
         Returns:
-            Path to generated audio file
+            Path to generated (or previously cached) MP3 file
         """
         if output_path is None:
-            # Create temp file
-            temp_dir = Path(tempfile.gettempdir()) / "digestible_audio"
-            temp_dir.mkdir(exist_ok=True)
-            output_path = temp_dir / f"tts_{hash(text)}.mp3"
+            key = self.cache_key(text)
+            cached = self.cache.get(key)
+            if cached:
+                return str(cached)
+            try:
+                return str(self.cache.write(key, self.iter_audio(text)))
+            except Exception as e:
+                print(f"❌ TTS generation failed: {e}")
+                raise
 
+        partial = f"{output_path}.part"
         try:
-            # Generate speech using Google TTS
-            tts = gTTS(text=text, lang="en", slow=False)
-            tts.save(str(output_path))
+            # Write segments as they complete; readers only ever see the whole file
+            with open(partial, "wb") as audio_file:
+                for frames in self.iter_audio(text):
+                    audio_file.write(frames)
+            os.replace(partial, output_path)
 
             return str(output_path)
 
         except Exception as e:
             print(f"❌ TTS generation failed: {e}")
+            if os.path.exists(partial):
+                os.remove(partial)
             raise
 
 
 # Global TTS service instance
 _tts_service = None
+_tts_service_lock = threading.Lock()
 
 
 def get_tts_service() -> TTSService:
     """Get or create TTS service instance"""
     global _tts_service
     if _tts_service is None:
-        _tts_service = TTSService()
+        with _tts_service_lock:
+            if _tts_service is None:
+                _tts_service = TTSService()
     return _tts_service
 
 
@@ -65,18 +258,13 @@ def generate_article_audio(article_id: str, summary_text: str) -> str:
         summary_text: Summary text to convert to speech
 
     Returns:
-        Path to generated audio file
+        Path to the audio file in the shared audio cache
     """
     try:
         tts = get_tts_service()
 
-        # Create output path
-        audio_dir = Path("audio")
-        audio_dir.mkdir(exist_ok=True)
-        output_path = audio_dir / f"article_{article_id}.wav"
-
-        # Generate audio
-        audio_path = tts.generate_audio(summary_text, output_path)
+        # Identical summaries share one cached file
+        audio_path = tts.generate_audio(summary_text)
 
         print(f"✅ Generated audio for article {article_id}: {audio_path}")
         return audio_path
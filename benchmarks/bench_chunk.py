@@ -0,0 +1,66 @@
+"""
+Chunker scaling benchmark
+
+Times the original string-concatenating chunker against the span-based
+chunker on texts from 125KB to 1MB. Linear scaling shows up as a constant
+time per MB. Both are linear; the span-based chunker costs more per MB for
+its sentence boundary and token estimates (see the README).
+
+Usage:
+    DATABASE_URL=sqlite:// python -m benchmarks.bench_chunk
+"""
+
+import time
+
+from backend.pipeline.chunk import plan_chunks
+
+SENTENCE = (
+    "The committee reviewed the proposal in detail, and Dr. Lee noted that costs "
+    "rose 4.5 percent. Was the estimate realistic? Nobody was sure! "
+)
+
+
+def original_chunker(text: str, chunk_size: int = 1000) -> list:
+    """The previous implementation, without its max_chunks cut-off"""
+    sentences = text.split(". ")
+    chunks = []
+    current_chunk = ""
+    for sentence in sentences:
+        if len(current_chunk) + len(sentence) < chunk_size:
+            current_chunk += sentence + ". "
+        else:
+            if current_chunk:
+                chunks.append(current_chunk.strip())
+            current_chunk = sentence + ". "
+    if current_chunk:
+        chunks.append(current_chunk.strip())
+    return chunks
+
+
+def best_of(func, repeat: int = 3) -> float:
+    """Best wall-clock time of several runs, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    print(f"{'size':>8}{'original':>12}{'per MB':>10}{'spans':>12}{'per MB':>10}{'chunks':>8}")
+    for size in [125_000, 250_000, 500_000, 1_000_000]:
+        text = (SENTENCE * (size // len(SENTENCE) + 1))[:size]
+        megabytes = size / 1_000_000
+
+        original = best_of(lambda text=text: original_chunker(text))
+        spans = best_of(lambda text=text: plan_chunks(text, max_chunks=10**9))
+        count = len(plan_chunks(text, max_chunks=10**9).chunks)
+        print(
+            f"{size // 1000:>6}KB{original:>10.1f}ms{original / megabytes:>8.0f}ms"
+            f"{spans:>10.1f}ms{spans / megabytes:>8.0f}ms{count:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
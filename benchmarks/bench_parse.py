@@ -0,0 +1,70 @@
+"""
+Parser backend benchmark
+
+Checks that the lxml backend extracts the same title and text as BeautifulSoup
+on the fixture corpus, then times every backend (including the readability
+extractor, which selects content differently) on the fixtures and on ~1MB pages.
+
+Usage:
+    DATABASE_URL=sqlite:// python -m benchmarks.bench_parse
+"""
+
+import re
+import time
+from pathlib import Path
+
+from backend.pipeline.parse import PARSER_BACKENDS, parse_article
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures" / "html"
+REFERENCE = "bs4"
+EQUIVALENT = ["lxml"]  # Backends that must match the reference exactly
+
+
+def inflate(html: str, target_bytes: int = 1_000_000) -> str:
+    """Repeat a page's <body> content until the document reaches target_bytes"""
+    match = re.search(r"<body[^>]*>(.*)</body>", html, re.S)
+    body = match.group(1)
+    repeats = max(1, target_bytes // len(body))
+    return html[: match.start(1)] + body * repeats + html[match.end(1) :]
+
+
+def best_of(func, repeat: int = 5) -> float:
+    """Best wall-clock time of several runs, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    corpus = {
+        path.stem: path.read_text(encoding="utf-8") for path in sorted(FIXTURES.glob("*.html"))
+    }
+    large = {f"{name} (1MB)": inflate(html) for name, html in corpus.items()}
+
+    # Equivalence
+    for name, html in {**corpus, **large}.items():
+        reference = parse_article(html, backend=REFERENCE)
+        for backend in EQUIVALENT:
+            result = parse_article(html, backend=backend)
+            assert result == reference, f"{backend} differs from {REFERENCE} on {name}"
+    documents = len(corpus) + len(large)
+    print(f"✅ {', '.join(EQUIVALENT)} agree with {REFERENCE} on {documents} documents\n")
+
+    # Timing
+    backends = list(PARSER_BACKENDS)
+    print(f"{'document':<36}" + "".join(f"{name:>12}" for name in backends) + f"{'lxml gain':>10}")
+    for name, html in {**corpus, **large}.items():
+        timings = {
+            b: best_of(lambda b=b, html=html: parse_article(html, backend=b), repeat=3)
+            for b in backends
+        }
+        speedup = timings[REFERENCE] / timings["lxml"]
+        row = "".join(f"{timings[b]:>10.2f}ms" for b in backends)
+        print(f"{name:<36}{row}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+TTS backend benchmark
+
+Times cold synthesis (bypassing the audio cache) of a short and a long
+summary with every backend that can run here, and reports the audio length
+and real-time factor (synthesis time / audio time; below 1 is faster than
+playback). Backends missing their executables or network are skipped.
+
+Usage:
+    DATABASE_URL=sqlite:// python -m benchmarks.bench_tts
+"""
+
+import time
+
+from backend.mp3 import SAMPLE_RATES, iter_frames
+from backend.tts import TTS_BACKENDS, TTSService, get_tts_backend
+
+BULLETS = [
+    "• The city council approved the new transit budget after a long debate.",
+    "• Ridership has recovered to 92 percent of its level before the pandemic.",
+    "• Fares stay the same this year, but express routes will run more often.",
+    "• Critics said the plan does little for neighbourhoods without rail.",
+    "• A final vote on the capital projects is expected next month.",
+]
+
+SUMMARIES = {
+    "short (3 bullets)": "\n".join(BULLETS[:3]),
+    "long (15 bullets)": "\n".join(BULLETS * 3),
+}
+
+
+def audio_seconds(data: bytes) -> float:
+    """Playing time of MP3 data, from its frame headers"""
+    seconds = 0.0
+    for frame in iter_frames(data):
+        version = (frame[1] >> 3) & 0x3
+        rate = SAMPLE_RATES[version][(frame[2] >> 2) & 0x3]
+        seconds += (1152 if version == 3 else 576) / rate
+    return seconds
+
+
+def main():
+    print(f"{'backend':<10}{'summary':<20}{'synthesis':>12}{'audio':>10}{'RTF':>8}")
+    for name in TTS_BACKENDS:
+        backend = get_tts_backend(name)
+        if not backend.available():
+            print(f"{name:<10}skipped: engine not installed")
+            continue
+        service = TTSService(backend=backend)
+        for label, text in SUMMARIES.items():
+            start = time.perf_counter()
+            try:
+                data = b"".join(service.iter_audio(text))
+            except Exception as e:
+                print(f"{name:<10}{label:<20}failed: {e}")
+                break
+            elapsed = time.perf_counter() - start
+            audio = audio_seconds(data)
+            rtf = elapsed / audio if audio else float("nan")
+            print(f"{name:<10}{label:<20}{elapsed * 1000:>10.0f}ms{audio:>9.1f}s{rtf:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,15 @@
 // API configuration
 const API_BASE_URL = 'http://localhost:8000';
 
+// Largest compressed + base64 page the backend accepts (max_submitted_html_bytes)
+const MAX_PAGE_HTML_BYTES = 2000000;
+
+// Tab the popup was opened on
+let currentTab = null;
+
+// Live summary stream for the article shown in the modal
+let summaryStream = null;
+
 // DOM elements
 let articlesList, articleModal, articleDetail, closeBtn, articleCount;
 
@@ -22,6 +31,7 @@ document.addEventListener('DOMContentLoaded', function() {
   // Pre-fill with current tab URL
   chrome.tabs.query({active: true, currentWindow: true}, function(tabs) {
     if (tabs[0] && tabs[0].url) {
+      currentTab = tabs[0];
       urlInput.value = tabs[0].url;
     }
   });
@@ -35,12 +45,14 @@ document.addEventListener('DOMContentLoaded', function() {
   // Handle modal close
   closeBtn.addEventListener('click', () => {
     articleModal.style.display = 'none';
+    closeSummaryStream();
   });
 
   // Close modal when clicking outside
   window.addEventListener('click', (event) => {
     if (event.target === articleModal) {
       articleModal.style.display = 'none';
+      closeSummaryStream();
     }
   });
 });
@@ -60,13 +72,22 @@ async function handleSubmit(e) {
   submitStatus.textContent = '';
 
   try {
+    // Send the rendered page along so the backend can skip downloading it
+    const payload = { url: url };
+    if (currentTab && currentTab.url === url) {
+      const html = await capturePageHtml(currentTab.id);
+      if (html) {
+        payload.html = html;
+      }
+    }
+
     // Submit to backend API
     const response = await fetch(`${API_BASE_URL}/api/v1/articles`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
       },
-      body: JSON.stringify({ url: url })
+      body: JSON.stringify(payload)
     });
 
     if (response.ok) {
@@ -118,6 +139,33 @@ async function handleSubmit(e) {
   }
 }
 
+// Capture the tab's rendered DOM as gzip + base64, or null if unavailable
+async function capturePageHtml(tabId) {
+  try {
+    const [injection] = await chrome.scripting.executeScript({
+      target: { tabId: tabId },
+      func: () => document.documentElement.outerHTML
+    });
+    if (!injection || !injection.result) return null;
+
+    const stream = new Blob([injection.result]).stream().pipeThrough(new CompressionStream('gzip'));
+    const compressed = new Uint8Array(await new Response(stream).arrayBuffer());
+
+    // Base64 in slices to stay under the argument limit of String.fromCharCode
+    let binary = '';
+    for (let i = 0; i < compressed.length; i += 0x8000) {
+      binary += String.fromCharCode.apply(null, compressed.subarray(i, i + 0x8000));
+    }
+    const encoded = btoa(binary);
+
+    // Too large pages are left for the backend to fetch itself
+    return encoded.length <= MAX_PAGE_HTML_BYTES ? encoded : null;
+  } catch (error) {
+    console.warn('Could not capture page HTML, backend will fetch it:', error);
+    return null;
+  }
+}
+
 // Load articles from local storage
 async function loadArticles() {
   try {
@@ -235,6 +283,11 @@ async function showArticleDetail(articleId) {
     if (playBtn && audioElement) {
       playBtn.addEventListener('click', async () => {
         try {
+          // Audio is generated on first request; wait until the server has it
+          playBtn.textContent = '⏳ Preparing audio...';
+          playBtn.disabled = true;
+          await waitForAudio(articleId);
+
           // Set audio source to the API endpoint
           audioElement.src = `${API_BASE_URL}/api/v1/articles/${articleId}/audio`;
           audioElement.style.display = 'block';
@@ -259,11 +312,85 @@ async function showArticleDetail(articleId) {
 
     articleModal.style.display = 'block';
 
+    // Show the summary as it is generated instead of waiting for the next poll
+    if (article.status !== 'COMPLETED' && article.status !== 'FAILED') {
+      streamSummary(articleId, articleDetail.querySelector('.summary-content'));
+    }
+
   } catch (error) {
     console.error('Error showing article detail:', error);
   }
 }
 
+// Poll the audio endpoint until it stops answering 202 (generation in progress)
+async function waitForAudio(articleId, maxAttempts = 60) {
+  const url = `${API_BASE_URL}/api/v1/articles/${articleId}/audio`;
+  for (let attempt = 0; attempt < maxAttempts; attempt++) {
+    const controller = new AbortController();
+    const response = await fetch(url, { signal: controller.signal });
+    // Only the status is needed here; the audio element downloads the file
+    controller.abort();
+    if (response.status !== 202) {
+      if (!response.ok) {
+        throw new Error(`Audio unavailable (${response.status})`);
+      }
+      return;
+    }
+    const retryAfter = parseInt(response.headers.get('Retry-After'), 10) || 2;
+    await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+  }
+  throw new Error('Timed out waiting for audio');
+}
+
+// Stop relaying the live summary
+function closeSummaryStream() {
+  if (summaryStream) {
+    summaryStream.close();
+    summaryStream = null;
+  }
+}
+
+// Relay summary text from the server-sent events endpoint into the modal
+function streamSummary(articleId, summaryElement) {
+  closeSummaryStream();
+
+  let text = '';
+  summaryStream = new EventSource(`${API_BASE_URL}/api/v1/articles/${articleId}/summary/stream`);
+
+  summaryStream.addEventListener('delta', (event) => {
+    text += JSON.parse(event.data).text;
+    summaryElement.textContent = text;
+  });
+
+  summaryStream.addEventListener('reset', () => {
+    text = '';
+    summaryElement.textContent = 'Article is being processed...';
+  });
+
+  summaryStream.addEventListener('done', (event) => {
+    const summary = JSON.parse(event.data).summary;
+    summaryElement.textContent = summary;
+    updateArticleLocally(articleId, { summary });
+    closeSummaryStream();
+  });
+
+  summaryStream.addEventListener('deferred', (event) => {
+    // Interim extractive summary until the AI summary is generated
+    const summary = JSON.parse(event.data).summary;
+    if (summary) {
+      summaryElement.textContent = summary;
+      updateArticleLocally(articleId, { summary });
+    } else {
+      summaryElement.textContent = 'Summary service is busy, the summary will be generated shortly...';
+    }
+    closeSummaryStream();
+  });
+
+  summaryStream.addEventListener('failed', () => {
+    closeSummaryStream();
+  });
+}
+
 // Format date for display
 function formatDate(dateString) {
   const date = new Date(dateString);
@@ -2,12 +2,19 @@
 Test configuration and fixtures for backend tests
 """
 
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from backend.config import Settings
 from backend.database.connection import Base
+from backend.pipeline import compress, llm
+from backend.pipeline.llm_router import ModelRouter, ModelStats
 
 
 @pytest.fixture(scope="session")
@@ -55,3 +62,197 @@ def reset_db_engine():
     """
     # For now, just yield - we'll handle engine reset in individual tests if needed
     yield
+
+
+DELAY = 0.2  # Seconds each stub completion takes
+
+
+class StubOpenRouter(ThreadingHTTPServer):
+    """Local stand-in for the OpenRouter /chat/completions endpoint"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.prompts = []
+        self.models = []
+        self.failures = {}  # model -> status codes to return before succeeding (0 = cut stream)
+        self.streamed = []  # Whether each request asked for a streamed completion
+        self.word_delay = 0.0  # Seconds between streamed events
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/v1"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        assert self.path == "/api/v1/chat/completions"
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][0]["content"]
+
+        with server.lock:
+            server.prompts.append(prompt)
+            server.models.append(body["model"])
+            server.streamed.append(bool(body.get("stream")))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            failures = server.failures.get(body["model"])
+            status = failures.pop(0) if failures else 200
+        time.sleep(DELAY)
+        with server.lock:
+            server.in_flight -= 1
+
+        if status not in (0, 200):
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if prompt.startswith("The following is one section"):
+            content = "• section point"
+        elif prompt.startswith("The following are summaries") and "Merged" in prompt:
+            content = "• merged point"
+        else:
+            content = "• final point"
+        if body.get("stream"):
+            self.send_stream(content, cut=status == 0)
+            return
+
+        payload = json.dumps(
+            {"choices": [{"message": {"content": content}}], "usage": {"total_tokens": 42}}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_stream(self, content, cut=False):
+        """Send the completion as server-sent events, one word per event"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        self.wfile.write(b": OPENROUTER PROCESSING\n\n")
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            delta = word if i == 0 else f" {word}"
+            chunk = {"choices": [{"delta": {"content": delta}}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.server.word_delay)
+            if cut:
+                # Drop the connection part-way through
+                return
+        usage = {"choices": [], "usage": {"total_tokens": 42}}
+        self.wfile.write(f"data: {json.dumps(usage)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubScheduler:
+    """Records quota reservations instead of queueing in Redis"""
+
+    def __init__(self):
+        self.acquired = []
+        self.settled = []
+        self.paused = []
+
+    def acquire(self, tokens, priority=0):
+        self.acquired.append((tokens, priority))
+
+    def settle(self, reserved, used):
+        self.settled.append((reserved, used))
+
+    def pause(self, seconds):
+        self.paused.append(seconds)
+
+
+class StubBreaker:
+    """In-memory circuit breaker with the same threshold rules as the Redis one"""
+
+    def __init__(self, model):
+        self.model = model
+        self.failures = 0
+        self.open_until = 0.0
+
+    def retry_after(self):
+        return max(0.0, self.open_until - time.monotonic())
+
+    def record_success(self):
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= llm.settings.llm_breaker_threshold:
+            self.open_until = time.monotonic() + llm.settings.llm_breaker_cooldown
+            self.failures = 0
+
+
+class StubStats(ModelStats):
+    """Keeps each model's recent request outcomes in memory instead of Redis"""
+
+    def __init__(self):
+        super().__init__()
+        self.entries = {}
+
+    def record(self, model, seconds, ok):
+        self.entries.setdefault(model, []).insert(0, f"{int(ok)}:{seconds:.3f}")
+
+    def windows(self, models):
+        window = llm.settings.summary_route_window
+        return [self.entries.get(model, [])[:window] for model in models]
+
+
+class StubLexicon(compress.BoilerplateLexicon):
+    """Boilerplate lexicon whose learn script runs in memory instead of Redis"""
+
+    def __init__(self):
+        super().__init__()
+        self.counts = {}
+        self.seen = set()
+        self._script = self._learn
+
+    def _learn(self, keys, args):
+        fresh = keys[1] not in self.seen
+        self.seen.add(keys[1])
+        for phrase in args[2:]:
+            if fresh:
+                self.counts[phrase] = self.counts.get(phrase, 0) + 1
+        return [self.counts.get(phrase, 0) for phrase in args[2:]]
+
+
+@pytest.fixture
+def lexicon(monkeypatch):
+    """Keep boilerplate learning off Redis"""
+    stub = StubLexicon()
+    monkeypatch.setattr(compress, "get_boilerplate_lexicon", lambda: stub)
+    return stub
+
+
+@pytest.fixture
+def openrouter(monkeypatch, lexicon):
+    """Point the LLM client at a local stub server, with an in-memory circuit breaker"""
+    server = StubOpenRouter()
+    stats = StubStats()
+    client = llm.LLMClient(breaker_factory=StubBreaker, scheduler=StubScheduler(), stats=stats)
+    server.stats = stats
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(llm.settings, "openrouter_api_key", "test_key")
+    monkeypatch.setattr(llm.settings, "openrouter_base_url", server.base_url)
+    monkeypatch.setattr(llm.settings, "summary_parallelism", 4)
+    monkeypatch.setattr(llm.settings, "summary_fallback_models", [])
+    monkeypatch.setattr(llm.settings, "llm_backoff_base", 0.01)
+    monkeypatch.setattr(llm, "get_llm_client", lambda: client)
+    monkeypatch.setattr("backend.pipeline.summarize.get_llm_client", lambda: client)
+    monkeypatch.setattr("backend.pipeline.summarize.get_model_router", lambda: ModelRouter(stats))
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -103,3 +103,462 @@ async def test_get_article():
         assert data["id"] == article_id
         assert "status" in data
         assert "url" in data
+
+
+@pytest.mark.asyncio
+async def test_submit_articles_batch(db_session):
+    """Test bulk submission dedupes, skips existing URLs and enqueues one group"""
+    from unittest.mock import patch
+
+    from httpx import ASGITransport
+
+    def override_get_db():
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    stamp = int(time.time() * 1000)
+    urls = [
+        f"https://example.com/batch-{stamp}-1",
+        f"https://example.com/batch-{stamp}-2",
+        f"https://example.com/batch-{stamp}-1",
+        "not a url",
+    ]
+
+    try:
+        with patch("backend.api.articles.group") as mock_group:
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://testserver"
+            ) as client:
+                first = await client.post("/api/v1/articles/batch", json={"urls": urls})
+                second = await client.post("/api/v1/articles/batch", json={"urls": urls[:2]})
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+    assert first.status_code == 200
+    data = first.json()
+    assert data["created"] == 2
+    statuses = [item["status"] for item in data["results"]]
+    assert statuses == ["created", "created", "duplicate", "invalid"]
+    assert data["results"][0]["id"] == data["results"][2]["id"]
+    assert data["results"][3]["id"] is None
+
+    repeat = second.json()
+    assert repeat["created"] == 0
+    assert [item["status"] for item in repeat["results"]] == ["exists", "exists"]
+    assert [item["id"] for item in repeat["results"]] == [
+        item["id"] for item in data["results"][:2]
+    ]
+
+    # Only the first request had new articles to publish
+    assert mock_group.call_count == 1
+    mock_group.return_value.apply_async.assert_called_once_with()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_canonical_inserts_conflict(db_session):
+    """Test a page stored after the duplicate check is reported, not inserted again"""
+    from unittest.mock import MagicMock, patch
+
+    from httpx import ASGITransport
+
+    from backend.database import Article, ArticleStatus
+
+    def override_get_db():
+        yield db_session
+
+    stamp = int(time.time() * 1000)
+    stored = Article(
+        user_id="other",
+        url=f"https://example.com/race-{stamp}?utm_source=feed",
+        canonical_url=f"https://example.com/race-{stamp}",
+        status=ArticleStatus.PENDING,
+    )
+    db_session.add(stored)
+    db_session.commit()
+    # Both checks run before the other submission's commit lands
+    missed_existing = MagicMock(side_effect=[{}, {stored.canonical_url: stored.id}])
+    missed_find = MagicMock(side_effect=[None, stored])
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with (
+            patch("backend.api.articles._existing_by_canonical", missed_existing),
+            patch("backend.api.articles._find_existing", missed_find),
+            patch("backend.api.articles._submissions", MagicMock(**{"claim.return_value": None})),
+            patch("backend.api.articles.process_article_task") as mock_task,
+            patch("backend.api.articles.group") as mock_group,
+        ):
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://testserver"
+            ) as client:
+                batch = await client.post(
+                    "/api/v1/articles/batch", json={"urls": [f"https://example.com/race-{stamp}"]}
+                )
+                single = await client.post(
+                    "/api/v1/articles", json={"url": f"http://example.com/race-{stamp}/"}
+                )
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+    assert batch.json()["created"] == 0
+    assert batch.json()["results"][0]["status"] == "exists"
+    assert batch.json()["results"][0]["id"] == stored.id
+    assert single.status_code == 409
+    assert stored.id in single.json()["detail"]
+    assert db_session.query(Article).filter(Article.url.like(f"%race-{stamp}%")).count() == 1
+    mock_group.assert_not_called()
+    mock_task.delay.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_submit_article_dedupes(db_session):
+    """Test other forms of a stored URL, its redirect target and in-flight claims are reused"""
+    from unittest.mock import patch
+
+    import fakeredis
+    from httpx import ASGITransport
+
+    from backend.database import Article
+    from backend.singleflight import SingleFlight
+    from backend.urls import canonicalize_url
+
+    def override_get_db():
+        yield db_session
+
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    submissions = SingleFlight("submissions", client=redis_client)
+    stamp = int(time.time() * 1000)
+    in_flight_url = f"https://example.com/dedupe-{stamp}-in-flight"
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with (
+            patch("backend.api.articles._submissions", submissions),
+            patch("backend.api.articles.process_article_task") as mock_task,
+        ):
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://testserver"
+            ) as client:
+                created = await client.post(
+                    "/api/v1/articles",
+                    json={"url": f"https://www.example.com/dedupe-{stamp}/?utm_source=feed"},
+                )
+                article_id = created.json()["id"]
+                # Found in the database, not only through the claim
+                redis_client.flushall()
+                variant = await client.post(
+                    "/api/v1/articles", json={"url": f"http://example.com/dedupe-{stamp}"}
+                )
+
+                article = db_session.get(Article, article_id)
+                article.resolved_url = f"https://example.com/dedupe-{stamp}-moved"
+                db_session.commit()
+                redirected = await client.post(
+                    "/api/v1/articles",
+                    json={"url": f"https://example.com/dedupe-{stamp}-moved?fbclid=x"},
+                )
+
+                # Another submission is still creating its article
+                submissions.claim(canonicalize_url(in_flight_url), "leader-id")
+                in_flight = await client.post("/api/v1/articles", json={"url": in_flight_url})
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+    assert created.status_code == 201
+    assert variant.status_code == redirected.status_code == 409
+    assert article_id in variant.json()["detail"]
+    assert article_id in redirected.json()["detail"]
+    assert in_flight.status_code == 409
+    assert "leader-id" in in_flight.json()["detail"]
+    assert not db_session.query(Article).filter(Article.url == in_flight_url).count()
+    mock_task.delay.assert_called_once_with(article_id, summary_mode=None, summary_quality=None)
+
+
+@pytest.mark.asyncio
+async def test_submit_article_with_html(db_session, tmp_path):
+    """Test client-supplied HTML is stored and referenced instead of fetched"""
+    import base64
+    import gzip
+    from unittest.mock import MagicMock, patch
+
+    from httpx import ASGITransport
+
+    from backend.database import Article
+    from backend.pipeline.html_store import HTMLStore
+
+    def override_get_db():
+        yield db_session
+
+    html = "<html><head><title>Captured</title></head><body><p>Body</p></body></html>"
+    payload = base64.b64encode(gzip.compress(html.encode())).decode()
+    store = HTMLStore(tmp_path)
+    unique_url = f"https://example.com/test-article-html-{int(time.time() * 1000)}"
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with (
+            patch("backend.api.articles.get_html_store", return_value=store),
+            patch("backend.api.articles._submissions", MagicMock(**{"claim.return_value": None})),
+            patch("backend.api.articles.process_article_task") as mock_task,
+        ):
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://testserver"
+            ) as client:
+                response = await client.post(
+                    "/api/v1/articles", json={"url": unique_url, "html": payload}
+                )
+                oversized = await client.post(
+                    "/api/v1/articles",
+                    json={
+                        "url": unique_url + "-big",
+                        "html": base64.b64encode(gzip.compress(b" " * 2_000_000)).decode(),
+                    },
+                )
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+    assert response.status_code == 201
+    article = db_session.query(Article).filter(Article.id == response.json()["id"]).one()
+    assert store.get(article.html_sha256) == html
+    assert article.html_submitted
+    mock_task.delay.assert_called_once_with(article.id, summary_mode=None, summary_quality=None)
+    assert oversized.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_submitted_html_refetched_before_sharing(db_session, tmp_path):
+    """Test another user is only given a client-HTML article after the server fetches it"""
+    import base64
+    import gzip
+    from unittest.mock import MagicMock, patch
+
+    from httpx import ASGITransport
+
+    from backend.database import Article
+    from backend.pipeline.html_store import HTMLStore
+
+    def override_get_db():
+        yield db_session
+
+    payload = base64.b64encode(gzip.compress(b"<html><body><p>Made up</p></body></html>"))
+    unique_url = f"https://example.com/test-article-shared-{int(time.time() * 1000)}"
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with (
+            patch("backend.api.articles.get_html_store", return_value=HTMLStore(tmp_path)),
+            patch("backend.api.articles._submissions", MagicMock(**{"claim.return_value": None})),
+            patch("backend.api.articles.SummaryPublisher") as mock_publisher,
+            patch("backend.api.articles.process_article_task") as mock_task,
+        ):
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://testserver"
+            ) as client:
+                created = await client.post(
+                    "/api/v1/articles",
+                    json={"url": unique_url, "user_id": "author", "html": payload.decode()},
+                )
+                again = await client.post(
+                    "/api/v1/articles", json={"url": unique_url, "user_id": "author"}
+                )
+                article = db_session.get(Article, created.json()["id"])
+                assert article.html_submitted
+                other = await client.post(
+                    "/api/v1/articles", json={"url": unique_url, "user_id": "reader"}
+                )
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+    article_id = created.json()["id"]
+    assert again.status_code == other.status_code == 409
+    assert article_id in other.json()["detail"]
+    db_session.refresh(article)
+    assert not article.html_submitted
+    assert article.html_sha256 is None
+    assert article.status.value == "PENDING"
+    # Queued once on creation, once to be fetched by the server
+    assert [c.args[0] for c in mock_task.delay.call_args_list] == [article_id, article_id]
+    mock_publisher.assert_called_once_with(article_id)
+
+
+@pytest.mark.asyncio
+async def test_get_article_audio_on_demand(db_session, tmp_path):
+    """Test audio is queued on first request and served from the cache once synthesised"""
+    import hashlib
+    from unittest.mock import MagicMock, patch
+
+    from httpx import ASGITransport
+
+    from backend.audio_cache import AudioCache
+    from backend.celery_app import TASK_PRIORITY_HIGH
+    from backend.database import Article, ArticleStatus
+    from backend.tts import TTSService
+
+    def override_get_db():
+        yield db_session
+
+    article = Article(
+        user_id="listener",
+        url=f"https://example.com/test-article-audio-{int(time.time() * 1000)}",
+        summary="• Audio summary.",
+        status=ArticleStatus.COMPLETED,
+    )
+    db_session.add(article)
+    db_session.commit()
+    backend = MagicMock(voice="plain", **{"synthesize.return_value": b"\xff" * 4})
+    backend.name = "stub"
+    service = TTSService(backend=backend, cache=AudioCache(tmp_path, 10**6))
+    demand = MagicMock()
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with (
+            patch("backend.api.articles.get_tts_service", return_value=service),
+            patch("backend.api.audio.get_tts_service", return_value=service),
+            patch("backend.api.articles.get_audio_demand", return_value=demand),
+            patch("backend.api.articles.queue_audio") as mock_queue,
+        ):
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://testserver"
+            ) as client:
+                url = f"/api/v1/articles/{article.id}/audio"
+                pending = await client.get(url)
+                # What the queued task does
+                path = service.generate_audio(article.summary)
+                ready = await client.get(url)
+                audio = await client.get(ready.headers["location"])
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+    assert pending.status_code == 202
+    assert pending.headers["retry-after"] == "5"
+    mock_queue.assert_called_once_with(article.id, TASK_PRIORITY_HIGH)
+    demand.played.assert_called_with("listener")
+
+    # Redirected to the content-addressed file
+    key = service.cache_key(article.summary)
+    assert ready.status_code == 307
+    assert ready.headers["location"].endswith(f"/api/v1/audio/{key}")
+    assert audio.status_code == 200
+    assert audio.headers["content-type"] == "audio/mpeg"
+    assert audio.headers["etag"] == f'"{hashlib.sha256(audio.content).hexdigest()}"'
+    db_session.refresh(article)
+    assert article.audio_path == path
+
+
+@pytest.mark.asyncio
+async def test_get_audio_ranges(tmp_path):
+    """Test cached audio answers byte-range and conditional requests"""
+    import hashlib
+    from unittest.mock import patch
+
+    from httpx import ASGITransport
+
+    from backend.audio_cache import AudioCache
+    from backend.tts import TTSService
+
+    cache = AudioCache(tmp_path, 10**6)
+    key = "ab" * 32
+    data = bytes(range(256)) * 4
+    cache.write(key, [data])
+    etag = f'"{hashlib.sha256(data).hexdigest()}"'
+    url = f"/api/v1/audio/{key}"
+
+    with patch("backend.api.audio.get_tts_service", return_value=TTSService(cache=cache)):
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://testserver"
+        ) as client:
+            full = await client.get(url)
+            partial = await client.get(url, headers={"Range": "bytes=256-511", "If-Range": etag})
+            tail = await client.get(url, headers={"Range": "bytes=-10"})
+            stale = await client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+            beyond = await client.get(url, headers={"Range": "bytes=5000-"})
+            cached = await client.get(url, headers={"If-None-Match": etag})
+            listed = await client.get(url, headers={"If-None-Match": f'"other", W/{etag}'})
+            unmatched = await client.get(url, headers={"If-None-Match": '"a", W/"b"'})
+            missing = await client.get(f"/api/v1/audio/{'cd' * 32}")
+
+            # Evicted, then synthesised again into different bytes under the same key
+            cache.path(key).unlink()
+            cache.write(key, [data[::-1]])
+            resumed = await client.get(url, headers={"Range": "bytes=512-", "If-Range": etag})
+            revalidated = await client.get(url, headers={"If-None-Match": etag})
+
+    assert full.status_code == 200
+    assert full.content == data
+    assert full.headers["etag"] == etag
+    assert full.headers["accept-ranges"] == "bytes"
+    assert "max-age" in full.headers["cache-control"]
+
+    assert partial.status_code == 206
+    assert partial.content == bytes(range(256))
+    assert partial.headers["content-range"] == "bytes 256-511/1024"
+    assert tail.content == bytes(range(246, 256))
+    assert stale.status_code == 200
+    assert beyond.status_code == 416
+    assert beyond.headers["content-range"] == "bytes */1024"
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert listed.status_code == 304
+    assert unmatched.status_code == 200
+    assert missing.status_code == 404
+
+    # A resumed download never joins ranges of two different files
+    assert resumed.status_code == 200
+    assert resumed.content == data[::-1]
+    assert resumed.headers["etag"] != etag
+    assert revalidated.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_stream_article_summary(db_session):
+    """Test the summary stream answers finished articles directly and relays live ones"""
+    from unittest.mock import patch
+
+    import fakeredis
+    from fakeredis import aioredis
+    from httpx import ASGITransport
+
+    from backend.database import Article, ArticleStatus
+    from backend.pipeline.summary_stream import SummaryPublisher
+
+    def override_get_db():
+        yield db_session
+
+    stamp = int(time.time() * 1000)
+    done = Article(
+        user_id="stream",
+        url=f"https://example.com/stream-{stamp}-done",
+        summary="• Stored",
+        status=ArticleStatus.COMPLETED,
+    )
+    live = Article(
+        user_id="stream",
+        url=f"https://example.com/stream-{stamp}-live",
+        status=ArticleStatus.SUMMARIZING,
+    )
+    db_session.add_all([done, live])
+    db_session.commit()
+    server = fakeredis.FakeServer()
+    # Finished by a worker just before the client subscribed
+    SummaryPublisher(live.id, client=fakeredis.FakeRedis(server=server)).done("• Live")
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with patch(
+            "backend.api.articles.get_async_redis",
+            return_value=aioredis.FakeRedis(server=server, decode_responses=True),
+        ):
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://testserver"
+            ) as client:
+                stored = await client.get(f"/api/v1/articles/{done.id}/summary/stream")
+                relayed = await client.get(f"/api/v1/articles/{live.id}/summary/stream")
+                missing = await client.get("/api/v1/articles/missing/summary/stream")
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+    assert stored.headers["content-type"].startswith("text/event-stream")
+    assert stored.text == 'event: done\ndata: {"summary": "\\u2022 Stored"}\n\n'
+    assert relayed.text == 'event: done\ndata: {"summary": "\\u2022 Live"}\n\n'
+    assert missing.status_code == 404
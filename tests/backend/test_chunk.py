@@ -0,0 +1,94 @@
+# Chunk Stage Unit Tests
+from backend.pipeline.chunk import chunk_article, iter_chunks, iter_sentence_spans, plan_chunks
+from backend.pipeline.tokens import estimate_tokens
+
+
+def sentences(text):
+    return [text[start:end] for start, end in iter_sentence_spans(text)]
+
+
+class TestSentenceSplitting:
+    """Unit tests for sentence boundary detection"""
+
+    def test_terminal_punctuation_and_newlines(self):
+        """Test ., ?, ! and line breaks all end sentences"""
+        text = "Is it fast? Yes! It is linear.\nA heading\nNext line."
+        assert sentences(text) == [
+            "Is it fast?",
+            "Yes!",
+            "It is linear.",
+            "A heading",
+            "Next line.",
+        ]
+
+    def test_abbreviations_and_initials(self):
+        """Test abbreviations and initials do not split sentences"""
+        text = (
+            "Dr. Smith met J. R. Jones at 5 p.m. in the U.S. office. "
+            '"It went well." Then etc. ended.'
+        )
+        assert sentences(text) == [
+            "Dr. Smith met J. R. Jones at 5 p.m. in the U.S. office.",
+            '"It went well."',
+            "Then etc. ended.",
+        ]
+
+    def test_decimals_are_not_boundaries(self):
+        """Test periods inside numbers are ignored"""
+        assert sentences("Growth was 3.5 percent. Costs fell.") == [
+            "Growth was 3.5 percent.",
+            "Costs fell.",
+        ]
+
+
+class TestChunking:
+    """Unit tests for token-sized chunking"""
+
+    def test_chunks_respect_token_budget(self):
+        """Test every chunk fits the budget and chunks appear in order"""
+        text = " ".join(f"Sentence number {i} has a few words in it." for i in range(200))
+        chunks = list(iter_chunks(text, max_tokens=50))
+
+        assert len(chunks) > 1
+        assert all(chunk.tokens <= 50 for chunk in chunks)
+        assert all(a.end <= b.start for a, b in zip(chunks, chunks[1:], strict=False))
+        assert all(
+            chunk.tokens == estimate_tokens(text[chunk.start : chunk.end]) for chunk in chunks
+        )
+
+    def test_oversized_sentence_is_split(self):
+        """Test one very long sentence becomes several bounded chunks"""
+        text = "word " * 1000 + "end."
+        chunks = list(iter_chunks(text, max_tokens=100))
+
+        assert len(chunks) > 5
+        assert all(chunk.tokens <= 100 for chunk in chunks)
+
+    def test_overlap_repeats_trailing_sentences(self):
+        """Test consecutive chunks share whole trailing sentences"""
+        text = " ".join(f"This is sentence {i}." for i in range(40))
+        chunks = [text[c.start : c.end] for c in iter_chunks(text, max_tokens=30, overlap_tokens=8)]
+
+        for previous, current in zip(chunks, chunks[1:], strict=False):
+            last_sentence = sentences(previous)[-1]
+            assert current.startswith(last_sentence)
+
+    def test_truncation_is_reported(self):
+        """Test hitting max_chunks is reported instead of silently dropping text"""
+        text = " ".join(f"Sentence {i} is here." for i in range(500))
+        plan = plan_chunks(text, max_tokens=20, max_chunks=3)
+
+        assert len(plan.chunks) == 3
+        assert plan.truncated
+        assert plan.dropped_tokens == estimate_tokens(text[plan.chunks[-1].end :])
+
+        complete = plan_chunks(text, max_tokens=20, max_chunks=10_000)
+        assert not complete.truncated
+        assert complete.dropped_tokens == 0
+
+    def test_chunk_article_returns_text(self):
+        """Test the list-of-strings interface is unchanged"""
+        assert chunk_article("First sentence. Second sentence.") == [
+            "First sentence. Second sentence."
+        ]
+        assert chunk_article("") == []
@@ -0,0 +1,72 @@
+# Compress Stage Unit Tests
+from backend.pipeline import compress
+from backend.pipeline.compress import compress_document, near_duplicates
+from backend.pipeline.document import Document
+
+BODY = [
+    "The river flooded three villages after a week of heavy rain.",
+    "Rescue teams moved two hundred families to higher ground overnight.",
+    "Officials said the river would stay above its banks until Friday.",
+]
+
+
+class TestCompress:
+    """Unit tests for boilerplate removal, deduplication and packing"""
+
+    def test_seed_boilerplate_removed(self, lexicon):
+        """Test cookie and sharing lines are dropped"""
+        text = "We use cookies to improve your experience.\n" + " ".join(BODY) + "\nShare this."
+        compression = compress_document(Document("Floods", text))
+
+        assert compression.document.text == " ".join(BODY)
+        assert compression.boilerplate == 2
+        assert compression.ratio < 1
+
+    def test_content_mentioning_boilerplate_phrases_kept(self, lexicon):
+        """Test long sentences about privacy policies or cookies are not boilerplate"""
+        content = (
+            "The regulator found that the company's privacy policy let advertisers match "
+            "cookies across sites without consent, and ordered it to rewrite the terms of "
+            "service within ninety days."
+        )
+        compression = compress_document(Document("Fine", " ".join([content, *BODY])))
+
+        assert compression.document.text.startswith(content)
+        assert compression.boilerplate == 0
+
+    def test_near_duplicates_removed(self, lexicon):
+        """Test repeated paragraphs and lightly edited repeats are dropped"""
+        repeat = BODY[0].replace("three", "3")
+        text = "\n".join([*BODY, BODY[1], repeat])
+        compression = compress_document(Document("Floods", text))
+
+        assert compression.document.text == "\n".join(BODY)
+        assert compression.duplicates == 2
+
+    def test_distinct_sentences_kept(self):
+        """Test sentences that only share a few words are not duplicates"""
+        assert near_duplicates(BODY, 0.6) == [False, False, False]
+
+    def test_learned_boilerplate(self, lexicon, monkeypatch):
+        """Test a sentence recurring across articles is learned as boilerplate"""
+        monkeypatch.setattr(compress.settings, "compress_boilerplate_min_articles", 3)
+        footer = "Reporting by the regional news desk."
+        for i in range(3):
+            text = f"{BODY[i]}\n{footer}"
+            compressed = compress_document(Document("Floods", text)).document.text
+            # The same article compressed again does not count twice
+            compress_document(Document("Floods", text))
+
+        assert compressed == BODY[2]
+        assert lexicon.counts[compress.phrase_hash(footer)] == 3
+
+    def test_budget_keeps_informative_sentences(self, lexicon, monkeypatch):
+        """Test packing to the token budget keeps on-topic sentences in order"""
+        monkeypatch.setattr(compress.settings, "compress_max_tokens", 40)
+        aside = "My cousin once visited a bakery near the coast."
+        compression = compress_document(Document("Floods", " ".join([BODY[0], aside, *BODY[1:]])))
+
+        assert aside not in compression.document.text
+        assert compression.document.text.startswith(BODY[0])
+        assert compression.tokens <= 40
+        assert compression.packed_out >= 1
@@ -0,0 +1,189 @@
+# CPU Pool Unit Tests
+import asyncio
+import importlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from backend.celery_app import celery_app
+from backend.pipeline import cpu_pool
+from backend.pipeline.chunk import chunk_article
+from backend.pipeline.document import Document, parse_document
+from backend.pipeline.fetch import FetchEngine
+from backend.pipeline.html_store import HTMLStore
+from backend.pipeline.parse import parse_article
+
+FIXTURES = sorted((Path(__file__).parent.parent / "fixtures" / "html").glob("*.html"))
+
+STAGE_SECONDS = 0.4  # Length of each simulated fetch and parse
+
+
+def spin(seconds: float) -> float:
+    """CPU-bound stand-in for a heavy parse; holds the GIL of whichever process runs it"""
+    deadline = time.perf_counter() + seconds
+    count = 0
+    while time.perf_counter() < deadline:
+        count += 1
+    return seconds
+
+
+class StubLimiter:
+    """Domain limiter stand-in that admits everything"""
+
+    def acquire(self, url):
+        return "lease"
+
+    def release(self, url, lease):
+        pass
+
+    def defer(self, url, retry_after):
+        pass
+
+
+@pytest.fixture
+def pool_workers(monkeypatch):
+    """Enable a one-process CPU pool for the test"""
+    monkeypatch.setattr(cpu_pool.settings, "cpu_pool_workers", 1)
+    yield
+    cpu_pool.shutdown_cpu_pool()
+
+
+class TestCpuPool:
+    """Unit tests for offloading CPU-bound stages"""
+
+    def test_inline_when_disabled(self, monkeypatch):
+        """Test no pool is created with cpu_pool_workers=0"""
+        monkeypatch.setattr(cpu_pool.settings, "cpu_pool_workers", 0)
+        assert cpu_pool.get_cpu_pool() is None
+        assert cpu_pool.run_cpu_bound(sorted, [3, 1, 2]) == [1, 2, 3]
+
+    def test_pool_results_match_inline(self, pool_workers):
+        """Test parse and chunk results are identical through the pool"""
+        for fixture in FIXTURES:
+            html = fixture.read_text(encoding="utf-8")
+            parsed = cpu_pool.run_cpu_bound(parse_article, html)
+            assert parsed == parse_article(html)
+            assert cpu_pool.run_cpu_bound(chunk_article, parsed["text"]) == chunk_article(
+                parsed["text"]
+            )
+
+    def test_document_round_trips(self, pool_workers):
+        """Test a Document built in the pool keeps all of its slots"""
+        html = FIXTURES[0].read_text(encoding="utf-8")
+        document = cpu_pool.run_cpu_bound(parse_document, html)
+        expected = parse_document(html)
+        for name in Document.__slots__:
+            assert getattr(document, name) == getattr(expected, name)
+
+    def test_exceptions_propagate(self, pool_workers):
+        """Test errors raised in the pool reach the caller"""
+        with pytest.raises(ValueError):
+            cpu_pool.run_cpu_bound(int, "not a number")
+
+    def test_unusable_pool_falls_back_once(self, pool_workers, monkeypatch):
+        """Test a pool that can't start here is given up for the process, not per task"""
+        submit = []
+
+        def refuse(self, func, *args):
+            submit.append(func)
+            raise AssertionError("daemonic processes are not allowed to have children")
+
+        monkeypatch.setattr(cpu_pool.ProcessPoolExecutor, "submit", refuse)
+        monkeypatch.setattr(cpu_pool, "_unusable_pid", None)
+
+        assert cpu_pool.run_cpu_bound(sorted, [2, 1]) == [1, 2]
+        assert cpu_pool.run_cpu_bound(sorted, [4, 3]) == [3, 4]
+        assert len(submit) == 1
+
+
+class TestWorkerOverlap:
+    """The worker's tasks overlap network I/O with parsing"""
+
+    def test_worker_runs_tasks_on_threads(self):
+        """Test the Celery worker runs several tasks per process"""
+        assert celery_app.conf.worker_pool == "threads"
+        assert celery_app.conf.worker_concurrency > 1
+        assert cpu_pool.settings.cpu_pool_workers > 0
+
+    @pytest.mark.parametrize(
+        "module, getter, cls, instance",
+        [
+            ("backend.pipeline.fetch", "get_fetch_engine", "FetchEngine", "_fetch_engine"),
+            ("backend.pipeline.llm", "get_llm_client", "LLMClient", "_llm_client"),
+            (
+                "backend.pipeline.llm_scheduler",
+                "get_llm_scheduler",
+                "LLMScheduler",
+                "_llm_scheduler",
+            ),
+            ("backend.tts", "get_tts_service", "TTSService", "_tts_service"),
+        ],
+    )
+    def test_singletons_built_once_across_threads(self, module, getter, cls, instance, monkeypatch):
+        """Test worker threads asking for a shared client at once all get the same one"""
+        module = importlib.import_module(module)
+        built = []
+
+        def slow_build(*args, **kwargs):
+            # Leave a wide window for another thread to race in
+            time.sleep(0.05)
+            built.append(MagicMock())
+            return built[-1]
+
+        monkeypatch.setattr(module, cls, slow_build)
+        monkeypatch.setattr(module, instance, None)
+        with ThreadPoolExecutor(max_workers=8) as worker:
+            results = list(worker.map(lambda _: getattr(module, getter)(), range(8)))
+
+        assert len(built) == 1
+        assert all(result is built[0] for result in results)
+
+    def test_fetch_overlaps_parse(self, pool_workers, tmp_path):
+        """Test one task's fetch runs while another task's parse is in the CPU pool"""
+
+        async def slow_page(request):
+            await asyncio.sleep(STAGE_SECONDS)
+            return httpx.Response(200, headers={"content-type": "text/html"}, text="<p>Hi</p>")
+
+        engine = FetchEngine(
+            transport=httpx.MockTransport(slow_page),
+            store=HTMLStore(tmp_path),
+            limiter=StubLimiter(),
+        )
+        # Start the pool process first, so only the stages themselves are timed
+        cpu_pool.run_cpu_bound(spin, 0)
+        try:
+            # Two worker threads, as the Celery threads pool runs tasks
+            with ThreadPoolExecutor(max_workers=2) as worker:
+                start = time.perf_counter()
+                fetch = worker.submit(engine.fetch_sync, "https://example.com/a")
+                parse = worker.submit(cpu_pool.run_cpu_bound, spin, STAGE_SECONDS)
+                assert fetch.result() == "<p>Hi</p>"
+                assert parse.result() == STAGE_SECONDS
+                elapsed = time.perf_counter() - start
+        finally:
+            engine.close()
+
+        # One after the other would take twice as long
+        assert elapsed < 1.5 * STAGE_SECONDS
+
+    @pytest.mark.skipif((os.cpu_count() or 1) < 2, reason="needs two cores")
+    def test_parses_run_in_parallel(self, monkeypatch):
+        """Test two tasks' parses run at once in the pool instead of sharing one GIL"""
+        monkeypatch.setattr(cpu_pool.settings, "cpu_pool_workers", 2)
+        try:
+            cpu_pool.run_cpu_bound(spin, 0)
+            with ThreadPoolExecutor(max_workers=2) as worker:
+                start = time.perf_counter()
+                parses = [worker.submit(cpu_pool.run_cpu_bound, spin, STAGE_SECONDS) for _ in "ab"]
+                assert [parse.result() for parse in parses] == [STAGE_SECONDS] * 2
+                elapsed = time.perf_counter() - start
+        finally:
+            cpu_pool.shutdown_cpu_pool()
+
+        assert elapsed < 1.5 * STAGE_SECONDS
@@ -0,0 +1,46 @@
+# Document Unit Tests
+import hashlib
+
+import pytest
+
+from backend.pipeline.document import Document, parse_document
+from backend.pipeline.summarize import summarize_article
+
+
+class TestDocument:
+    """Unit tests for per-article document statistics"""
+
+    def test_statistics(self):
+        """Test counts, chunks and hash are computed from the text"""
+        text = "First sentence here. Second one follows.\nThird line."
+        document = Document("Title", text)
+
+        assert document.word_count == 8
+        assert document.token_count > document.word_count
+        assert document.content_hash == hashlib.sha256(text.encode()).hexdigest()
+        assert document.chunk_texts() == [text]
+        assert not document.truncated
+
+    def test_slots(self):
+        """Test documents carry no per-instance __dict__"""
+        with pytest.raises(AttributeError):
+            Document("Title", "Text.").extra = 1
+
+    def test_parse_document(self):
+        """Test parsing HTML straight into a Document"""
+        html = "<html><head><title>Hi</title></head><body><p>Hello world.</p></body></html>"
+        document = parse_document(html)
+
+        assert document.title == "Hi"
+        assert document.text == "Hello world."
+        assert document.chunk_count == 1
+
+    def test_summary_fallback_uses_counts(self, monkeypatch):
+        """Test the fallback summary reports the document's counts"""
+        from backend.pipeline import summarize
+
+        monkeypatch.setattr(summarize.settings, "openrouter_api_key", None)
+        monkeypatch.setattr(summarize.settings, "summary_cache_enabled", False)
+        summary = summarize_article(Document("Title", "One two three. Four five."))
+
+        assert "1 chunks, 5 words (extractive summary)" in summary
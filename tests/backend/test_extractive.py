@@ -0,0 +1,57 @@
+# Extractive Summarizer Unit Tests
+import time
+
+from backend.pipeline.document import Document
+from backend.pipeline.extractive import extractive_summary, rank_sentences
+
+TOPIC = [
+    "The city council approved the new transit budget on Monday evening.",
+    "The transit budget funds new bus routes and longer train hours.",
+    "Council members said the budget for transit was overdue.",
+    "A local bakery won a prize for its sourdough bread recipe.",
+    "Riders welcomed the transit budget and the new bus routes.",
+]
+
+
+class TestExtractiveSummary:
+    """Unit tests for the local TextRank summarizer"""
+
+    def test_central_sentences_win(self):
+        """Test sentences sharing the article's topic outrank an unrelated one"""
+        scores = rank_sentences(TOPIC)
+
+        assert abs(scores.sum() - 1) < 1e-6
+        assert scores.argmin() == 3
+
+    def test_bullets_in_article_order(self):
+        """Test the summary keeps the chosen sentences in their original order"""
+        summary = extractive_summary(Document("Budget", " ".join(TOPIC)), max_sentences=3)
+        bullets = summary.split("\n")
+
+        assert len(bullets) == 3
+        assert all(bullet.startswith("• ") for bullet in bullets)
+        assert "bakery" not in summary
+        assert bullets == sorted(bullets, key=lambda bullet: TOPIC.index(bullet[2:]))
+
+    def test_deterministic(self):
+        """Test the same document always gives the same summary"""
+        document = Document("Budget", " ".join(TOPIC * 3))
+        assert extractive_summary(document) == extractive_summary(document)
+
+    def test_short_fragments_skipped(self):
+        """Test headings and fragments are not candidate sentences"""
+        document = Document("Budget", "Transit news.\n" + " ".join(TOPIC[:2]))
+        assert "Transit news" not in extractive_summary(document)
+
+    def test_long_article_is_fast(self):
+        """Test a long article is ranked in well under a second"""
+        text = " ".join(
+            f"Paragraph {i} discusses topic {i % 40} with detail number {i % 13} today."
+            for i in range(1000)
+        )
+        document = Document("Long Read", text)
+
+        start = time.perf_counter()
+        summary = extractive_summary(document)
+        assert time.perf_counter() - start < 1.0
+        assert summary.count("• ") == 7
@@ -0,0 +1,345 @@
+# Fetch Stage Unit Tests
+import asyncio
+
+import httpx
+import pytest
+
+from backend.pipeline.fetch import FetchEngine
+from backend.pipeline.html_store import HTMLStore
+from backend.pipeline.politeness import FetchDeferred, domain_of, parse_retry_after
+
+HTML = "<html><head><title>Test</title></head><body><p>Hello</p></body></html>"
+
+
+class StubLimiter:
+    """Domain limiter stand-in that admits everything and records calls"""
+
+    def __init__(self):
+        self.acquired = []
+        self.released = []
+        self.deferred = []
+
+    def acquire(self, url):
+        self.acquired.append(url)
+        return f"lease-{len(self.acquired)}"
+
+    def release(self, url, lease):
+        self.released.append(lease)
+
+    def defer(self, url, retry_after):
+        self.deferred.append((url, retry_after))
+
+
+@pytest.fixture(autouse=True)
+def limiter(monkeypatch):
+    """Keep fetch tests off Redis"""
+    stub = StubLimiter()
+    monkeypatch.setattr("backend.pipeline.fetch.get_domain_limiter", lambda: stub)
+    return stub
+
+
+@pytest.fixture
+def store(tmp_path):
+    """HTML store in a temporary directory"""
+    return HTMLStore(tmp_path)
+
+
+def html_handler(request):
+    return httpx.Response(200, headers={"content-type": "text/html; charset=utf-8"}, text=HTML)
+
+
+class TestFetchEngine:
+    """Unit tests for the pooled fetch engine"""
+
+    def test_fetch_sync_returns_html(self, store):
+        """Test sync wrapper returns decoded HTML"""
+        engine = FetchEngine(store=store, transport=httpx.MockTransport(html_handler))
+        try:
+            assert engine.fetch_sync("https://example.com/article") == HTML
+        finally:
+            engine.close()
+
+    def test_fetch_rejects_non_html(self, store):
+        """Test non-HTML responses are rejected"""
+
+        def handler(request):
+            return httpx.Response(200, headers={"content-type": "application/pdf"}, content=b"%PDF")
+
+        engine = FetchEngine(store=store, transport=httpx.MockTransport(handler))
+        try:
+            assert engine.fetch_sync("https://example.com/file.pdf") is None
+        finally:
+            engine.close()
+
+    def test_fetch_http_error_returns_none(self, store):
+        """Test HTTP errors are reported as a failed fetch"""
+        engine = FetchEngine(
+            store=store, transport=httpx.MockTransport(lambda request: httpx.Response(500))
+        )
+        try:
+            assert engine.fetch_sync("https://example.com/broken") is None
+        finally:
+            engine.close()
+
+    @pytest.mark.asyncio
+    async def test_fetch_async_shares_engine_loop(self, store):
+        """Test async callers run on the engine loop, not their own"""
+        loops = set()
+
+        async def handler(request):
+            loops.add(asyncio.get_running_loop())
+            return html_handler(request)
+
+        engine = FetchEngine(store=store, transport=httpx.MockTransport(handler))
+        try:
+            assert await engine.fetch("https://example.com/a") == HTML
+            assert loops == {engine._loop}
+            assert asyncio.get_running_loop() not in loops
+        finally:
+            engine.close()
+
+    def test_per_host_connection_limit(self, store, monkeypatch):
+        """Test concurrent fetches to one host respect the per-host cap"""
+        monkeypatch.setattr("backend.pipeline.fetch.settings.fetch_max_connections_per_host", 2)
+        in_flight = {"now": 0, "peak": 0}
+
+        async def handler(request):
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            return html_handler(request)
+
+        engine = FetchEngine(store=store, transport=httpx.MockTransport(handler))
+        try:
+            urls = [f"https://example.com/{i}" for i in range(10)]
+            assert engine.fetch_many_sync(urls) == [HTML] * 10
+            assert in_flight["peak"] == 2
+        finally:
+            engine.close()
+
+    def test_slow_fetch_cut_off_at_deadline(self, store, limiter, monkeypatch):
+        """Test a body that keeps trickling in is abandoned and its lease returned"""
+        monkeypatch.setattr("backend.pipeline.fetch.settings.fetch_deadline", 0.2)
+
+        class Trickle(httpx.AsyncByteStream):
+            async def __aiter__(self):
+                while True:
+                    await asyncio.sleep(0.05)
+                    yield b"<p>"
+
+        def handler(request):
+            return httpx.Response(200, headers={"content-type": "text/html"}, stream=Trickle())
+
+        engine = FetchEngine(store=store, transport=httpx.MockTransport(handler))
+        try:
+            assert engine.fetch_sync("https://example.com/slow") is None
+            assert limiter.released == ["lease-1"]
+        finally:
+            engine.close()
+
+
+class CountingStream(httpx.AsyncByteStream):
+    """Async body stream that records how many chunks were consumed"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.read = 0
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+class TestStreamingFetch:
+    """Unit tests for streaming download limits"""
+
+    def test_declared_length_rejected_before_body(self, store, monkeypatch):
+        """Test an oversized Content-Length is rejected without reading the body"""
+        monkeypatch.setattr("backend.pipeline.fetch.settings.max_content_length", 100)
+        stream = CountingStream([b"x" * 50] * 10)
+
+        def handler(request):
+            headers = {"content-type": "text/html", "content-length": "500"}
+            return httpx.Response(200, headers=headers, stream=stream)
+
+        engine = FetchEngine(store=store, transport=httpx.MockTransport(handler))
+        try:
+            assert engine.fetch_sync("https://example.com/huge") is None
+            assert stream.read == 0
+        finally:
+            engine.close()
+
+    def test_undeclared_length_aborts_early(self, store, monkeypatch):
+        """Test reading stops once the byte budget is exceeded"""
+        monkeypatch.setattr("backend.pipeline.fetch.settings.max_content_length", 100)
+        stream = CountingStream([b"x" * 50] * 10)
+
+        def handler(request):
+            return httpx.Response(200, headers={"content-type": "text/html"}, stream=stream)
+
+        engine = FetchEngine(store=store, transport=httpx.MockTransport(handler))
+        try:
+            assert engine.fetch_sync("https://example.com/huge") is None
+            assert stream.read == 3
+        finally:
+            engine.close()
+
+    def test_non_html_rejected_before_body(self, store):
+        """Test content type is checked from headers alone"""
+        stream = CountingStream([b"%PDF"])
+
+        def handler(request):
+            return httpx.Response(200, headers={"content-type": "application/pdf"}, stream=stream)
+
+        engine = FetchEngine(store=store, transport=httpx.MockTransport(handler))
+        try:
+            assert engine.fetch_sync("https://example.com/file.pdf") is None
+            assert stream.read == 0
+        finally:
+            engine.close()
+
+    def test_declared_charset_decoded_incrementally(self, store):
+        """Test multi-byte characters split across chunks decode correctly"""
+        body = "<p>Grüße – café</p>".encode("utf-8")
+        chunks = [body[i : i + 3] for i in range(0, len(body), 3)]
+
+        def handler(request):
+            headers = {"content-type": "text/html; charset=utf-8"}
+            return httpx.Response(200, headers=headers, stream=CountingStream(chunks))
+
+        engine = FetchEngine(store=store, transport=httpx.MockTransport(handler))
+        try:
+            assert engine.fetch_sync("https://example.com/utf8") == "<p>Grüße – café</p>"
+        finally:
+            engine.close()
+
+
+class TestHTMLCache:
+    """Unit tests for the content-addressed HTML cache"""
+
+    def test_store_is_content_addressed(self, store):
+        """Test identical bodies share one compressed blob"""
+        digest = store.put(HTML)
+        assert store.put(HTML) == digest
+        assert store.get(digest) == HTML
+        assert len(list(store.root.glob("html/*/*.html.gz"))) == 1
+
+    def test_refetch_is_conditional(self, store):
+        """Test a re-fetch sends validators and serves the cached body on 304"""
+        seen = []
+
+        def handler(request):
+            seen.append(dict(request.headers))
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            headers = {
+                "content-type": "text/html",
+                "etag": '"v1"',
+                "last-modified": "Wed, 01 Jan 2025 00:00:00 GMT",
+            }
+            return httpx.Response(200, headers=headers, text=HTML)
+
+        engine = FetchEngine(store=store, transport=httpx.MockTransport(handler))
+        try:
+            assert engine.fetch_sync("https://example.com/cached") == HTML
+            assert engine.fetch_sync("https://example.com/cached") == HTML
+        finally:
+            engine.close()
+
+        assert "if-none-match" not in seen[0]
+        assert seen[1]["if-none-match"] == '"v1"'
+        assert seen[1]["if-modified-since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+    def test_missing_blob_refetches_unconditionally(self, store):
+        """Test validators are not sent when the cached body is gone"""
+        store.record("https://example.com/gone", "0" * 64, etag='"v1"')
+        seen = []
+
+        def handler(request):
+            seen.append(dict(request.headers))
+            return html_handler(request)
+
+        engine = FetchEngine(store=store, transport=httpx.MockTransport(handler))
+        try:
+            assert engine.fetch_sync("https://example.com/gone") == HTML
+        finally:
+            engine.close()
+
+        assert "if-none-match" not in seen[0]
+
+
+class TestPoliteness:
+    """Unit tests for per-domain fetch politeness"""
+
+    def test_domain_of_strips_www(self):
+        """Test www. and case are ignored when grouping by domain"""
+        assert domain_of("https://WWW.Example.com/a?b=1") == "example.com"
+        assert domain_of("https://blog.example.com/") == "blog.example.com"
+
+    def test_parse_retry_after(self):
+        """Test both Retry-After forms are understood"""
+        assert parse_retry_after("120") == 120.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after("Wed, 01 Jan 2020 00:00:00 GMT") == 0.0
+
+    def test_429_defers_domain(self, store, limiter):
+        """Test a 429 raises FetchDeferred and cools the domain down"""
+
+        def handler(request):
+            return httpx.Response(429, headers={"retry-after": "45"})
+
+        engine = FetchEngine(store=store, transport=httpx.MockTransport(handler))
+        try:
+            with pytest.raises(FetchDeferred) as exc_info:
+                engine.fetch_sync("https://www.example.com/busy")
+        finally:
+            engine.close()
+
+        assert exc_info.value.retry_after == 45.0
+        assert exc_info.value.domain == "example.com"
+        assert limiter.deferred == [("https://www.example.com/busy", 45.0)]
+        assert limiter.released == ["lease-1"]
+
+    def test_limiter_deferral_skips_request(self, store, limiter, monkeypatch):
+        """Test no request is sent when the limiter refuses admission"""
+        requests_sent = []
+
+        def refuse(url):
+            raise FetchDeferred(domain_of(url), 2.5)
+
+        monkeypatch.setattr(limiter, "acquire", refuse)
+        engine = FetchEngine(
+            store=store, transport=httpx.MockTransport(lambda r: requests_sent.append(r))
+        )
+        try:
+            with pytest.raises(FetchDeferred):
+                engine.fetch_sync("https://example.com/later")
+        finally:
+            engine.close()
+
+        assert requests_sent == []
+
+    def test_redirect_target_is_recorded(self, store):
+        """Test the final URL is returned and remembered for 304 responses"""
+
+        def handler(request):
+            if request.url.path == "/short":
+                return httpx.Response(301, headers={"location": "https://example.com/long"})
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(
+                200, headers={"content-type": "text/html", "etag": '"v1"'}, text=HTML
+            )
+
+        engine = FetchEngine(store=store, transport=httpx.MockTransport(handler))
+        try:
+            first = engine.fetch_page_sync("https://example.com/short")
+            second = engine.fetch_page_sync("https://example.com/short")
+        finally:
+            engine.close()
+
+        assert first == (HTML, "https://example.com/long")
+        assert second == (HTML, "https://example.com/long")
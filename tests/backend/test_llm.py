@@ -0,0 +1,172 @@
+# LLM Client Unit Tests
+import pytest
+import requests
+
+from backend.pipeline import llm
+from backend.pipeline.llm import CompletionListener, LLMUnavailable
+from backend.pipeline.llm_scheduler import PRIORITY_BATCH, QuotaExhausted
+from backend.pipeline.tokens import estimate_tokens
+
+PRIMARY = "primary/model"
+FALLBACK = "fallback/model"
+
+
+class RecordingListener(CompletionListener):
+    """Records streamed text and restarts"""
+
+    def __init__(self):
+        self.events = []
+
+    def on_delta(self, text):
+        self.events.append(text)
+
+    def on_restart(self):
+        self.events.append(None)
+
+
+@pytest.fixture
+def client(openrouter, monkeypatch):
+    """LLM client against the stub server, with one fallback model"""
+    monkeypatch.setattr(llm.settings, "summary_model", PRIMARY)
+    monkeypatch.setattr(llm.settings, "summary_fallback_models", [FALLBACK])
+    monkeypatch.setattr(llm.settings, "llm_max_retries", 2)
+    return llm.get_llm_client()
+
+
+class TestLLMClient:
+    """Unit tests for retries, fallback models and the circuit breaker"""
+
+    def test_retries_transient_errors(self, client, openrouter):
+        """Test 429 and 5xx responses are retried on the same model"""
+        openrouter.failures[PRIMARY] = [429, 503]
+
+        completion = client.complete("Summarise this")
+
+        assert completion[:2] == ("• final point", PRIMARY)
+        assert openrouter.models == [PRIMARY, PRIMARY, PRIMARY]
+        # Every attempt is recorded for the model router, newest first
+        assert [entry[0] for entry in openrouter.stats.entries[PRIMARY]] == ["1", "0", "0"]
+        assert completion.seconds > 0
+
+    def test_falls_back_to_next_model(self, client, openrouter):
+        """Test a model that keeps failing hands over to the fallback"""
+        openrouter.failures[PRIMARY] = [500, 500, 500]
+
+        completion = client.complete("Summarise this")
+
+        assert completion.model == FALLBACK
+        assert openrouter.models == [PRIMARY, PRIMARY, PRIMARY, FALLBACK]
+
+    def test_client_errors_not_retried(self, client, openrouter):
+        """Test other 4xx responses raise immediately"""
+        openrouter.failures[PRIMARY] = [400]
+
+        with pytest.raises(requests.HTTPError):
+            client.complete("Summarise this")
+        assert openrouter.models == [PRIMARY]
+
+    def test_open_circuit_skips_model(self, client, openrouter, monkeypatch):
+        """Test repeated failures open the circuit and later calls skip the model"""
+        monkeypatch.setattr(llm.settings, "llm_breaker_threshold", 3)
+        openrouter.failures[PRIMARY] = [500] * 3
+        client.complete("first")
+
+        openrouter.models.clear()
+        assert client.complete("second").model == FALLBACK
+        assert openrouter.models == [FALLBACK]
+
+    def test_all_circuits_open(self, client, openrouter, monkeypatch):
+        """Test LLMUnavailable carries the time until a circuit closes"""
+        monkeypatch.setattr(llm.settings, "llm_breaker_threshold", 1)
+        monkeypatch.setattr(llm.settings, "llm_breaker_cooldown", 120)
+        openrouter.failures[PRIMARY] = [500]
+        openrouter.failures[FALLBACK] = [500]
+
+        with pytest.raises(LLMUnavailable) as first:
+            client.complete("first")
+        with pytest.raises(LLMUnavailable) as second:
+            client.complete("second")
+
+        assert 0 < first.value.retry_after <= 120
+        assert 0 < second.value.retry_after <= 120
+        assert len(openrouter.models) == 2
+
+    def test_streams_deltas(self, client, openrouter):
+        """Test a listener receives the completion piece by piece"""
+        listener = RecordingListener()
+
+        completion = client.complete("Summarise this", listener)
+
+        assert completion.text == "• final point"
+        assert listener.events == ["•", " final", " point"]
+        assert openrouter.streamed == [True]
+
+    def test_interrupted_stream_restarts(self, client, openrouter):
+        """Test text from a broken stream is voided before the retry"""
+        openrouter.failures[PRIMARY] = [0]
+        listener = RecordingListener()
+
+        completion = client.complete("Summarise this", listener)
+
+        assert completion.text == "• final point"
+        assert listener.events == ["•", None, "•", " final", " point"]
+
+    def test_trickling_stream_cut_off(self, client, openrouter, monkeypatch):
+        """Test summary_timeout bounds a whole stream, not just each read"""
+        monkeypatch.setattr(llm.settings, "summary_timeout", 0.5)
+        monkeypatch.setattr(llm.settings, "llm_max_retries", 0)
+        openrouter.word_delay = 0.3
+
+        with pytest.raises(LLMUnavailable):
+            client.complete("Summarise this", RecordingListener())
+
+        assert openrouter.models == [PRIMARY, FALLBACK]
+
+
+class TestQuotaScheduling:
+    """Unit tests for reserving and settling OpenRouter quota"""
+
+    def test_requests_reserve_and_settle_quota(self, client, monkeypatch):
+        """Test each request reserves its estimated tokens and settles real usage"""
+        monkeypatch.setattr(llm.settings, "llm_completion_tokens", 100)
+        prompt = "Summarise this article about quotas"
+
+        client.complete(prompt, priority=PRIORITY_BATCH)
+        client.complete(prompt, RecordingListener())
+
+        reserved = estimate_tokens(prompt) + 100
+        assert client.scheduler.acquired == [(reserved, PRIORITY_BATCH), (reserved, 0)]
+        assert client.scheduler.settled == [(reserved, 42), (reserved, 42)]
+
+    def test_failed_requests_refund_quota(self, client, openrouter):
+        """Test the tokens reserved for a failed attempt are given back"""
+        openrouter.failures[PRIMARY] = [500]
+        client.complete("Summarise this")
+
+        openrouter.failures[PRIMARY] = [401]
+        with pytest.raises(requests.HTTPError):
+            client.complete("Summarise this")
+
+        reserved = client.scheduler.acquired[0][0]
+        assert client.scheduler.settled == [(reserved, 0), (reserved, 42), (reserved, 0)]
+
+    def test_429_pauses_all_requests(self, client, openrouter, monkeypatch):
+        """Test a rate limit response pauses the shared scheduler"""
+        monkeypatch.setattr(llm.settings, "llm_default_retry_after", 7)
+        openrouter.failures[PRIMARY] = [429]
+
+        client.complete("Summarise this")
+
+        assert client.scheduler.paused == [7]
+
+    def test_quota_wait_timeout_defers(self, client, monkeypatch):
+        """Test a request stuck in the quota queue becomes LLMUnavailable"""
+
+        def exhausted(tokens, priority=0):
+            raise QuotaExhausted(30)
+
+        monkeypatch.setattr(client.scheduler, "acquire", exhausted)
+
+        with pytest.raises(LLMUnavailable) as raised:
+            client.complete("Summarise this")
+        assert raised.value.retry_after == 30
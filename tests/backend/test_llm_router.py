@@ -0,0 +1,83 @@
+# Model Router Unit Tests
+import pytest
+
+from backend.config import ModelRoute
+from backend.pipeline import llm_router
+from backend.pipeline.document import Document
+from backend.pipeline.llm_router import ModelRouter
+from backend.pipeline.summarize import summarize_article
+
+from .conftest import StubStats
+
+SMALL = "small/model"
+LARGE = "large/model"
+BEST = "best/model"
+FALLBACK = "fallback/model"
+
+
+@pytest.fixture(autouse=True)
+def routes(monkeypatch):
+    """Small articles go to a small model, larger ones to a larger model"""
+    monkeypatch.setattr(
+        llm_router.settings,
+        "summary_routes",
+        [
+            ModelRoute(tier="standard", max_tokens=1000, models=[SMALL]),
+            ModelRoute(tier="standard", models=[LARGE, SMALL]),
+            ModelRoute(tier="premium", models=[BEST]),
+        ],
+    )
+    monkeypatch.setattr(llm_router.settings, "summary_quality", "standard")
+    monkeypatch.setattr(llm_router.settings, "summary_fallback_models", [FALLBACK])
+
+
+class TestModelRouter:
+    """Unit tests for routing by size, tier and model health"""
+
+    def test_routes_by_size_and_tier(self):
+        """Test the first route for the tier that fits the article wins"""
+        router = ModelRouter(StubStats())
+
+        assert router.route(200).models == [SMALL, FALLBACK]
+        assert router.route(5000).models == [LARGE, SMALL, FALLBACK]
+        assert router.route(200, "premium").models == [BEST, FALLBACK]
+
+    def test_slow_model_tried_last(self, monkeypatch):
+        """Test a model whose p95 latency is over the limit moves behind the others"""
+        monkeypatch.setattr(llm_router.settings, "summary_route_max_p95", 10.0)
+        stats = StubStats()
+        for seconds in [2.0] * 8 + [25.0] * 2:
+            stats.record(LARGE, seconds, ok=True)
+
+        route = ModelRouter(stats).route(5000)
+
+        assert route.models == [SMALL, FALLBACK, LARGE]
+        assert route.avoided == [LARGE]
+        assert route.health[LARGE].p50 == 2.0
+        assert route.health[LARGE].p95 == 25.0
+
+    def test_failing_model_tried_last(self):
+        """Test a model with a high error rate moves behind the others"""
+        stats = StubStats()
+        for ok in [False] * 4 + [True] * 2:
+            stats.record(SMALL, 1.0, ok=ok)
+
+        assert ModelRouter(stats).route(200).models == [FALLBACK, SMALL]
+
+    def test_needs_enough_samples(self):
+        """Test a couple of failures don't get a model avoided"""
+        stats = StubStats()
+        stats.record(SMALL, 1.0, ok=False)
+
+        assert ModelRouter(stats).route(200).avoided == []
+
+    def test_decision_recorded_in_metrics(self, openrouter, monkeypatch):
+        """Test the route and each call's latency are reported per article"""
+        monkeypatch.setattr(llm_router.settings, "summary_cache_enabled", False)
+        metrics = {}
+        summarize_article(Document("Title", "A short article."), metrics=metrics, quality="premium")
+
+        assert metrics["routing"]["tier"] == "premium"
+        assert metrics["routing"]["models"][0] == BEST
+        assert [call["model"] for call in metrics["llm_calls"]] == [BEST]
+        assert openrouter.models == [BEST]
@@ -0,0 +1,111 @@
+# LLM Scheduler Unit Tests
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from backend.pipeline import llm, llm_scheduler
+from backend.pipeline.llm import LLMUnavailable
+from backend.pipeline.llm_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    LLMScheduler,
+    QuotaExhausted,
+)
+
+from .conftest import StubBreaker, StubStats
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def scheduler(redis_client, monkeypatch):
+    """Scheduler running its Lua script on an in-memory Redis"""
+    monkeypatch.setattr(llm_scheduler.settings, "llm_rpm", 0)
+    monkeypatch.setattr(llm_scheduler.settings, "llm_tpm", 1000)
+    monkeypatch.setattr(llm_scheduler.settings, "llm_queue_poll", 0.02)
+    monkeypatch.setattr(llm_scheduler.settings, "llm_queue_timeout", 5.0)
+    return LLMScheduler(client=redis_client)
+
+
+def bucket_tokens(scheduler) -> float:
+    return float(scheduler.client.hget(scheduler._keys()[0], "tokens"))
+
+
+class TestLLMScheduler:
+    """Unit tests for the shared RPM/TPM buckets and the priority queue"""
+
+    def test_background_yields_to_interactive(self, scheduler, monkeypatch):
+        """Test a later interactive request is admitted before a waiting background one"""
+        monkeypatch.setattr(llm_scheduler.settings, "llm_rpm", 120)  # One per 0.5s
+        monkeypatch.setattr(llm_scheduler.settings, "llm_tpm", 0)
+        # Empty the request bucket
+        scheduler.client.hset(scheduler._keys()[0], mapping={"requests": 0, "ts": time.time()})
+        admitted = []
+
+        def request(priority):
+            scheduler.acquire(10, priority)
+            admitted.append(priority)
+
+        background = threading.Thread(target=request, args=(PRIORITY_BACKGROUND,))
+        background.start()
+        while not scheduler.client.zcard(scheduler._keys()[1]):
+            time.sleep(0.005)
+        interactive = threading.Thread(target=request, args=(PRIORITY_INTERACTIVE,))
+        interactive.start()
+        background.join(5)
+        interactive.join(5)
+
+        assert admitted == [PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND]
+        assert not scheduler.client.zcard(scheduler._keys()[1])
+
+    def test_tokens_settled_with_usage(self, scheduler):
+        """Test unused reserved tokens go back to the bucket for the next request"""
+        scheduler.acquire(600)
+        assert bucket_tokens(scheduler) == pytest.approx(400, abs=1)
+
+        scheduler.settle(600, 100)
+        assert bucket_tokens(scheduler) == pytest.approx(900, abs=1)
+
+        # Admitted at once: without the refund it would wait about 24s
+        start = time.monotonic()
+        scheduler.acquire(800)
+        assert time.monotonic() - start < 1
+
+    def test_dead_waiter_reaped(self, scheduler):
+        """Test a waiter that stopped polling no longer blocks the queue"""
+        queue, waiters = scheduler._keys()[1:3]
+        scheduler.client.zadd(queue, {"crashed": 0})
+        scheduler.client.zadd(waiters, {"crashed": time.time() - 1})
+
+        scheduler.acquire(10, PRIORITY_BACKGROUND)
+
+        assert not scheduler.client.zcard(queue)
+        assert not scheduler.client.zcard(waiters)
+
+    def test_live_waiter_holds_head_of_line(self, scheduler, monkeypatch):
+        """Test a live higher priority waiter blocks others, which leave on timeout"""
+        monkeypatch.setattr(llm_scheduler.settings, "llm_queue_timeout", 0.1)
+        queue, waiters = scheduler._keys()[1:3]
+        scheduler.client.zadd(queue, {"polling": 0})
+        scheduler.client.zadd(waiters, {"polling": time.time() + 60})
+
+        with pytest.raises(QuotaExhausted):
+            scheduler.acquire(10, PRIORITY_BACKGROUND)
+
+        assert scheduler.client.zrange(queue, 0, -1) == ["polling"]
+
+    def test_failed_request_refunds_tokens(self, scheduler, openrouter, monkeypatch):
+        """Test the tokens reserved for a failed LLM call go back to the bucket"""
+        monkeypatch.setattr(llm.settings, "llm_max_retries", 0)
+        client = llm.LLMClient(breaker_factory=StubBreaker, scheduler=scheduler, stats=StubStats())
+        openrouter.failures[llm.settings.summary_model] = [500]
+
+        with pytest.raises(LLMUnavailable):
+            client.complete("Summarise this")
+
+        assert bucket_tokens(scheduler) == pytest.approx(1000, abs=1)
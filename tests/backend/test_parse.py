@@ -0,0 +1,110 @@
+# Parse Stage Unit Tests
+from pathlib import Path
+
+import pytest
+
+from backend.pipeline.parse import ParserBackend, get_parser_backend, parse_article
+
+FIXTURES = sorted((Path(__file__).parent.parent / "fixtures" / "html").glob("*.html"))
+
+
+class TestParserBackends:
+    """Unit tests for the pluggable parser backends"""
+
+    @pytest.mark.parametrize("fixture", FIXTURES, ids=lambda path: path.stem)
+    def test_lxml_matches_beautifulsoup(self, fixture):
+        """Test the lxml fast path extracts the same title and text as BeautifulSoup"""
+        html = fixture.read_text(encoding="utf-8")
+        fast = parse_article(html, backend="lxml")
+        reference = parse_article(html, backend="bs4")
+
+        assert fast is not None
+        assert fast == reference
+
+    def test_boilerplate_removed(self):
+        """Test nav/header/footer/script content is excluded"""
+        html = (Path(FIXTURES[0].parent) / "news_article.html").read_text(encoding="utf-8")
+        parsed = parse_article(html)
+
+        assert parsed["title"] == "City Council Approves New Transit Plan"
+        assert "All rights reserved" not in parsed["text"]
+        assert "loadAd" not in parsed["text"]
+        assert "Sports" not in parsed["text"]
+
+    def test_h1_title_fallback_skips_header(self):
+        """Test the h1 fallback ignores headings inside removed elements"""
+        html = (Path(FIXTURES[0].parent) / "no_title_h1.html").read_text(encoding="utf-8")
+        assert parse_article(html)["title"] == "Why Slow Software Happens"
+
+    def test_falls_back_to_beautifulsoup(self, monkeypatch):
+        """Test a failing fast backend falls back to BeautifulSoup"""
+
+        def broken(html):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(get_parser_backend("lxml"), "extract", broken)
+        parsed = parse_article("<html><body><p>Hello world</p></body></html>", backend="lxml")
+
+        assert parsed["text"] == "Hello world"
+
+    def test_unknown_backend(self):
+        """Test unknown backend names are reported as a parse failure"""
+        assert parse_article("<p>x</p>", backend="nope") is None
+
+    def test_backend_must_implement_extract(self):
+        """Test a backend without ``extract`` is refused when created, not when used"""
+
+        class Incomplete(ParserBackend):
+            name = "incomplete"
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+class TestReadabilityParser:
+    """Unit tests for the single-pass readability extractor"""
+
+    def fixture(self, name):
+        return (FIXTURES[0].parent / f"{name}.html").read_text(encoding="utf-8")
+
+    def test_picks_main_content_over_boilerplate(self):
+        """Test content is chosen by text and link density, not by container tag"""
+        parsed = parse_article(self.fixture("boilerplate_heavy"), backend="readability")
+
+        assert "right-sizing databases" in parsed["text"]
+        assert "fifty-two percent" in parsed["text"]
+        for boilerplate in [
+            "cookies",
+            "Share on Twitter",
+            "Related posts",
+            "Great post",
+            "newsletter",
+        ]:
+            assert boilerplate not in parsed["text"]
+
+        # The selector-based backends fall back to the whole body here
+        assert (
+            "Share on Twitter" in parse_article(self.fixture("boilerplate_heavy"), "lxml")["text"]
+        )
+
+    def test_title_prefers_og_title(self):
+        """Test og:title wins over a <title> with a site suffix"""
+        parsed = parse_article(self.fixture("boilerplate_heavy"), backend="readability")
+        assert parsed["title"] == "How We Cut Our Cloud Bill in Half"
+
+    def test_title_falls_back_to_title_then_h1(self):
+        """Test <title> and then the first h1 are used without og:title"""
+        assert parse_article(self.fixture("news_article"), "readability")["title"] == (
+            "City Council Approves New Transit Plan"
+        )
+        assert parse_article(self.fixture("no_title_h1"), "readability")["title"] == (
+            "Why Slow Software Happens"
+        )
+
+    def test_text_is_normalised(self):
+        """Test whitespace is collapsed per line and preformatted breaks are kept"""
+        text = parse_article(self.fixture("blog_post_content_class"), "readability")["text"]
+
+        assert "Every parser treats whitespace differently, and you will spend a day on it." in text
+        assert "def parse(text):\n    return tree" not in text
+        assert "def parse(text):\nreturn tree" in text
@@ -0,0 +1,157 @@
+# Fetch Politeness Unit Tests
+import fakeredis
+import httpx
+import pytest
+
+from backend.pipeline import politeness
+from backend.pipeline.fetch import FetchEngine
+from backend.pipeline.html_store import HTMLStore
+from backend.pipeline.politeness import DomainLimiter, FetchDeferred
+
+URL = "https://example.com/article"
+
+
+class Clock:
+    """Stand-in for time.time that only moves when told to"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(politeness.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    """Domain limiter running its Lua script on an in-memory Redis"""
+    monkeypatch.setattr(politeness.settings, "fetch_domain_rate", 1.0)
+    monkeypatch.setattr(politeness.settings, "fetch_domain_burst", 3)
+    monkeypatch.setattr(politeness.settings, "fetch_domain_concurrency", 100)
+    monkeypatch.setattr(politeness.settings, "fetch_domain_busy_wait", 5.0)
+    monkeypatch.setattr(politeness.settings, "fetch_deadline", 60.0)
+    return DomainLimiter(client=fakeredis.FakeRedis(decode_responses=True))
+
+
+class TestDomainLimiter:
+    """Unit tests for the shared per-domain token bucket, leases and cooldowns"""
+
+    def test_rate_per_domain(self, limiter, clock):
+        """Test a domain gets its burst, then one fetch per 1/rate seconds"""
+        for _ in range(3):
+            assert limiter.acquire(URL)
+
+        with pytest.raises(FetchDeferred) as deferred:
+            limiter.acquire("https://www.example.com/other")
+        assert deferred.value.domain == "example.com"
+        assert deferred.value.retry_after == pytest.approx(1.0)
+        # Other domains have their own bucket
+        assert limiter.acquire("https://example.org/article")
+
+        clock.now += 1.0
+        assert limiter.acquire(URL)
+        with pytest.raises(FetchDeferred):
+            limiter.acquire(URL)
+
+    def test_concurrency_cap_and_lease_expiry(self, limiter, clock, monkeypatch):
+        """Test in-flight leases cap a domain until released or expired"""
+        monkeypatch.setattr(politeness.settings, "fetch_domain_concurrency", 2)
+        monkeypatch.setattr(politeness.settings, "fetch_domain_burst", 100)
+        first = limiter.acquire(URL)
+        limiter.acquire(URL)
+
+        with pytest.raises(FetchDeferred) as deferred:
+            limiter.acquire(URL)
+        assert deferred.value.retry_after == 5.0
+
+        limiter.release(URL, first)
+        limiter.acquire(URL)
+
+        # Leases of a worker that died mid-fetch lapse after the fetch deadline
+        clock.now += 60.5
+        assert limiter.acquire(URL)
+        assert limiter.acquire(URL)
+
+    def test_cooldown(self, limiter):
+        """Test a recorded cooldown defers every fetch to the domain"""
+        limiter.defer(URL, 30)
+
+        with pytest.raises(FetchDeferred) as deferred:
+            limiter.acquire("https://example.com/another")
+        assert 29 < deferred.value.retry_after <= 30
+        assert limiter.acquire("https://example.org/article")
+
+    def test_zero_rate_keeps_cap_and_cooldown(self, limiter, monkeypatch):
+        """Test a zero rate only turns the token bucket off"""
+        monkeypatch.setattr(politeness.settings, "fetch_domain_rate", 0)
+        monkeypatch.setattr(politeness.settings, "fetch_domain_concurrency", 5)
+
+        # Past the burst: no rate limit
+        leases = [limiter.acquire(URL) for _ in range(5)]
+        assert all(leases)
+        with pytest.raises(FetchDeferred) as capped:
+            limiter.acquire(URL)
+        assert capped.value.retry_after == 5.0
+
+        for lease in leases:
+            limiter.release(URL, lease)
+        limiter.defer(URL, 30)
+        with pytest.raises(FetchDeferred) as cooling:
+            limiter.acquire(URL)
+        assert 29 < cooling.value.retry_after <= 30
+
+
+class TestFetchCooldown:
+    """Unit tests for cooldowns recorded by the fetch engine"""
+
+    def fetch(self, limiter, tmp_path, response):
+        engine = FetchEngine(
+            transport=httpx.MockTransport(lambda request: response),
+            store=HTMLStore(tmp_path),
+            limiter=limiter,
+        )
+        try:
+            return engine.fetch_sync(URL)
+        finally:
+            engine.close()
+
+    @pytest.mark.parametrize("status", [429, 503])
+    def test_retry_after_cools_domain_down(self, limiter, tmp_path, status):
+        """Test 429 and 503 with Retry-After pause the domain for that long"""
+        with pytest.raises(FetchDeferred) as deferred:
+            self.fetch(limiter, tmp_path, httpx.Response(status, headers={"retry-after": "20"}))
+        assert deferred.value.retry_after == 20
+
+        with pytest.raises(FetchDeferred) as again:
+            limiter.acquire(URL)
+        assert 19 < again.value.retry_after <= 20
+
+    def test_429_without_retry_after_uses_default(self, limiter, tmp_path):
+        """Test a bare 429 still cools the domain down"""
+        with pytest.raises(FetchDeferred) as deferred:
+            self.fetch(limiter, tmp_path, httpx.Response(429))
+        assert deferred.value.retry_after == politeness.settings.fetch_default_retry_after
+
+        with pytest.raises(FetchDeferred):
+            limiter.acquire(URL)
+
+    def test_zero_retry_after_kept(self, limiter, tmp_path):
+        """Test Retry-After: 0 is honoured, not replaced by the default"""
+        with pytest.raises(FetchDeferred) as deferred:
+            self.fetch(limiter, tmp_path, httpx.Response(429, headers={"retry-after": "0"}))
+        assert deferred.value.retry_after == 0
+
+    def test_lease_returned_after_fetch(self, limiter, tmp_path, monkeypatch):
+        """Test a finished fetch gives its in-flight lease back"""
+        monkeypatch.setattr(politeness.settings, "fetch_domain_concurrency", 1)
+        html = "<html><body><p>Hello</p></body></html>"
+        response = httpx.Response(200, headers={"content-type": "text/html"}, text=html)
+
+        assert self.fetch(limiter, tmp_path, response) == html
+        assert limiter.acquire(URL)
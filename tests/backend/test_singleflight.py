@@ -0,0 +1,40 @@
+# Single-Flight Unit Tests
+from unittest.mock import MagicMock
+
+import fakeredis
+import redis
+
+from backend.singleflight import SingleFlight
+
+
+def single_flight() -> SingleFlight:
+    return SingleFlight("test", client=fakeredis.FakeRedis(decode_responses=True))
+
+
+class TestSingleFlight:
+    """Unit tests for claiming work by key"""
+
+    def test_first_claim_leads(self):
+        """Test the first caller leads and later callers get its id at once"""
+        flight = single_flight()
+
+        assert flight.claim("https://example.com/a", "first") is None
+        # The leader hasn't finished: the loser still gets its id, without waiting
+        assert flight.claim("https://example.com/a", "second") == "first"
+        assert flight.claim("https://example.com/b", "third") is None
+
+    def test_release_lets_next_caller_lead(self):
+        """Test a released key can be claimed again"""
+        flight = single_flight()
+        flight.claim("https://example.com/a", "first")
+
+        flight.release("https://example.com/a")
+
+        assert flight.claim("https://example.com/a", "second") is None
+
+    def test_redis_errors_fail_open(self):
+        """Test every caller leads when Redis is unavailable"""
+        client = MagicMock(**{"set.side_effect": redis.ConnectionError("down")})
+        flight = SingleFlight("test", client=client)
+
+        assert flight.claim("https://example.com/a", "first") is None
@@ -0,0 +1,181 @@
+# Summarize Stage Unit Tests
+import time
+
+import pytest
+
+from backend.config import ModelRoute
+from backend.pipeline import summarize
+from backend.pipeline.document import Document
+from backend.pipeline.llm import LLMUnavailable
+from backend.pipeline.summarize import pack_texts, summarize_article
+from backend.pipeline.summary_cache import SummaryCache
+
+from .conftest import DELAY
+
+
+class DictRedis:
+    """In-memory stand-in for the few Redis commands the summary cache uses"""
+
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def hincrby(self, key, field, amount):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = fields.get(field, 0) + amount
+
+    def hgetall(self, key):
+        return self.hashes.get(key, {})
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    """Keep summarize tests off Redis"""
+    cache = SummaryCache(client=DictRedis())
+    monkeypatch.setattr(summarize, "get_summary_cache", lambda: cache)
+    return cache
+
+
+def article(sentences: int) -> Document:
+    text = " ".join(f"Sentence number {i} says something new." for i in range(sentences))
+    return Document("Long Read", text)
+
+
+class TestSummarize:
+    """Unit tests for single-call and map-reduce summarization"""
+
+    def test_short_article_single_call(self, openrouter):
+        """Test an article within the group budget is summarised in one call"""
+        summary = summarize_article(article(5))
+
+        assert summary.startswith("• final point")
+        assert len(openrouter.prompts) == 1
+        assert "Sentence number 4" in openrouter.prompts[0]
+
+    def test_long_article_map_reduce(self, openrouter, monkeypatch):
+        """Test every chunk group is summarised concurrently, then reduced"""
+        monkeypatch.setattr(summarize.settings, "summary_group_tokens", 300)
+        document = article(300)
+
+        start = time.perf_counter()
+        summary = summarize_article(document)
+        elapsed = time.perf_counter() - start
+
+        map_prompts = [p for p in openrouter.prompts if p.startswith("The following is one")]
+        assert summary.startswith("• final point")
+        assert len(map_prompts) > 4
+        # The whole article is covered, not just its introduction
+        assert any("Sentence number 299" in p for p in map_prompts)
+        assert openrouter.max_in_flight == 4
+        # Time follows the tree depth, not the number of map calls
+        assert elapsed < DELAY * len(openrouter.prompts) / 2
+
+    def test_only_final_summary_streamed(self, openrouter, monkeypatch):
+        """Test map calls run unstreamed and the reduce call is streamed"""
+        monkeypatch.setattr(summarize.settings, "summary_group_tokens", 300)
+        deltas = []
+        listener = summarize.CompletionListener()
+        listener.on_delta = deltas.append
+
+        summarize_article(article(100), listener)
+
+        assert "".join(deltas) == "• final point"
+        assert openrouter.streamed[-1] and not any(openrouter.streamed[:-1])
+
+    def test_unreachable_llm_defers(self, openrouter, monkeypatch):
+        """Test an unreachable endpoint defers instead of producing a placeholder"""
+        monkeypatch.setattr(summarize.settings, "openrouter_base_url", "http://127.0.0.1:9")
+
+        with pytest.raises(LLMUnavailable):
+            summarize_article(article(5))
+
+    def test_rejected_request_falls_back(self, openrouter):
+        """Test non-retryable errors fall back to the extractive summary"""
+        openrouter.failures[summarize.settings.summary_model] = [401]
+
+        summary = summarize_article(article(5))
+        assert summary.startswith("• Sentence number 0")
+        assert summary.endswith("(extractive summary)")
+        assert len(openrouter.prompts) == 1
+
+    def test_fast_mode_skips_llm(self, openrouter):
+        """Test fast mode summarises locally without any request"""
+        summary = summarize_article(article(20), mode=summarize.SUMMARY_MODE_FAST)
+
+        assert summary.count("• ") == summarize.settings.extractive_sentences
+        assert not openrouter.prompts
+
+
+class TestSummaryCache:
+    """Unit tests for caching summaries by content, model and prompt version"""
+
+    def test_hit_skips_llm(self, openrouter, cache):
+        """Test the same text and title are summarised once"""
+        first = summarize_article(article(5))
+        again = summarize_article(article(5))
+
+        assert again == first
+        assert len(openrouter.prompts) == 1
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    def test_key_includes_title(self, openrouter):
+        """Test the same text under another title is summarised again"""
+        summarize_article(article(5))
+        summarize_article(Document("Another Title", article(5).text))
+
+        assert len(openrouter.prompts) == 2
+
+    def test_fallback_model_summary_is_hit(self, openrouter, cache, monkeypatch):
+        """Test a summary from a fallback model is found by the next identical request"""
+        monkeypatch.setattr(summarize.settings, "summary_fallback_models", ["fallback/model"])
+        monkeypatch.setattr(summarize.settings, "llm_max_retries", 1)
+        openrouter.failures[summarize.settings.summary_model] = [500, 500]
+
+        first = summarize_article(article(5))
+        assert openrouter.models[-1] == "fallback/model"
+        requests = len(openrouter.prompts)
+
+        again = summarize_article(article(5))
+        assert again == first
+        assert len(openrouter.prompts) == requests
+        assert cache.stats()["hits"] == 1
+
+    def test_key_includes_model_and_prompt_version(self, openrouter, monkeypatch):
+        """Test changing the model or prompt version misses the cache"""
+        summarize_article(article(5))
+        monkeypatch.setattr(
+            summarize.settings, "summary_routes", [ModelRoute(tier="standard", models=["other/m"])]
+        )
+        summarize_article(article(5))
+        monkeypatch.setattr(summarize, "PROMPT_VERSION", "next")
+        summarize_article(article(5))
+
+        assert len(openrouter.prompts) == 3
+
+    def test_failures_are_not_cached(self, openrouter, cache, monkeypatch):
+        """Test fallback summaries are never stored"""
+        openrouter.failures[summarize.settings.summary_model] = [401]
+        summarize_article(article(5))
+
+        assert not cache.client.values
+
+
+class TestPackTexts:
+    """Unit tests for token-budget grouping"""
+
+    def test_groups_respect_budget(self):
+        """Test items are packed in order without exceeding the budget"""
+        items = [("a", 3), ("b", 3), ("c", 3), ("d", 3)]
+        assert pack_texts(items, 6) == ["a\n\nb", "c\n\nd"]
+
+    def test_min_items_always_shrinks(self):
+        """Test oversized items still pair up so merging converges"""
+        items = [("a", 10), ("b", 10), ("c", 10)]
+        assert pack_texts(items, 5) == ["a", "b", "c"]
+        assert pack_texts(items, 5, min_items=2) == ["a\n\nb", "c"]
@@ -0,0 +1,147 @@
+# Summary Stream Unit Tests
+import json
+import time
+from unittest.mock import MagicMock
+
+import fakeredis
+import pytest
+import redis
+from fakeredis import aioredis
+
+from backend.api import articles
+from backend.pipeline.summary_stream import (
+    SummaryPublisher,
+    channel_name,
+    final_key,
+    partial_key,
+)
+
+ARTICLE_ID = "article-1"
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def publisher(server):
+    return SummaryPublisher(
+        ARTICLE_ID, client=fakeredis.FakeRedis(server=server, decode_responses=True)
+    )
+
+
+@pytest.fixture
+def async_client(server, monkeypatch):
+    """Async Redis for the SSE relay, sharing the publisher's data"""
+    client = aioredis.FakeRedis(server=server, decode_responses=True)
+    monkeypatch.setattr(articles, "get_async_redis", lambda: client)
+    return client
+
+
+def parse(event: str) -> tuple:
+    """(event name, data) of one server-sent event"""
+    lines = dict(line.split(": ", 1) for line in event.strip().split("\n"))
+    return lines["event"], json.loads(lines["data"])
+
+
+class TestSummaryPublisher:
+    """Unit tests for publishing summary text to Redis"""
+
+    def test_deltas_append_and_publish(self, publisher):
+        """Test each piece of text is appended to the partial key and published with its end"""
+        pubsub = publisher.client.pubsub()
+        pubsub.subscribe(channel_name(ARTICLE_ID))
+        assert pubsub.get_message(timeout=1)["type"] == "subscribe"
+
+        publisher.on_delta("• First")
+        publisher.on_delta(" point")
+
+        assert publisher.client.get(partial_key(ARTICLE_ID)) == "• First point"
+        messages = [json.loads(pubsub.get_message(timeout=1)["data"]) for _ in range(2)]
+        assert messages == [
+            {"event": "delta", "text": "• First", "end": len("• First".encode())},
+            {"event": "delta", "text": " point", "end": len("• First point".encode())},
+        ]
+
+    def test_terminal_event_replaces_partial_text(self, publisher):
+        """Test done drops the partial text and keeps the event for late subscribers"""
+        publisher.on_delta("• Draft")
+        publisher.done("• Final")
+
+        assert publisher.client.get(partial_key(ARTICLE_ID)) is None
+        assert json.loads(publisher.client.get(final_key(ARTICLE_ID))) == {
+            "event": "done",
+            "summary": "• Final",
+        }
+
+        publisher.start()
+        assert publisher.client.get(final_key(ARTICLE_ID)) is None
+
+    def test_redis_errors_ignored(self):
+        """Test publishing never fails the summary when Redis is down"""
+        client = MagicMock(**{"pipeline.side_effect": redis.ConnectionError("down")})
+        client.register_script.side_effect = redis.ConnectionError("down")
+        publisher = SummaryPublisher(ARTICLE_ID, client=client)
+
+        publisher.on_delta("• Text")
+        publisher.done("• Text")
+
+
+class TestSummaryEvents:
+    """Unit tests for relaying a live summary as server-sent events"""
+
+    async def test_catch_up_from_final(self, publisher, async_client):
+        """Test a summary finished before subscribing is sent at once"""
+        publisher.deferred(60, "• Interim")
+
+        events = [parse(event) async for event in articles._summary_events(ARTICLE_ID)]
+
+        assert events == [("deferred", {"retry_after": 60, "summary": "• Interim"})]
+
+    async def test_catch_up_from_partial_then_relay(self, publisher, async_client):
+        """Test text so far is sent first, and only newer deltas are relayed after it"""
+        publisher.on_delta("• Hello")
+        events = articles._summary_events(ARTICLE_ID)
+
+        assert parse(await anext(events)) == ("delta", {"text": "• Hello"})
+
+        # Published before the snapshot was read: already sent
+        publisher.client.publish(
+            channel_name(ARTICLE_ID),
+            json.dumps({"event": "delta", "text": "• Hello", "end": len("• Hello".encode())}),
+        )
+        publisher.on_delta(" world")
+        publisher.done("• Hello world")
+
+        rest = [parse(event) async for event in events]
+        assert rest == [
+            ("delta", {"text": " world"}),
+            ("done", {"summary": "• Hello world"}),
+        ]
+
+    async def test_heartbeat(self, async_client, monkeypatch):
+        """Test a keep-alive comment is sent while no text arrives"""
+        monkeypatch.setattr(articles, "SSE_HEARTBEAT", 0.05)
+        events = articles._summary_events(ARTICLE_ID)
+
+        start = time.monotonic()
+        assert await anext(events) == ": keep-alive\n\n"
+        assert 0.05 <= time.monotonic() - start < 1
+        await events.aclose()
+
+    async def test_unsubscribes_on_disconnect(self, publisher, async_client):
+        """Test a client going away releases its subscription"""
+        publisher.on_delta("• Partial")
+        events = articles._summary_events(ARTICLE_ID)
+        await anext(events)
+        assert await async_client.pubsub_numsub(channel_name(ARTICLE_ID)) == [
+            (channel_name(ARTICLE_ID), 1)
+        ]
+
+        # What Starlette does when the client disconnects
+        await events.aclose()
+
+        assert await async_client.pubsub_numsub(channel_name(ARTICLE_ID)) == [
+            (channel_name(ARTICLE_ID), 0)
+        ]
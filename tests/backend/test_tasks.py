@@ -0,0 +1,66 @@
+# Task Unit Tests
+import time
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from backend import tasks
+from backend.database import Article, ArticleStatus
+from backend.pipeline.html_store import HTMLStore
+
+HTML = "<html><head><title>Stored</title></head><body><p>Body</p></body></html>"
+
+
+@pytest.fixture
+def session_factory(test_engine, monkeypatch):
+    """Run tasks against the test database"""
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+    monkeypatch.setattr(tasks, "SessionLocal", factory)
+    return factory
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = HTMLStore(tmp_path)
+    monkeypatch.setattr(tasks, "get_html_store", lambda: store)
+    return store
+
+
+def stored_article(factory, store, submitted: bool) -> str:
+    with factory() as db:
+        article = Article(
+            user_id="tasks",
+            url=f"https://example.com/test-task-{time.time_ns()}",
+            status=ArticleStatus.PENDING,
+            html_sha256=store.put(HTML),
+            html_submitted=submitted,
+        )
+        db.add(article)
+        db.commit()
+        return article.id
+
+
+class TestProcessArticleTask:
+    """Unit tests for which stored HTML the pipeline task reuses"""
+
+    def run(self, article_id):
+        result = {"title": "Stored", "content": "Body", "summary": "• Point", "html_sha256": None}
+        with (
+            patch.object(tasks, "process_article_pipeline", return_value=result) as pipeline,
+            patch.object(tasks, "_prewarm_audio"),
+        ):
+            tasks.process_article_task.run(article_id)
+        return pipeline.call_args.kwargs["html"]
+
+    def test_submitted_html_reused(self, session_factory, store):
+        """Test HTML captured by the client is processed without a fetch"""
+        article_id = stored_article(session_factory, store, submitted=True)
+
+        assert self.run(article_id) == HTML
+
+    def test_fetched_html_revalidated(self, session_factory, store):
+        """Test HTML the server fetched earlier goes back through the fetch stage"""
+        article_id = stored_article(session_factory, store, submitted=False)
+
+        assert self.run(article_id) is None
@@ -1,9 +1,74 @@
 # Backend Unit Tests
+import hashlib
+import os
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
+import redis
 
-from backend.tts import generate_article_audio, get_tts_service
+from backend import tts
+from backend.audio_cache import AudioCache, audio_cache_key
+from backend.audio_demand import AudioDemand
+from backend.mp3 import _id3v2_size, audio_frames, encoder_gaps, parse_frame_header
+from backend.tts import (
+    EspeakBackend,
+    TTSBackend,
+    TTSService,
+    generate_article_audio,
+    get_tts_backend,
+    get_tts_service,
+    split_segments,
+)
+
+# MPEG-2 Layer III, 32kbps, 24kHz, mono (as returned by Google TTS): 96-byte frames
+FRAME_HEADER = b"\xff\xf3\x44\xc0"
+FRAME_LENGTH = 96
+
+
+def frame(fill: int) -> bytes:
+    return FRAME_HEADER + bytes([fill]) * (FRAME_LENGTH - 4)
+
+
+def segment_file(fill: int, frames: int = 3) -> bytes:
+    """An MP3 file as an encoder writes it: ID3 tag, Info frame, then audio"""
+    id3 = b"ID3\x04\x00\x00\x00\x00\x00\x05" + b"\x00" * 5
+    info = FRAME_HEADER + b"\x00" * 9 + b"Info" + b"\x00" * (FRAME_LENGTH - 17)
+    return id3 + info + frame(fill) * frames
+
+
+def lame_segment_file(fill: int, frames: int, delay: int, padding: int) -> bytes:
+    """An MP3 file whose Info frame has a LAME extension with the encoder's delay and padding"""
+    lame = b"LAME3.100" + b"\x00" * 12 + bytes([delay >> 4, (delay & 0xF) << 4 | padding >> 8])
+    lame += bytes([padding & 0xFF])
+    tag = b"Info" + (1).to_bytes(4, "big") + frames.to_bytes(4, "big") + lame
+    info = FRAME_HEADER + b"\x00" * 9 + tag
+    return info + b"\x00" * (FRAME_LENGTH - len(info)) + frame(fill) * frames
+
+
+class StubSynthesizer(TTSBackend):
+    """Local stand-in for the synthesis backend, tracking concurrency"""
+
+    name = "stub"
+    voice = "plain"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.segments = []
+
+    def synthesize(self, text):
+        with self.lock:
+            self.segments.append(text)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Later segments finish first, so ordering is really tested
+        time.sleep(0.05 / (1 + int(text.split()[-1].rstrip("."))))
+        with self.lock:
+            self.in_flight -= 1
+        return segment_file(int(text.split()[-1].rstrip(".")))
 
 
 class TestTTSService:
@@ -28,25 +93,16 @@ class TestTTSService:
             mock_service_class.assert_called_once()
 
     @patch("backend.tts.get_tts_service")
-    @patch("backend.tts.Path")
-    def test_generate_article_audio_success(self, mock_path, mock_get_service):
-        """Test article audio generation"""
+    def test_generate_article_audio_success(self, mock_get_service):
+        """Test article audio is generated through the shared audio cache"""
         mock_service = MagicMock()
         mock_get_service.return_value = mock_service
-        mock_service.generate_audio.return_value = "/path/to/audio.wav"
-
-        mock_audio_dir = MagicMock()
-        mock_path.return_value = mock_audio_dir
-        mock_audio_dir.__truediv__ = MagicMock(return_value="/audio/article_article123.wav")
-        mock_audio_dir.mkdir = MagicMock()
+        mock_service.generate_audio.return_value = "/storage/audio/ab/cd/abcd.mp3"
 
         result = generate_article_audio("article123", "Test summary")
 
-        assert result == "/path/to/audio.wav"
-        mock_service.generate_audio.assert_called_once_with(
-            "Test summary", "/audio/article_article123.wav"
-        )
-        mock_audio_dir.mkdir.assert_called_once_with(exist_ok=True)
+        assert result == "/storage/audio/ab/cd/abcd.mp3"
+        mock_service.generate_audio.assert_called_once_with("Test summary")
 
     @patch("backend.tts.get_tts_service")
     def test_generate_article_audio_failure(self, mock_get_service):
@@ -57,3 +113,270 @@ class TestTTSService:
 
         with pytest.raises(Exception, match="Audio generation failed"):
             generate_article_audio("article123", "Test summary")
+
+
+class TestSegmentedSynthesis:
+    """Unit tests for sentence-split, concurrent synthesis and MP3 joining"""
+
+    def test_split_segments_at_sentences(self):
+        """Test sentences are packed up to the size limit without being cut"""
+        text = "• First point here.\n• Second point. Third one!\nA sentence far too long to fit."
+
+        assert split_segments(text, 30) == [
+            "• First point here.",
+            "• Second point. Third one!",
+            "A sentence far too long to fit.",
+        ]
+
+    def test_parse_frame_header(self):
+        """Test Layer III frame lengths are computed from the header"""
+        assert parse_frame_header(FRAME_HEADER) == (FRAME_LENGTH, 13)
+        # MPEG-1, 128kbps, 44.1kHz, stereo
+        assert parse_frame_header(b"\xff\xfb\x90\x00") == (417, 36)
+        assert parse_frame_header(b"ID3\x04") is None
+
+    def test_tags_and_info_frames_dropped(self):
+        """Test only audio frames are kept from a segment"""
+        assert audio_frames(segment_file(7, frames=2)) == frame(7) * 2
+
+    def test_encoder_padding_frames_dropped(self):
+        """Test trailing frames that decode to encoder padding only are dropped"""
+        data = lame_segment_file(7, frames=5, delay=576, padding=529 + 2 * 576 + 100)
+        assert encoder_gaps(data[:FRAME_LENGTH], 13) == (576, 529 + 2 * 576 + 100)
+        assert audio_frames(data) == frame(7) * 3
+
+        # Less than a frame of padding after the decoder delay: nothing to drop
+        assert audio_frames(lame_segment_file(7, 5, 576, 529 + 575)) == frame(7) * 5
+        # Never more than the segment's audio
+        assert audio_frames(lame_segment_file(7, 2, 576, 4000)) == frame(7)
+
+    def test_segments_synthesised_concurrently_in_order(self, tmp_path, monkeypatch):
+        """Test segments run in parallel and are joined in text order"""
+        monkeypatch.setattr(tts.settings, "tts_segment_chars", 10)
+        monkeypatch.setattr(tts.settings, "tts_parallelism", 3)
+        stub = StubSynthesizer()
+        text = " ".join(f"Segment {i}." for i in range(6))
+
+        path = TTSService(backend=stub).generate_audio(text, tmp_path / "out.mp3")
+
+        data = (tmp_path / "out.mp3").read_bytes()
+        assert path == str(tmp_path / "out.mp3")
+        assert data[_id3v2_size(data) :] == b"".join(frame(i) * 3 for i in range(6))
+        assert stub.max_in_flight == 3
+        assert not list(tmp_path.glob("*.part"))
+
+    def test_failed_segment_leaves_no_file(self, tmp_path):
+        """Test a synthesis error removes the partial file"""
+
+        failing = StubSynthesizer()
+        failing.synthesize = MagicMock(side_effect=RuntimeError("backend down"))
+
+        with pytest.raises(RuntimeError):
+            TTSService(backend=failing).generate_audio("Hello there.", tmp_path / "out.mp3")
+        assert not list(tmp_path.iterdir())
+
+    def test_synthesis_cut_off_at_deadline(self, tmp_path, monkeypatch):
+        """Test an article that takes too long to synthesise fails instead of holding the worker"""
+        monkeypatch.setattr(tts.settings, "tts_segment_chars", 10)
+        monkeypatch.setattr(tts.settings, "tts_parallelism", 1)
+        monkeypatch.setattr(tts.settings, "tts_deadline", 0.1)
+        slow = StubSynthesizer()
+        synthesize = slow.synthesize
+
+        def slow_synthesize(text):
+            time.sleep(0.05)
+            return synthesize(text)
+
+        slow.synthesize = slow_synthesize
+        text = " ".join(f"Segment {i}." for i in range(10))
+
+        with pytest.raises(TimeoutError):
+            TTSService(backend=slow).generate_audio(text, tmp_path / "out.mp3")
+        # Segments not started by the deadline are dropped
+        assert len(slow.segments) < 10
+        assert not list(tmp_path.iterdir())
+
+
+class TestTTSBackends:
+    """Unit tests for the pluggable synthesis backends"""
+
+    def test_file_tagged_with_backend(self, tmp_path):
+        """Test each file names the backend and voice that produced it"""
+        path = TTSService(backend=StubSynthesizer()).generate_audio(
+            "Segment 1.", tmp_path / "a.mp3"
+        )
+
+        data = open(path, "rb").read()
+        tag = data[: _id3v2_size(data)]
+        assert tag.startswith(b"ID3") and b"TSSE" in tag
+        assert "stub (plain)".encode() in tag
+
+    def test_backend_selected_by_settings(self, monkeypatch):
+        """Test the configured backend is used, and unknown names are rejected"""
+        monkeypatch.setattr(tts.settings, "tts_backend", "espeak")
+        monkeypatch.setattr(tts, "_tts_backends", {})
+
+        assert isinstance(get_tts_backend(), EspeakBackend)
+        with pytest.raises(ValueError):
+            get_tts_backend("nope")
+
+    def test_backend_must_implement_voice_and_synthesize(self):
+        """Test a backend missing either method is refused when created"""
+
+        class NoVoice(TTSBackend):
+            def synthesize(self, text):
+                return b""
+
+        class NoSynthesize(TTSBackend):
+            voice = "plain"
+
+        for backend in (NoVoice, NoSynthesize):
+            with pytest.raises(TypeError):
+                backend()
+
+    def test_backend_in_cache_key(self):
+        """Test the same text from different backends is cached separately"""
+        espeak = TTSService(backend=EspeakBackend(), cache=MagicMock())
+        stub = TTSService(backend=StubSynthesizer(), cache=MagicMock())
+
+        assert espeak.cache_key("text") != stub.cache_key("text")
+
+    @pytest.mark.skipif(not EspeakBackend().available(), reason="espeak-ng/lame not installed")
+    def test_espeak_segments_join(self, tmp_path):
+        """Test espeak-ng output is MP3 whose segments join into one stream"""
+        path = TTSService(backend=EspeakBackend()).generate_audio(
+            "First sentence. Second sentence.", tmp_path / "out.mp3"
+        )
+
+        data = open(path, "rb").read()
+        assert parse_frame_header(data[_id3v2_size(data) :][:4])
+
+
+class TestAudioCache:
+    """Unit tests for the content-addressed audio cache"""
+
+    def test_hit_skips_synthesis(self, tmp_path):
+        """Test the same text is synthesised once, then served from the cache"""
+        stub = StubSynthesizer()
+        service = TTSService(backend=stub, cache=AudioCache(tmp_path, 10**6))
+
+        first = service.generate_audio("Segment 1.")
+        second = service.generate_audio("Segment 1.")
+
+        assert first == second
+        assert first.endswith(".mp3")
+        assert stub.segments == ["Segment 1."]
+
+    def test_sharded_layout(self, tmp_path):
+        """Test files are stored under two levels of key prefix directories"""
+        key = audio_cache_key("text", "com", "en", "gtts")
+        cache = AudioCache(tmp_path, 10**6)
+
+        assert cache.write(key, [b"audio"]) == tmp_path / key[:2] / key[2:4] / f"{key}.mp3"
+        assert cache.get(key).read_bytes() == b"audio"
+
+    def test_key_covers_voice_language_and_backend(self):
+        """Test every rendering parameter changes the key"""
+        keys = {
+            audio_cache_key("text", "com", "en", "gtts"),
+            audio_cache_key("text", "co.uk", "en", "gtts"),
+            audio_cache_key("text", "com", "fr", "gtts"),
+            audio_cache_key("text", "com", "en", "espeak"),
+        }
+        assert len(keys) == 4
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test the oldest unused files are evicted once over budget"""
+        cache = AudioCache(tmp_path, max_bytes=250)
+        for i, key in enumerate(["a" * 64, "b" * 64]):
+            cache.write(key, [b"x" * 100])
+            os.utime(cache.path(key), (1000 + i, 1000 + i))
+        # Reading "a" makes "b" the least recently used
+        cache.get("a" * 64)
+
+        cache.write("c" * 64, [b"x" * 100])
+
+        assert cache.get("a" * 64) and cache.get("c" * 64)
+        assert cache.get("b" * 64) is None
+
+    def test_digest_recorded_when_written(self, tmp_path, monkeypatch):
+        """Test a file's digest is read back from its record instead of rehashing the file"""
+        cache = AudioCache(tmp_path, 10**6)
+        key = "d" * 64
+        path = cache.write(key, [b"first", b"second"])
+        expected = hashlib.sha256(b"firstsecond").hexdigest()
+
+        with patch("backend.audio_cache.hashlib.file_digest") as file_digest:
+            with open(path, "rb") as f:
+                assert cache.digest(key, f) == expected
+        file_digest.assert_not_called()
+
+        # Replaced by another worker without a matching record: hashed again
+        replacement = tmp_path / "replacement"
+        replacement.write_bytes(b"other")
+        os.replace(replacement, path)
+        with open(path, "rb") as f:
+            assert cache.digest(key, f) == hashlib.sha256(b"other").hexdigest()
+
+    def test_eviction_removes_digest_record(self, tmp_path):
+        """Test an evicted file's digest record goes with it"""
+        cache = AudioCache(tmp_path, max_bytes=150)
+        cache.write("a" * 64, [b"x" * 100])
+        os.utime(cache.path("a" * 64), (1000, 1000))
+
+        cache.write("b" * 64, [b"x" * 100])
+
+        assert not cache.digest_path("a" * 64).exists()
+        assert cache.digest_path("b" * 64).exists()
+
+    def test_follow_while_written(self, tmp_path):
+        """Test a file can be read as it is written, until it is complete"""
+        cache = AudioCache(tmp_path, 10**6)
+        key = "f" * 64
+        written = threading.Event()
+        release = threading.Event()
+
+        def chunks():
+            yield b"first"
+            written.set()
+            release.wait(5)
+            yield b"second"
+
+        writer = threading.Thread(target=cache.write, args=(key, chunks()))
+        writer.start()
+        written.wait(5)
+        follower = cache.follow(key)
+        assert next(follower) == b"first"
+        release.set()
+        rest = b"".join(follower)
+        writer.join()
+
+        assert rest == b"second"
+        assert cache.get(key).read_bytes() == b"firstsecond"
+        assert cache.follow(key) is None
+
+
+class TestAudioDemand:
+    """Unit tests for on-demand audio bookkeeping"""
+
+    def test_recent_listener_window(self):
+        """Test only users who played audio within the prewarm window count"""
+        client = MagicMock()
+        demand = AudioDemand(client)
+
+        client.zscore.return_value = time.time() - 60
+        assert demand.recent_listener("user")
+        client.zscore.return_value = time.time() - 30 * 24 * 3600
+        assert not demand.recent_listener("user")
+        client.zscore.return_value = None
+        assert not demand.recent_listener("user")
+
+    def test_fails_open(self):
+        """Test Redis errors queue synthesis anyway and prewarm nobody"""
+        client = MagicMock()
+        client.set.side_effect = redis.ConnectionError("down")
+        client.zscore.side_effect = redis.ConnectionError("down")
+        demand = AudioDemand(client)
+
+        assert demand.claim("article")
+        assert not demand.recent_listener("user")
@@ -0,0 +1,41 @@
+# URL Canonicalisation Unit Tests
+import pytest
+
+from backend.urls import canonicalize_url
+
+
+class TestCanonicalizeUrl:
+    """Unit tests for duplicate-detection URL canonicalisation"""
+
+    @pytest.mark.parametrize(
+        "variant",
+        [
+            "https://example.com/posts/42",
+            "http://example.com/posts/42",
+            "https://www.example.com/posts/42",
+            "https://EXAMPLE.com/posts/42/",
+            "https://example.com/posts/42#comments",
+            "https://example.com:443/posts/42",
+            "https://example.com/posts/42?utm_source=x&utm_medium=email",
+            "https://example.com/posts/42?fbclid=abc",
+        ],
+    )
+    def test_variants_share_canonical_form(self, variant):
+        """Test common URL variants collapse to one canonical URL"""
+        assert canonicalize_url(variant) == "https://example.com/posts/42"
+
+    def test_meaningful_query_is_kept_and_sorted(self):
+        """Test non-tracking parameters survive in a stable order"""
+        assert (
+            canonicalize_url("https://example.com/search?q=py&page=2&utm_campaign=x")
+            == "https://example.com/search?page=2&q=py"
+        )
+
+    def test_root_and_custom_port(self):
+        """Test root paths and non-default ports are preserved"""
+        assert canonicalize_url("http://example.com") == "https://example.com/"
+        assert canonicalize_url("http://example.com:8080/a/") == "https://example.com:8080/a"
+
+    def test_path_case_is_preserved(self):
+        """Test paths stay case-sensitive"""
+        assert canonicalize_url("https://example.com/A/b") == "https://example.com/A/b"